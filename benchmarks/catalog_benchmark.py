@@ -0,0 +1,500 @@
+"""Benchmark de carga do servidor de catálogo.
+
+Gera uma árvore sintética de modelos (sites × modelos × arquivos), sobe o
+servidor in-process e dispara clientes concorrentes contra cada endpoint,
+reportando latência p50/p95/p99 e throughput com cache frio e quente.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.catalog_benchmark
+    python -m benchmarks.catalog_benchmark --sites 3 --models 40 --files 250
+    python -m benchmarks.catalog_benchmark --save bench_baseline.json
+    python -m benchmarks.catalog_benchmark --compare bench_baseline.json
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import catalog_server  # noqa: E402
+from core import verificar_duplicatas  # noqa: E402
+from core.hash_store import CACHE_ENV_VAR  # noqa: E402
+
+IMAGE_EXTS = (".jpg", ".png", ".webp")
+VIDEO_EXTS = (".mp4", ".mkv")
+DATASET_MARKER = ".bench_dataset.json"
+
+
+class QuietCatalogHandler(catalog_server.CatalogRequestHandler):
+    """Handler sem log por requisição (o log em stderr distorce as medições)"""
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Geração do dataset sintético
+# ---------------------------------------------------------------------------
+
+def generate_dataset(
+    root: Path,
+    sites: int,
+    models: int,
+    files: int,
+    file_size: int,
+    video_ratio: float,
+    duplicate_ratio: float,
+    seed: int,
+) -> Dict[str, object]:
+    """Cria sites/modelos/arquivos com conteúdo aleatório e uma fração de duplicatas.
+
+    Reaproveita o diretório se já houver um dataset gerado com os mesmos parâmetros.
+    """
+    params = {
+        "sites": sites,
+        "models": models,
+        "files": files,
+        "file_size": file_size,
+        "video_ratio": video_ratio,
+        "duplicate_ratio": duplicate_ratio,
+        "seed": seed,
+    }
+    marker = root / DATASET_MARKER
+    if marker.exists():
+        try:
+            with open(marker, "r", encoding="utf-8") as f:
+                existing = json.load(f)
+            if existing.get("params") == params:
+                print(f"[INFO] Reutilizando dataset em {root}")
+                return existing
+        except Exception:
+            pass
+        shutil.rmtree(root)
+
+    rng = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+    originals: List[bytes] = []
+    total_bytes = 0
+    total_files = 0
+    started = time.perf_counter()
+
+    for site_index in range(sites):
+        site_dir = root / f"site-{site_index:02d}"
+        for model_index in range(models):
+            model_dir = site_dir / f"model-{site_index:02d}-{model_index:04d}"
+            model_dir.mkdir(parents=True, exist_ok=True)
+            for file_index in range(files):
+                is_video = rng.random() < video_ratio
+                ext = rng.choice(VIDEO_EXTS if is_video else IMAGE_EXTS)
+                if originals and rng.random() < duplicate_ratio:
+                    content = rng.choice(originals)
+                else:
+                    size = max(1, int(file_size * rng.uniform(0.5, 1.5)))
+                    content = rng.randbytes(size)
+                    if len(originals) < 512:
+                        originals.append(content)
+                with open(model_dir / f"{model_dir.name}_{file_index}{ext}", "wb") as f:
+                    f.write(content)
+                total_bytes += len(content)
+                total_files += 1
+
+    info = {
+        "params": params,
+        "total_files": total_files,
+        "total_bytes": total_bytes,
+    }
+    with open(marker, "w", encoding="utf-8") as f:
+        json.dump(info, f)
+    print(f"[INFO] Dataset gerado: {total_files} arquivos, "
+          f"{catalog_server.CatalogRequestHandler._format_bytes(total_bytes)} "
+          f"em {time.perf_counter() - started:.1f}s")
+    return info
+
+
+def sample_paths(root: Path, rng: random.Random) -> Dict[str, List[str]]:
+    """Monta as URLs de cada cenário a partir do dataset no disco"""
+    sites = sorted(d.name for d in root.iterdir() if d.is_dir())
+    models = []
+    for site in sites:
+        for model_dir in sorted((root / site).iterdir()):
+            if model_dir.is_dir():
+                models.append((site, model_dir.name))
+
+    media = []
+    for site, model in rng.sample(models, min(len(models), 50)):
+        names = sorted(os.listdir(root / site / model))
+        for name in rng.sample(names, min(len(names), 10)):
+            media.append(f"/media/{quote(site)}/{quote(model)}/{quote(name)}")
+
+    search_terms = sorted({model[-4:] for _, model in models})[:20] + ["model", "zzz-nada"]
+    return {
+        "sites": ["/api/sites"],
+        "models": [f"/api/models?site={quote(site)}" for site in sites],
+        "model": [f"/api/model?site={quote(s)}&model={quote(m)}"
+                  for s, m in rng.sample(models, min(len(models), 50))],
+        "search": [f"/api/search?q={quote(term)}" for term in search_terms],
+        "media": media,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Cliente HTTP e medições
+# ---------------------------------------------------------------------------
+
+class BenchClient:
+    """Cliente HTTP por thread que reaproveita a conexão quando o servidor permite"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            self._local.conn = conn
+        return conn
+
+    def _drop_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+        self._local.conn = None
+
+    def get(self, path: str) -> tuple[int, int]:
+        """Executa GET e retorna (status, bytes recebidos)"""
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request("GET", path, headers={"Accept-Encoding": "gzip"})
+                response = conn.getresponse()
+                body = response.read()
+                if response.will_close:
+                    self._drop_connection()
+                return response.status, len(body)
+            except (ConnectionError, http.client.HTTPException):
+                # Conexão keep-alive encerrada pelo servidor: tenta de novo uma vez
+                self._drop_connection()
+                if attempt:
+                    raise
+        return 0, 0
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil pelo método nearest-rank"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int, received: int) -> Dict[str, float]:
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(values) * 1000, 3) if values else 0.0,
+        "throughput_rps": round(len(values) / elapsed, 1) if elapsed > 0 else 0.0,
+        "mb_per_s": round(received / elapsed / (1024 * 1024), 2) if elapsed > 0 else 0.0,
+    }
+
+
+def clear_server_caches(httpd) -> None:
+    """Simula cache frio: esvazia os CacheManager, o índice SQLite e as miniaturas do servidor"""
+    for value in vars(catalog_server).values():
+        if isinstance(value, catalog_server.CacheManager):
+            value.clear()
+    if httpd.catalog_index is not None:
+        httpd.catalog_index.clear()  # Reconstruído do disco na próxima requisição
+    if httpd.thumbnails is not None:
+        httpd.thumbnails.clear()
+
+
+def run_cold(client: BenchClient, httpd, paths: List[str], samples: int, rng: random.Random) -> Dict[str, float]:
+    """Requisições sequenciais, cada uma com os caches do servidor (memória, índice, miniaturas) zerados.
+
+    Cada GET frio é seguido de um GET repetido da mesma URL (já em cache), o que dá
+    uma comparação pareada frio x quente sem a interferência da concorrência.
+    """
+    latencies = []
+    repeat_latencies = []
+    errors = 0
+    received = 0
+    elapsed = 0.0
+    for _ in range(samples):
+        path = rng.choice(paths)
+        clear_server_caches(httpd)
+        start = time.perf_counter()
+        status, size = client.get(path)
+        duration = time.perf_counter() - start
+        elapsed += duration
+        latencies.append(duration)
+        received += size
+        if status >= 400:
+            errors += 1
+        start = time.perf_counter()
+        client.get(path)
+        repeat_latencies.append(time.perf_counter() - start)
+    stats = summarize(latencies, elapsed, errors, received)
+    stats["repeat_p50_ms"] = round(percentile(sorted(repeat_latencies), 50) * 1000, 3)
+    return stats
+
+
+def run_warm(client: BenchClient, paths: List[str], requests: int, clients: int, rng: random.Random) -> Dict[str, float]:
+    """Aquece os caches e dispara `requests` GETs com `clients` clientes concorrentes"""
+    for path in paths:
+        client.get(path)
+
+    plan = [rng.choice(paths) for _ in range(requests)]
+    latencies: List[float] = []
+    lock = threading.Lock()
+    counters = {"errors": 0, "received": 0}
+
+    def worker(chunk: List[str]) -> None:
+        local = []
+        local_errors = 0
+        local_received = 0
+        for path in chunk:
+            start = time.perf_counter()
+            try:
+                status, size = client.get(path)
+            except Exception:
+                status, size = 599, 0
+            local.append(time.perf_counter() - start)
+            local_received += size
+            if status >= 400:
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            counters["errors"] += local_errors
+            counters["received"] += local_received
+
+    chunks = [plan[i::clients] for i in range(clients)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(worker, chunks))
+    elapsed = time.perf_counter() - start
+    return summarize(latencies, elapsed, counters["errors"], counters["received"])
+
+
+def run_scan(client: BenchClient, cache_path: Path, cold: bool) -> Dict[str, float]:
+    """Dispara /api/scan_duplicates e aguarda a conclusão via /api/scan_progress
+
+    cold=True apaga hashes e estado incremental; cold=False mede o scan incremental (grupos
+    reaproveitados do scan anterior), não hashing com cache quente.
+    """
+    if cold:
+        verificar_duplicatas.clear_cache(str(cache_path))
+    verificar_duplicatas.load_cache(str(cache_path))
+
+    start = time.perf_counter()
+    status, _ = client.get("/api/scan_duplicates")
+    if status >= 400:
+        return {"seconds": 0.0, "error": status}
+    results = {}
+    while True:
+        time.sleep(0.05)
+        conn = http.client.HTTPConnection(client.host, client.port, timeout=60)
+        conn.request("GET", "/api/scan_progress")
+        data = json.loads(conn.getresponse().read().decode("utf-8"))
+        conn.close()
+        if data.get("completed"):
+            results = data.get("results") or {}
+            break
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": round(elapsed, 3),
+        "total_files": results.get("total_files", 0),
+        "hashed_files": results.get("hashed_files", 0),
+        "duplicate_groups": results.get("duplicate_groups", 0),
+        "files_per_s": round(results.get("total_files", 0) / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Relatório e comparação com baseline
+# ---------------------------------------------------------------------------
+
+def print_report(report: Dict[str, object]) -> None:
+    header = f"{'endpoint':<10} {'modo':<5} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'erros':>6}"
+    print("\n" + "=" * len(header))
+    print(header)
+    print("-" * len(header))
+    for name, modes in report["endpoints"].items():
+        for mode in ("cold", "warm"):
+            stats = modes.get(mode)
+            if not stats:
+                continue
+            print(f"{name:<10} {mode:<5} {stats['requests']:>6} {stats['p50_ms']:>9.2f} "
+                  f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} "
+                  f"{stats['throughput_rps']:>9.1f} {stats['errors']:>6}")
+        cold = modes.get("cold")
+        if cold and cold.get("repeat_p50_ms", 0) > 0:
+            print(f"{'':<10} {'':<5} p50 sequencial frio {cold['p50_ms']:.2f}ms -> "
+                  f"quente {cold['repeat_p50_ms']:.2f}ms "
+                  f"({cold['p50_ms'] / cold['repeat_p50_ms']:.1f}x)")
+    print("-" * len(header))
+    for mode, stats in report.get("scan", {}).items():
+        print(f"{'scan':<10} {mode:<11} {stats.get('seconds', 0):>8.2f}s  "
+              f"{stats.get('files_per_s', 0):>9.1f} arquivos/s  "
+              f"grupos: {stats.get('duplicate_groups', 0)}")
+    print("=" * len(header))
+
+
+def compare_with_baseline(report: Dict[str, object], baseline: Dict[str, object], threshold: float) -> List[str]:
+    """Lista regressões de p95/throughput acima de `threshold` (fração) em relação ao baseline"""
+    regressions = []
+    for name, modes in report["endpoints"].items():
+        for mode, stats in modes.items():
+            base = baseline.get("endpoints", {}).get(name, {}).get(mode)
+            if not base:
+                continue
+            if base["p95_ms"] > 0 and stats["p95_ms"] > base["p95_ms"] * (1 + threshold):
+                regressions.append(f"{name}/{mode}: p95 {base['p95_ms']:.2f}ms -> {stats['p95_ms']:.2f}ms")
+            if base["throughput_rps"] > 0 and stats["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+                regressions.append(f"{name}/{mode}: req/s {base['throughput_rps']:.1f} -> {stats['throughput_rps']:.1f}")
+    for mode, stats in report.get("scan", {}).items():
+        base = baseline.get("scan", {}).get(mode)
+        if base and base.get("seconds", 0) > 0 and stats.get("seconds", 0) > base["seconds"] * (1 + threshold):
+            regressions.append(f"scan/{mode}: {base['seconds']:.2f}s -> {stats['seconds']:.2f}s")
+    return regressions
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, object]:
+    data_dir = args.data_dir or Path(tempfile.gettempdir()) / "archive-downloader-bench"
+    models_dir = data_dir / "models"
+    # Hashes, índice do catálogo e miniaturas ficam ao lado de default_cache_path(): tudo em data_dir,
+    # sem tocar no cache real do usuário
+    cache_path = data_dir / "cache" / "hash_cache.sqlite3"
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    os.environ[CACHE_ENV_VAR] = str(cache_path)
+    verificar_duplicatas.load_cache(str(cache_path))
+    dataset = generate_dataset(
+        models_dir,
+        sites=args.sites,
+        models=args.models,
+        files=args.files,
+        file_size=args.file_size,
+        video_ratio=args.video_ratio,
+        duplicate_ratio=args.duplicate_ratio,
+        seed=args.seed,
+    )
+
+    rng = random.Random(args.seed)
+    scenarios = sample_paths(models_dir, rng)
+    selected = [name for name in scenarios if not args.only or name in args.only]
+
+    httpd = catalog_server.create_server(
+        0,
+        catalog_server.DEFAULT_UI_DIR,
+        models_dir,
+        host="127.0.0.1",
+        handler_class=QuietCatalogHandler,
+    )
+    port = httpd.server_address[1]
+    server_thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    server_thread.start()
+    client = BenchClient("127.0.0.1", port)
+
+    report: Dict[str, object] = {
+        "meta": {
+            "dataset": dataset,
+            "clients": args.clients,
+            "requests": args.requests,
+            "cold_samples": args.cold_samples,
+            "python": sys.version.split()[0],
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "endpoints": {},
+        "scan": {},
+    }
+
+    try:
+        for name in selected:
+            paths = scenarios[name]
+            print(f"[INFO] {name}: {len(paths)} URL(s) distintas")
+            report["endpoints"][name] = {
+                "cold": run_cold(client, httpd, paths, args.cold_samples, rng),
+                "warm": run_warm(client, paths, args.requests, args.clients, rng),
+            }
+
+        if not args.skip_scan and (not args.only or "scan" in args.only):
+            print("[INFO] scan de duplicatas (frio)...")
+            report["scan"]["cold"] = run_scan(client, cache_path, cold=True)
+            print("[INFO] scan de duplicatas (incremental)...")
+            report["scan"]["incremental"] = run_scan(client, cache_path, cold=False)
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+    return report
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test / regression benchmark do catalog_server")
+    parser.add_argument("--sites", type=int, default=3, help="Sites sintéticos (default: 3)")
+    parser.add_argument("--models", type=int, default=40, help="Modelos por site (default: 40)")
+    parser.add_argument("--files", type=int, default=250, help="Arquivos por modelo (default: 250)")
+    parser.add_argument("--file-size", type=int, default=4096, help="Tamanho médio dos arquivos em bytes (default: 4096)")
+    parser.add_argument("--video-ratio", type=float, default=0.2, help="Fração de vídeos (default: 0.2)")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.05, help="Fração de duplicatas (default: 0.05)")
+    parser.add_argument("--seed", type=int, default=1234, help="Semente do gerador (default: 1234)")
+    parser.add_argument("--data-dir", type=Path, default=None, help="Onde gerar/reutilizar o dataset (default: tempdir)")
+    parser.add_argument("--clients", type=int, default=16, help="Clientes concorrentes no modo quente (default: 16)")
+    parser.add_argument("--requests", type=int, default=2000, help="Requisições por endpoint no modo quente (default: 2000)")
+    parser.add_argument("--cold-samples", type=int, default=20, help="Amostras sequenciais com cache frio (default: 20)")
+    parser.add_argument("--only", nargs="*", default=None,
+                        help="Limita os cenários (sites, models, model, search, media, scan)")
+    parser.add_argument("--skip-scan", action="store_true", help="Não executa o scan de duplicatas")
+    parser.add_argument("--save", type=Path, default=None, help="Salva o relatório em JSON")
+    parser.add_argument("--compare", type=Path, default=None, help="Compara com um relatório JSON salvo")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Piora relativa tolerada antes de acusar regressão (default: 0.2)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    report = run_benchmark(args)
+    print_report(report)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[INFO] Relatório salvo em {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regressão(ões) acima de {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"\n✅ Sem regressões acima de {args.threshold:.0%} em relação a {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,191 @@
+"""Benchmark dos algoritmos de hash usados no scan de duplicatas.
+
+Compara SHA-256, BLAKE3 e xxh3-128 (os dois últimos só se `blake3`/`xxhash` estiverem
+instalados) sobre a distribuição de tamanhos do nosso acervo: amostra arquivos reais da
+pasta de modelos ou, sem ela, gera uma distribuição sintética (muitas imagens, poucos
+vídeos grandes). Reporta MB/s por faixa de tamanho e o tempo projetado para o acervo todo.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.hash_benchmark --folder "C:/Users/eu/AppData/Roaming/Hey_Felphs Archive-Downloader"
+    python -m benchmarks.hash_benchmark --synthetic --samples 300
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.verificar_duplicatas import HASH_ALGORITHMS, HASH_BLOCK_SIZE, new_hasher  # noqa: E402
+
+MEDIA_EXTS = {
+    '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp',
+    '.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv', '.m4v'
+}
+BUCKETS: List[Tuple[str, int]] = [
+    ("<256KB", 256 * 1024),
+    ("256KB-4MB", 4 * 1024 * 1024),
+    ("4-64MB", 64 * 1024 * 1024),
+    (">=64MB", 1 << 62),
+]
+
+
+def bucket_for(size: int) -> str:
+    for name, limit in BUCKETS:
+        if size < limit:
+            return name
+    return BUCKETS[-1][0]
+
+
+def collect_files(folder: Path) -> List[Tuple[str, int]]:
+    """Lista (caminho, tamanho) de todas as mídias da pasta"""
+    files = []
+    for root, _, names in os.walk(folder):
+        for name in names:
+            if os.path.splitext(name)[1].lower() not in MEDIA_EXTS:
+                continue
+            path = os.path.join(root, name)
+            try:
+                files.append((path, os.path.getsize(path)))
+            except OSError:
+                continue
+    return files
+
+
+def synthetic_sizes(count: int, rng: random.Random) -> List[int]:
+    """Distribuição aproximada do acervo: ~80% imagens (~500KB) e ~20% vídeos (~20MB)"""
+    sizes = []
+    for _ in range(count):
+        if rng.random() < 0.8:
+            size = int(rng.lognormvariate(13.1, 0.8))   # mediana ~490KB
+        else:
+            size = int(rng.lognormvariate(16.8, 1.0))   # mediana ~20MB
+        sizes.append(max(1024, min(size, 512 * 1024 * 1024)))
+    return sizes
+
+
+def hash_file(path: str, algo: str) -> int:
+    hasher = new_hasher(algo)
+    total = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            hasher.update(block)
+            total += len(block)
+    hasher.hexdigest()
+    return total
+
+
+def hash_buffer(buffer: memoryview, size: int, algo: str) -> int:
+    hasher = new_hasher(algo)
+    for offset in range(0, size, HASH_BLOCK_SIZE):
+        hasher.update(buffer[offset:min(offset + HASH_BLOCK_SIZE, size)])
+    hasher.hexdigest()
+    return size
+
+
+def run(args: argparse.Namespace) -> int:
+    rng = random.Random(args.seed)
+    algos = args.algos or list(HASH_ALGORITHMS)
+    missing = [algo for algo in algos if algo not in HASH_ALGORITHMS]
+    if missing:
+        print(f"⚠ Indisponíveis (pip install blake3 xxhash): {', '.join(missing)}")
+        algos = [algo for algo in algos if algo in HASH_ALGORITHMS]
+
+    folder = args.folder
+    use_disk = not args.synthetic and folder is not None and folder.is_dir()
+    if use_disk:
+        all_files = collect_files(folder)
+        if not all_files:
+            print(f"⚠ Nenhuma mídia em {folder}, usando distribuição sintética")
+            use_disk = False
+
+    if use_disk:
+        catalog_bytes = sum(size for _, size in all_files)
+        sample = rng.sample(all_files, min(args.samples, len(all_files)))
+        print(f"Acervo: {len(all_files)} arquivos, {catalog_bytes / 1024 ** 3:.2f} GB; amostra de {len(sample)}")
+        # Aquecimento: deixa a amostra no page cache para medir só o custo de CPU do hash
+        for path, _ in sample:
+            with open(path, 'rb') as f:
+                while f.read(HASH_BLOCK_SIZE):
+                    pass
+        items = [(size, path) for path, size in sample]
+    else:
+        sizes = synthetic_sizes(args.samples, rng)
+        catalog_bytes = sum(sizes)
+        print(f"Distribuição sintética: {len(sizes)} arquivos, {catalog_bytes / 1024 ** 3:.2f} GB")
+        buffer = memoryview(rng.randbytes(max(sizes)))
+        items = [(size, None) for size in sizes]
+
+    results: Dict[str, Dict[str, Tuple[int, float]]] = {}
+    for algo in algos:
+        per_bucket: Dict[str, List[float]] = {}
+        best_total = None
+        for _ in range(args.repeat):
+            bucket_totals: Dict[str, List[float]] = {}
+            start_all = time.perf_counter()
+            for size, path in items:
+                start = time.perf_counter()
+                hashed = hash_file(path, algo) if path else hash_buffer(buffer, size, algo)
+                elapsed = time.perf_counter() - start
+                entry = bucket_totals.setdefault(bucket_for(size), [0, 0.0])
+                entry[0] += hashed
+                entry[1] += elapsed
+            total_elapsed = time.perf_counter() - start_all
+            if best_total is None or total_elapsed < best_total:
+                best_total = total_elapsed
+                per_bucket = bucket_totals
+        results[algo] = {name: (int(v[0]), v[1]) for name, v in per_bucket.items()}
+        results[algo]["__total__"] = (sum(v[0] for v in per_bucket.values()), best_total or 0.0)
+
+    bucket_names = [name for name, _ in BUCKETS if any(name in r for r in results.values())]
+    header = f"{'algoritmo':<10}" + "".join(f"{name:>12}" for name in bucket_names) + f"{'total MB/s':>12}{'acervo (s)':>12}"
+    print("\n" + "=" * len(header))
+    print("Throughput em MB/s por faixa de tamanho (melhor de %d)" % args.repeat)
+    print(header)
+    print("-" * len(header))
+    baseline = None
+    for algo, data in results.items():
+        row = f"{algo:<10}"
+        for name in bucket_names:
+            size, elapsed = data.get(name, (0, 0.0))
+            row += f"{(size / elapsed / 1024 ** 2 if elapsed else 0):>12.1f}"
+        total_size, total_elapsed = data["__total__"]
+        mbps = total_size / total_elapsed / 1024 ** 2 if total_elapsed else 0.0
+        projected = catalog_bytes / (mbps * 1024 ** 2) if mbps else 0.0
+        row += f"{mbps:>12.1f}{projected:>12.1f}"
+        print(row)
+        if algo == "sha256":
+            baseline = mbps
+    print("-" * len(header))
+    if baseline:
+        for algo, data in results.items():
+            total_size, total_elapsed = data["__total__"]
+            mbps = total_size / total_elapsed / 1024 ** 2 if total_elapsed else 0.0
+            print(f"{algo:<10} {mbps / baseline:>5.1f}x vs sha256")
+    print("=" * len(header))
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compara algoritmos de hash na distribuição de tamanhos do acervo")
+    parser.add_argument("--folder", type=Path, default=None, help="Pasta de modelos a amostrar")
+    parser.add_argument("--synthetic", action="store_true", help="Força a distribuição sintética (em memória)")
+    parser.add_argument("--samples", type=int, default=200, help="Arquivos amostrados (default: 200)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições; vale a melhor (default: 3)")
+    parser.add_argument("--algos", nargs="*", default=None, help=f"Algoritmos (default: {' '.join(HASH_ALGORITHMS)})")
+    parser.add_argument("--seed", type=int, default=1234, help="Semente da amostragem (default: 1234)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    return run(parse_args(argv))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,23 +1,60 @@
 import argparse
+import asyncio
 import functools
 import gzip
-import hashlib
 import http.server
+import io
 import json
 import os
 import queue
-import random
 import shutil
+import socket
 import socketserver
+import sys
 import threading
 import time
-from collections import defaultdict
+import weakref
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from urllib.parse import parse_qs, urlparse
-from typing import Optional, Tuple, Dict, List, Any
+from urllib.parse import parse_qs, quote, unquote, urlparse
+from typing import Optional, Dict, Any
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
-from core.verificar_duplicatas import find_duplicates
+from email.utils import formatdate, parsedate_to_datetime
+try:
+    import brotli
+except ImportError:  # Opcional: pip install brotli
+    brotli = None
+try:
+    import zstandard
+except ImportError:  # Opcional: pip install zstandard
+    zstandard = None
+from core.verificar_duplicatas import (
+    HASH_ALGORITHMS,
+    HASH_BLOCK_SIZE,
+    directory_snapshot,
+    files_are_identical,
+    find_duplicates,
+    get_bytes_read,
+    get_cache_stats,
+    get_cached_hash,
+    get_hash_algorithm,
+    load_cache,
+    load_scan_results,
+    new_hasher,
+    save_scan_results,
+    set_hash_algorithm,
+)
+from core.hash_store import default_cache_path
+from core.catalog_index import MEDIA_KINDS, MEDIA_SORTS, CatalogIndex, MediaListing, scan_model_dir
+from core.catalog_watcher import CatalogWatcher
+from core.deduplicar import LINK_MODES, dedup_groups
+from core.verificar_similares import DEFAULT_THRESHOLD, SIMILARITY_AVAILABLE, find_similar
+from core.thumbnails import (
+    DEFAULT_THUMB_SIZE, THUMBNAILS_AVAILABLE, VIDEO_EXTENSIONS, ThumbnailCache, media_dimensions, snap_size,
+)
+from core.static_assets import StaticAssets
 
 
 DEFAULT_PORT = 8008
@@ -30,102 +67,404 @@ else:
     DEFAULT_MODELS_DIR = Path.home() / "Hey_Felphs Archive-Downloader"
 
 # Configurações de cache otimizadas
-CACHE_TTL = 1800  # 30 minutos
+CACHE_TTL = 6 * 3600  # 6 horas: o watcher invalida as chaves afetadas assim que o disco muda
 CACHE_CLEANUP_INTERVAL = 300  # 5 minutos
 MAX_CACHE_SIZE = 1000  # Máximo de entradas no cache
+MODELS_CACHE_BYTES = 32 * 1024 * 1024  # Orçamento de memória das listas de sites/modelos
+MEDIA_CACHE_BYTES = 128 * 1024 * 1024  # Orçamento das listas de mídia (um modelo pode ter 50k arquivos)
+RESPONSE_CACHE_BYTES = 64 * 1024 * 1024  # Orçamento das respostas JSON já serializadas/comprimidas
+MEDIA_FIELDS = ("size", "mtime", "dimensions", "thumb")  # Campos opcionais de /api/model (?fields=)
 SCAN_CHUNK_SIZE = 500  # Processar arquivos em chunks durante scan
+INDEX_SAFETY_REFRESH = 900  # Passada completa do índice (rede de segurança do watcher)
+SCAN_RESULTS_MAX_AGE = 7 * 24 * 3600  # Resultado salvo de duplicatas mais velho que isso é refeito
+SCAN_PERSIST_DELAY = 2.0  # Exclusões em sequência gravam o resultado uma vez só, após esse silêncio
+BATCH_DELETE_MAX = 10000  # Caminhos aceitos por chamada de /api/delete_batch
+BATCH_DELETE_WORKERS = 4  # unlink em paralelo (ajuda em discos de rede e NAS)
+BATCH_EVENT_ITEMS = 200  # Resultados por evento do stream (a fila do cliente SSE tem 1000 posições)
+BATCH_EVENT_INTERVAL = 0.25  # Segundos máximos entre eventos de progresso do lote
+
+# Núcleos do servidor
+SERVER_MODES = ("async", "threaded")
+THREAD_POOL_WORKERS = 32  # Modo threaded: conexões atendidas ao mesmo tempo (keep-alive e SSE ocupam um worker)
+THREAD_POOL_QUEUE = 128  # Modo threaded: conexões aceitas esperando worker (acima disso: 503)
+ASYNC_MAX_CONNECTIONS = 512  # Conexões simultâneas (acima disso: 503 com Retry-After)
+ASYNC_HANDLER_WORKERS = 16  # Threads para a lógica síncrona dos handlers (SQLite, JSON, exclusões)
+KEEPALIVE_TIMEOUT = 15  # Segundos de ociosidade antes de fechar uma conexão keep-alive
+MAX_REQUEST_HEAD = 64 * 1024
+MAX_REQUEST_BODY = 16 * 1024 * 1024  # Corpos de POST (listas de arquivos a excluir/deduplicar)
+SSE_KEEPALIVE = 15  # Comentário ": keep-alive" enviado ao cliente SSE sem eventos
 
 # Caches globais com estrutura melhorada
 @dataclass
 class CacheEntry:
-    """Entrada de cache com timestamp"""
+    """Entrada de cache com timestamp e tamanho estimado em bytes"""
     data: Any
     timestamp: float
-    
+    size: int = 0
+
     def is_expired(self, ttl: int = CACHE_TTL) -> bool:
         return time.time() - self.timestamp > ttl
 
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Estimativa do tamanho em memória (listas de nomes, dicts de modelos, payloads)"""
+    size = sys.getsizeof(value)
+    if _depth >= 4:
+        return size
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _depth + 1) for item in value)
+    return size
+
+
 class CacheManager:
-    """Gerenciador de cache thread-safe com limpeza automática"""
-    def __init__(self, max_size: int = MAX_CACHE_SIZE, ttl: int = CACHE_TTL):
-        self._cache: Dict[str, CacheEntry] = {}
+    """Cache LRU thread-safe com TTL, limite de entradas e orçamento de bytes
+
+    get/set/delete são O(1) (OrderedDict); entradas expiradas saem na leitura ou pelo
+    reaper em segundo plano, nunca por varredura dentro do get().
+    """
+    _instances: "weakref.WeakSet[CacheManager]" = weakref.WeakSet()
+    _reaper_started = False
+
+    def __init__(self, max_size: int = MAX_CACHE_SIZE, ttl: int = CACHE_TTL, max_bytes: int = 0):
+        self._cache: "OrderedDict[str, CacheEntry]" = OrderedDict()
         self._lock = threading.RLock()
         self.max_size = max_size
+        self.max_bytes = max_bytes  # 0 = sem limite de bytes
         self.ttl = ttl
-        self._last_cleanup = time.time()
-    
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        CacheManager._instances.add(self)
+
     def get(self, key: str) -> Optional[Any]:
-        """Obtém valor do cache se válido"""
+        """Obtém valor do cache se válido (e o marca como usado recentemente)"""
         with self._lock:
-            self._maybe_cleanup()
             entry = self._cache.get(key)
-            if entry and not entry.is_expired(self.ttl):
-                return entry.data
-            elif entry:
-                del self._cache[key]
-            return None
-    
-    def set(self, key: str, value: Any) -> None:
-        """Define valor no cache"""
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.is_expired(self.ttl):
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return entry.data
+
+    def set(self, key: str, value: Any, size: int | None = None) -> None:
+        """Define valor no cache, removendo os menos usados se passar dos limites"""
+        if size is None:
+            size = estimate_size(value)
         with self._lock:
-            if len(self._cache) >= self.max_size:
-                self._evict_oldest()
-            self._cache[key] = CacheEntry(data=value, timestamp=time.time())
-    
+            self._remove(key)
+            if self.max_bytes and size > self.max_bytes:
+                return  # Maior que o orçamento inteiro: não vale expulsar todo o resto
+            self._cache[key] = CacheEntry(data=value, timestamp=time.time(), size=size)
+            self._bytes += size
+            while len(self._cache) > self.max_size or (self.max_bytes and self._bytes > self.max_bytes):
+                _, evicted = self._cache.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
     def delete(self, key: str) -> None:
         """Remove entrada do cache"""
         with self._lock:
-            self._cache.pop(key, None)
-    
+            self._remove(key)
+
+    def delete_prefix(self, prefix: str) -> None:
+        """Remove todas as entradas cuja chave começa com o prefixo"""
+        with self._lock:
+            for key in [k for k in self._cache if k.startswith(prefix)]:
+                self._remove(key)
+
     def clear(self) -> None:
         """Limpa todo o cache"""
         with self._lock:
             self._cache.clear()
-    
-    def _maybe_cleanup(self) -> None:
-        """Limpa entradas expiradas periodicamente"""
-        now = time.time()
-        if now - self._last_cleanup > CACHE_CLEANUP_INTERVAL:
-            expired_keys = [k for k, v in self._cache.items() if v.is_expired(self.ttl)]
-            for key in expired_keys:
-                del self._cache[key]
-            self._last_cleanup = now
-    
-    def _evict_oldest(self) -> None:
-        """Remove a entrada mais antiga do cache"""
-        if not self._cache:
+            self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def reap_expired(self) -> int:
+        """Remove entradas expiradas; chamado pelo reaper, fora do caminho das requisições"""
+        with self._lock:
+            expired = [k for k, v in self._cache.items() if v.is_expired(self.ttl)]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+            return len(expired)
+
+    @classmethod
+    def start_reaper(cls, interval: int = CACHE_CLEANUP_INTERVAL) -> None:
+        """Inicia (uma única vez) a thread que expira entradas de todos os caches"""
+        if cls._reaper_started:
             return
-        oldest_key = min(self._cache.items(), key=lambda x: x[1].timestamp)[0]
-        del self._cache[oldest_key]
-    
-    def get_stats(self) -> Dict[str, int]:
+        cls._reaper_started = True
+
+        def loop() -> None:
+            while True:
+                time.sleep(interval)
+                for cache in list(cls._instances):
+                    cache.reap_expired()
+
+        threading.Thread(target=loop, name="cache-reaper", daemon=True).start()
+
+    def get_stats(self) -> Dict[str, Any]:
         """Retorna estatísticas do cache"""
         with self._lock:
+            lookups = self.hits + self.misses
             return {
                 "size": len(self._cache),
                 "max_size": self.max_size,
-                "ttl": self.ttl
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
             }
 
+COMPRESS_MIN_BYTES = 1024  # Respostas menores vão sem compressão
+# Compressores por Content-Encoding, em ordem de preferência (brotli/zstd só se instalados)
+COMPRESSORS = {}
+if brotli is not None:
+    COMPRESSORS["br"] = lambda data: brotli.compress(data, quality=5)
+if zstandard is not None:
+    COMPRESSORS["zstd"] = lambda data: zstandard.ZstdCompressor(level=3).compress(data)
+COMPRESSORS["gzip"] = lambda data: gzip.compress(data, compresslevel=6)
+
+
+class EncodedJSON:
+    """Resposta JSON serializada uma vez, com as versões comprimidas guardadas junto
+
+    No cache de respostas as compressões são feitas na gravação (precompress), então um
+    acerto só copia bytes para o socket: nem json.dumps nem gzip por requisição.
+    """
+    __slots__ = ("identity", "etag", "_encoded")
+
+    def __init__(self, data: Any, etag: str | None = None):
+        self.identity = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.etag = etag
+        self._encoded: Dict[str, bytes] = {}
+
+    def body(self, encoding: str) -> tuple[str, bytes]:
+        """(Content-Encoding, bytes) para a codificação escolhida pelo cliente"""
+        if encoding not in COMPRESSORS or len(self.identity) <= COMPRESS_MIN_BYTES:
+            return "identity", self.identity
+        payload = self._encoded.get(encoding)
+        if payload is None:
+            payload = self._encoded[encoding] = COMPRESSORS[encoding](self.identity)
+        return encoding, payload
+
+    def precompress(self) -> "EncodedJSON":
+        for encoding in COMPRESSORS:
+            self.body(encoding)
+        return self
+
+    @property
+    def size(self) -> int:
+        return 128 + len(self.identity) + sum(len(payload) for payload in self._encoded.values())
+
+
 # Instâncias de cache
-models_cache = CacheManager(max_size=500, ttl=CACHE_TTL)
-model_info_cache = CacheManager(max_size=2000, ttl=CACHE_TTL)
-media_list_cache = CacheManager(max_size=1000, ttl=CACHE_TTL)
+models_cache = CacheManager(max_size=500, ttl=CACHE_TTL, max_bytes=MODELS_CACHE_BYTES)
+media_list_cache = CacheManager(max_size=1000, ttl=CACHE_TTL, max_bytes=MEDIA_CACHE_BYTES)
+# (largura, altura) por arquivo; a chave inclui o mtime, então não precisa de invalidação
+dimensions_cache = CacheManager(max_size=50000, ttl=CACHE_TTL, max_bytes=8 * 1024 * 1024)
+# Respostas prontas (EncodedJSON) por "<chave de dados>?<parâmetros>"; invalidadas junto com os dados
+response_cache = CacheManager(max_size=2000, ttl=CACHE_TTL, max_bytes=RESPONSE_CACHE_BYTES)
+
+
+def invalidate_catalog(site: str | None, model: str | None = None, catalog_index: CatalogIndex | None = None) -> None:
+    """Atualiza o índice e invalida só as chaves de cache afetadas por uma mudança no disco
+
+    model=None: a lista de modelos do site mudou; site=None: revalida tudo.
+    """
+    reset_scan_freshness()
+    if site is None:
+        if catalog_index is not None:
+            catalog_index.refresh()
+        models_cache.clear()
+        media_list_cache.clear()
+        response_cache.clear()
+        return
+
+    if catalog_index is not None:
+        if model is None:
+            catalog_index.refresh_site(site)
+        else:
+            catalog_index.refresh_model(site, model)
+    models_cache.delete("sites_list")
+    models_cache.delete(f"models_{site}")
+    response_cache.delete_prefix("sites_list?")
+    response_cache.delete_prefix(f"models_{site}?")
+    response_cache.delete_prefix("search?")
+    if model is None:
+        media_list_cache.delete_prefix(f"media_{site}_")
+        response_cache.delete_prefix(f"media_{site}_")
+    else:
+        media_list_cache.delete(f"media_{site}_{model}")
+        response_cache.delete_prefix(f"media_{site}_{model}?")
 
 # Estado de scan de duplicatas
 scan_progress = {"current": 0, "total": 0, "is_scanning": False, "cancel_requested": False, "cancelled": False}
 scan_results = None
+scan_snapshot: dict | None = None  # {pasta: mtime_ns} da árvore quando scan_results foi gerado
+scan_fresh: bool | None = None  # Última comparação do retrato com o disco; None = comparar de novo
+scan_persist_timer: threading.Timer | None = None
 scan_lock = threading.Lock()
 scan_listeners: list[queue.Queue] = []
 scan_listeners_lock = threading.Lock()
-HASH_CACHE_FILE = "duplicates_cache.json"
+
+
+def load_persisted_scan(models_dir: Path) -> None:
+    """Carrega o último resultado de duplicatas salvo, para não refazer o scan a cada reinício"""
+    global scan_results, scan_snapshot, scan_fresh
+    stored = load_scan_results(models_dir)
+    if not stored:
+        return
+    with scan_lock:
+        scan_results, scan_snapshot = stored
+        scan_fresh = None
+    print(f"[INFO] Resultado de duplicatas carregado: {scan_results.get('duplicate_groups', 0)} grupos "
+          f"(scan de {datetime.fromtimestamp(scan_results.get('scanned_at', 0)):%d/%m/%Y %H:%M})")
+
+
+def persist_scan_results(models_dir: Path, delay: float = 0) -> None:
+    """Grava scan_results (com delay, agrupa várias exclusões seguidas numa gravação só)"""
+    global scan_persist_timer
+
+    def save() -> None:
+        with scan_lock:
+            if not scan_results or "error" in scan_results or scan_snapshot is None:
+                return
+            results = json.loads(json.dumps(scan_results))
+            snapshot = dict(scan_snapshot)
+        save_scan_results(models_dir, results, snapshot)
+
+    with scan_lock:
+        if scan_persist_timer is not None:
+            scan_persist_timer.cancel()
+            scan_persist_timer = None
+        if delay > 0:
+            scan_persist_timer = threading.Timer(delay, save)
+            scan_persist_timer.daemon = True
+            scan_persist_timer.start()
+            return
+    save()
+
+
+def scan_results_fresh(models_dir: Path, recheck: bool = False) -> bool:
+    """True se o resultado salvo ainda descreve a árvore (nenhuma pasta mudou) e não está velho
+
+    Percorrer a árvore é caro: sem recheck, reaproveita a última comparação até o watcher
+    (invalidate_catalog) avisar de uma mudança. /api/scan_stream sempre compara de novo.
+    """
+    global scan_fresh
+    with scan_lock:
+        if not scan_results or "error" in scan_results or scan_snapshot is None:
+            return False
+        scanned_at = scan_results.get("scanned_at", 0)
+        snapshot = scan_snapshot
+        cached = scan_fresh
+    if time.time() - scanned_at > SCAN_RESULTS_MAX_AGE:
+        return False
+    if cached is not None and not recheck:
+        return cached
+    fresh = directory_snapshot(models_dir) == snapshot
+    with scan_lock:
+        if scan_snapshot is snapshot:
+            scan_fresh = fresh
+    return fresh
+
+
+def reset_scan_freshness() -> None:
+    """Descarta a última comparação do retrato (algo mudou no disco)"""
+    global scan_fresh
+    with scan_lock:
+        scan_fresh = None
+
+
+def forget_scanned_files(models_dir: Path, rel_paths) -> None:
+    """Tira arquivos removidos pelo catálogo do resultado salvo, sem exigir novo scan"""
+    removed = {os.path.normpath(path) for path in rel_paths}
+    if not removed:
+        return
+    with scan_lock:
+        if not scan_results or "error" in scan_results:
+            return
+        groups = []
+        for group in scan_results.get("duplicates", []):
+            files = [path for path in group["files"] if os.path.normpath(path) not in removed]
+            if len(files) < 2:
+                continue
+            groups.append({**group, "files": files, "count": len(files), "waste": group["size"] * (len(files) - 1)})
+        scan_results["duplicates"] = groups
+        scan_results["duplicate_groups"] = len(groups)
+        scan_results["total_waste_bytes"] = sum(group["waste"] for group in groups)
+    refresh_snapshot_folders(models_dir, removed)
+    persist_scan_results(models_dir, delay=SCAN_PERSIST_DELAY)
+
+
+def refresh_snapshot_folders(models_dir: Path, rel_paths) -> None:
+    """Relê o mtime das pastas alteradas pelo próprio catálogo (exclusão, links), mantendo o retrato"""
+    with scan_lock:
+        if scan_snapshot is None:
+            return
+        for folder in {os.path.dirname(os.path.normpath(path)) or "." for path in rel_paths}:
+            if folder not in scan_snapshot:
+                continue
+            try:
+                scan_snapshot[folder] = os.stat(models_dir / folder).st_mtime_ns
+            except OSError:
+                scan_snapshot.pop(folder, None)
+
+# Busca por similares (hash perceptual), com estado e ouvintes SSE próprios
+similar_progress = {"current": 0, "total": 0, "is_scanning": False, "cancel_requested": False}
+similar_results = None
+similar_listeners: list[queue.Queue] = []
 
 
 class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
-    def __init__(self, *args, directory: str | None = None, models_dir: Path | None = None, **kwargs):
+    # HTTP/1.1: a grade de miniaturas reaproveita as conexões em vez de abrir uma por arquivo
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT  # Conexão ociosa libera o worker do pool
+    disable_nagle_algorithm = True  # Cabeçalhos e corpo saem em writes separados: sem isso, +40ms (delayed ACK)
+
+    def __init__(
+        self,
+        *args,
+        directory: str | None = None,
+        models_dir: Path | None = None,
+        catalog_index: CatalogIndex | None = None,
+        catalog_watcher: CatalogWatcher | None = None,
+        thumbnails: ThumbnailCache | None = None,
+        static_assets: StaticAssets | None = None,
+        **kwargs,
+    ):
         self.models_dir = models_dir
+        self.catalog_index = catalog_index
+        self.catalog_watcher = catalog_watcher
+        self.thumbnails = thumbnails
+        self.static_assets = static_assets
         super().__init__(*args, directory=directory, **kwargs)
 
+    def _index(self) -> CatalogIndex | None:
+        """Índice do catálogo (construído na primeira consulta)"""
+        if self.catalog_index is not None:
+            self.catalog_index.ensure_built()
+        return self.catalog_index
+
     def handle_one_request(self) -> None:
         """Override para tratar ConnectionResetError silenciosamente"""
         try:
@@ -150,10 +489,13 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
             self._handle_model(parsed.query)
             return
         if parsed.path == "/api/scan_duplicates":
-            self._handle_scan_duplicates()
+            self._handle_scan_duplicates(parsed.query)
             return
         if parsed.path == "/api/scan_stream":
-            self._handle_scan_stream()
+            self._handle_scan_stream(parsed.query)
+            return
+        if parsed.path == "/api/scan_similar":
+            self._handle_scan_similar(parsed.query)
             return
         if parsed.path == "/api/scan_progress":
             self._handle_scan_progress()
@@ -161,14 +503,47 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
         if parsed.path == "/api/cache_stats":
             self._handle_cache_stats()
             return
+        if parsed.path == "/api/clear_cache":
+            self._handle_clear_cache()
+            return
         if parsed.path == "/api/search":
             self._handle_search(parsed.query)
             return
         if parsed.path.startswith("/media/"):
             self._handle_media(parsed.path)
             return
+        if parsed.path.startswith("/thumb/"):
+            self._handle_thumb(parsed.path, parsed.query)
+            return
+        if self._handle_static(unquote(parsed.path)):
+            return
         super().do_GET()
 
+    def _handle_static(self, url_path: str) -> bool:
+        """Serve HTML/JS/CSS da UI pré-comprimidos; False deixa o arquivo para o SimpleHTTPRequestHandler"""
+        if self.static_assets is None:
+            return False
+        asset, fingerprinted = self.static_assets.resolve(url_path)
+        if asset is None:
+            return False
+        # Nome com hash nunca muda de conteúdo; o resto (HTML incluso) revalida a cada uso via ETag
+        cache_control = "public, max-age=31536000, immutable" if fingerprinted else "no-cache"
+        if self._not_modified(asset.etag):
+            return True
+        encoding = self._preferred_encoding(asset.variants)
+        payload = asset.variants[encoding]
+        self.send_response(200)
+        self.send_header("Content-Type", asset.content_type)
+        if encoding != "identity":
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Cache-Control", cache_control)
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("ETag", asset.etag)
+        self.end_headers()
+        self.wfile.write(payload)
+        return True
+
     def do_POST(self) -> None:
         parsed = urlparse(self.path)
         if parsed.path == "/api/delete_model":
@@ -180,33 +555,33 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
         if parsed.path == "/api/delete_duplicate":
             self._handle_delete_duplicate()
             return
+        if parsed.path == "/api/delete_batch":
+            self._handle_delete_batch()
+            return
         if parsed.path == "/api/cancel_scan":
-            self._handle_cancel_scan()
+            self._handle_cancel_scan(parsed.query)
+            return
+        if parsed.path == "/api/dedup_link":
+            self._handle_dedup_link()
             return
         self.send_error(404, "Not found")
 
     def _handle_sites(self) -> None:
         """Lista sites disponíveis com cache otimizado"""
+        etag = self._catalog_etag()
+        if self._not_modified(etag) or self._send_cached_response("sites_list?", etag):
+            return
+
         cache_key = "sites_list"
         cached = models_cache.get(cache_key)
         if cached is not None:
-            self._send_json({"sites": cached})
-            return
-
-        sites = []
-        if self.models_dir and self.models_dir.exists():
-            # Usar os.scandir() é mais rápido que iterdir()
-            with os.scandir(self.models_dir) as entries:
-                for entry in entries:
-                    if not entry.is_dir():
-                        continue
-                    # Contar modelos de forma otimizada
-                    model_count = sum(1 for d in os.scandir(entry.path) if d.is_dir())
-                    sites.append({"name": entry.name, "models": model_count})
-        
-        sites.sort(key=lambda x: x["name"])
+            self._send_json({"sites": cached}, etag=etag, cache_key="sites_list?")
+            return
+
+        index = self._index()
+        sites = index.list_sites() if index else []
         models_cache.set(cache_key, sites)
-        self._send_json({"sites": sites})
+        self._send_json({"sites": sites}, etag=etag, cache_key="sites_list?")
 
     def _handle_models(self, query: str) -> None:
         """Lista modelos de um site com cache otimizado e paginação"""
@@ -230,30 +605,18 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
         if limit < 0:
             limit = 0
 
+        etag = self._catalog_etag()
+        response_key = f"models_{safe_site}?page={page}&limit={limit}"
+        if self._not_modified(etag) or self._send_cached_response(response_key, etag):
+            return
+
         cache_key = f"models_{safe_site}"
         cached = models_cache.get(cache_key)
         if cached is not None:
             models = cached
         else:
-            models = []
-            if self.models_dir and self.models_dir.exists():
-                site_dir = self.models_dir / safe_site
-                if site_dir.exists() and site_dir.is_dir():
-                    # Processar modelos em batch para melhor performance
-                    with os.scandir(site_dir) as entries:
-                        model_entries = [(e.name, e.path) for e in entries if e.is_dir()]
-                    
-                    model_entries.sort(key=lambda x: x[0])
-                    
-                    for model_name, model_path in model_entries:
-                        thumb, img_count, vid_count = self._get_model_info_fast(Path(model_path))
-                        models.append({
-                            "name": model_name,
-                            "thumb": thumb,
-                            "image_count": img_count,
-                            "video_count": vid_count,
-                        })
-
+            index = self._index()
+            models = index.list_models(safe_site) if index else []
             models_cache.set(cache_key, models)
         
         # Aplicar paginação
@@ -266,6 +629,10 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
         else:
             models_page = models
             total_pages = 1
+
+        self._prefetch_thumbs(
+            f"{safe_site}/{item['name']}/{item['thumb']}" for item in models_page if item.get("thumb")
+        )
         
         response = {
             "site": safe_site,
@@ -277,10 +644,15 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
                 "total_pages": total_pages
             }
         }
-        self._send_json(response)
+        self._send_json(response, etag=etag, cache_key=response_key)
 
     def _handle_model(self, query: str) -> None:
-        """Obtém detalhes de um modelo com cache de lista de mídia e lazy loading"""
+        """Mídias de um modelo, paginadas por cursor e tipo, com ordenação e campos opcionais
+
+        Parâmetros: kind=image|video (padrão: ambos), sort=name|mtime|size, limit (por tipo;
+        images_limit/videos_limit sobrescrevem), images_cursor/videos_cursor (o next_cursor da
+        página anterior) e fields=size,mtime,dimensions,thumb. Sem fields, os itens são só nomes.
+        """
         params = parse_qs(query)
         site = (params.get("site") or [""])[0].strip()
         model = (params.get("model") or [""])[0].strip()
@@ -290,91 +662,171 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
             self._send_json({"error": "invalid_params"}, status=400)
             return
 
-        # Parâmetros de lazy loading
+        kind = (params.get("kind") or ["all"])[0]
+        kinds = MEDIA_KINDS if kind not in MEDIA_KINDS else (kind,)
+        sort = (params.get("sort") or ["name"])[0]
+        fields = {f for f in ",".join(params.get("fields") or []).split(",") if f in MEDIA_FIELDS}
+        if sort not in MEDIA_SORTS:
+            self._send_json({"error": "invalid_sort", "sorts": list(MEDIA_SORTS)}, status=400)
+            return
+
+        # Paginação (0 = sem limite)
         try:
-            images_limit = int((params.get("images_limit") or ["0"])[0])  # 0 = sem limite
-            videos_limit = int((params.get("videos_limit") or ["0"])[0])  # 0 = sem limite
+            limit = int((params.get("limit") or ["0"])[0])
+            limits = {
+                "image": int((params.get("images_limit") or [limit])[0]),
+                "video": int((params.get("videos_limit") or [limit])[0]),
+            }
         except ValueError:
-            images_limit = 0
-            videos_limit = 0
+            limits = {"image": 0, "video": 0}
+        cursors = {
+            "image": (params.get("images_cursor") or [None])[0],
+            "video": (params.get("videos_cursor") or [None])[0],
+        }
 
         if not self.models_dir:
             self._send_json({"error": "models_dir_missing"}, status=404)
             return
 
+        # Um stat na pasta do modelo basta para saber se o índice (e a ETag) está em dia
+        index = self._index()
+        if index and index.model_changed(safe_site, safe_model):
+            invalidate_catalog(safe_site, safe_model, index)
+        etag = self._catalog_etag()
+        response_key = f"media_{safe_site}_{safe_model}?{self._normalized_query(params, exclude=('site', 'model'))}"
+        if self._not_modified(etag) or self._send_cached_response(response_key, etag):
+            return
+
         model_dir = self.models_dir / safe_site / safe_model
-        if not model_dir.exists() or not model_dir.is_dir():
+        if not model_dir.is_dir():
             self._send_json({"error": "model_not_found"}, status=404)
             return
 
-        # Cache de lista de mídia
+        # Cache da listagem (com as visões ordenadas já montadas)
         cache_key = f"media_{safe_site}_{safe_model}"
-        cached = media_list_cache.get(cache_key)
-        
-        if cached is not None:
-            images, videos = cached
-        else:
-            images, videos = self._list_media_files_fast(model_dir)
-            media_list_cache.set(cache_key, (images, videos))
-        
-        # Aplicar lazy loading
-        total_images = len(images)
-        total_videos = len(videos)
-        
-        if images_limit > 0:
-            images = images[:images_limit]
-        if videos_limit > 0:
-            videos = videos[:videos_limit]
-        
-        self._send_json({
+        listing = media_list_cache.get(cache_key)
+        if listing is None:
+            listing = index.media_listing(safe_site, safe_model) if index else MediaListing(scan_model_dir(model_dir))
+            media_list_cache.set(cache_key, listing, size=listing.estimated_size())
+
+        response = {
             "site": safe_site,
             "model": safe_model,
-            "images": images,
-            "videos": videos,
-            "total_images": total_images,
-            "total_videos": total_videos,
-        })
+            "sort": sort,
+            "images": [],
+            "videos": [],
+            "total_images": listing.count("image"),
+            "total_videos": listing.count("video"),
+            "next_cursor": {"images": None, "videos": None},
+        }
+        prefetch = []
+        for media_kind in kinds:
+            key = f"{media_kind}s"
+            try:
+                entries, next_cursor = listing.page(media_kind, sort, cursors[media_kind], max(limits[media_kind], 0))
+            except ValueError:
+                self._send_json({"error": "invalid_cursor"}, status=400)
+                return
+            response[key] = [self._project_media(safe_site, safe_model, entry, fields) for entry in entries]
+            response["next_cursor"][key] = next_cursor
+            prefetch.extend(f"{safe_site}/{safe_model}/{entry[0]}" for entry in entries)
+
+        self._prefetch_thumbs(prefetch)
+        self._send_json(response, etag=etag, cache_key=response_key)
+
+    def _project_media(self, site: str, model: str, entry: tuple, fields: set[str]) -> str | dict:
+        """Item da lista de mídia: só o nome, ou um objeto com os campos pedidos"""
+        name, _, size, mtime_ns = entry
+        if not fields:
+            return name
+        item: Dict[str, Any] = {"name": name}
+        if "size" in fields:
+            item["size"] = size
+        if "mtime" in fields:
+            item["mtime"] = mtime_ns / 1e9
+        if "thumb" in fields:
+            item["thumb"] = f"/thumb/{quote(site)}/{quote(model)}/{quote(name)}"
+        if "dimensions" in fields:
+            cache_key = f"{site}/{model}/{name}|{mtime_ns}"
+            dimensions = dimensions_cache.get(cache_key)
+            if dimensions is None:
+                dimensions = media_dimensions(str(self.models_dir / site / model / name)) or ()
+                dimensions_cache.set(cache_key, dimensions, size=64)
+            item["dimensions"] = list(dimensions) or None
+        return item
 
     def _handle_media(self, path: str) -> None:
         """Serve arquivos de mídia com cache HTTP"""
-        # Remove o prefixo /media/
-        if not path.startswith("/media/"):
-            self.send_error(404, "File not found")
+        file_path = self._resolve_media_path(path[len("/media/"):])
+        if file_path is None:
             return
-        
-        rel_path = path[7:]  # Remove "/media/"
-        
-        if not rel_path:
-            self.send_error(404, "File not found")
+        self._send_file(file_path)
+
+    def _handle_thumb(self, path: str, query: str) -> None:
+        """Serve a miniatura (WebP/JPEG) de uma mídia, gerada sob demanda e cacheada em disco"""
+        file_path = self._resolve_media_path(path[len("/thumb/"):])
+        if file_path is None:
             return
-        
-        if not self.models_dir:
+
+        params = parse_qs(query)
+        try:
+            size = int((params.get("w") or [str(DEFAULT_THUMB_SIZE)])[0])
+        except ValueError:
+            size = DEFAULT_THUMB_SIZE
+
+        # Validadores vêm do original: a miniatura em disco tem o mtime tocado a cada leitura
+        try:
+            validators = self._file_validators(file_path.stat(), suffix=f"w{snap_size(size)}")
+        except OSError:
             self.send_error(404, "File not found")
             return
+        if self._not_modified(*validators):
+            return
+
+        thumb_path = self.thumbnails.get(str(file_path), size) if self.thumbnails else None
+        if thumb_path is None:
+            if file_path.suffix.lower() in VIDEO_EXTENSIONS:
+                self.send_error(404, "Thumbnail not available")
+            else:
+                # Sem Pillow/OpenCV (ou imagem que não decodifica): a grade ainda mostra o original
+                self._send_file(file_path)
+            return
+        self._send_file(Path(thumb_path), content_type=self.thumbnails.content_type, validators=validators)
+
+    def _prefetch_thumbs(self, rel_paths) -> None:
+        """Enfileira a pré-geração das miniaturas que a página vai pedir em seguida"""
+        if self.thumbnails is None or not self.models_dir:
+            return
+        self.thumbnails.prefetch(str(self.models_dir / rel_path) for rel_path in rel_paths)
+
+    def _resolve_media_path(self, rel_path: str) -> Path | None:
+        """Caminho absoluto de uma mídia dentro do models_dir (ou envia o erro e retorna None)"""
+        if not rel_path or not self.models_dir:
+            self.send_error(404, "File not found")
+            return None
         
         # Construir caminho do arquivo
         # Normalizar separadores para o sistema operacional
-        rel_path = rel_path.replace("/", os.sep)
+        rel_path = unquote(rel_path).replace("/", os.sep)
         file_path = self.models_dir / rel_path
         
         # Validar que o arquivo está dentro do models_dir
         try:
             file_path = file_path.resolve()
-            if not str(file_path).startswith(str(self.models_dir.resolve())):
+            if not file_path.is_relative_to(self.models_dir.resolve()):
                 print(f"[SECURITY] Tentativa de acesso fora do diretório: {file_path}")
                 self.send_error(403, "Forbidden")
-                return
+                return None
         except Exception as e:
             print(f"[ERROR] Erro ao resolver caminho de mídia: {e}")
             self.send_error(404, "File not found")
-            return
+            return None
         
-        if not file_path.exists() or not file_path.is_file():
+        if not file_path.is_file():
             print(f"[DEBUG] Arquivo de mídia não encontrado: {file_path}")
             self.send_error(404, "File not found")
-            return
-
-        self._send_file(file_path)
+            return None
+        return file_path
 
     def _handle_delete_model(self) -> None:
         """Deleta um modelo e limpa caches relacionados"""
@@ -410,9 +862,7 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
             return
 
         # Limpar caches relacionados
-        models_cache.delete(f"models_{safe_site}")
-        media_list_cache.delete(f"media_{safe_site}_{safe_model}")
-        models_cache.delete("sites_list")
+        invalidate_catalog(safe_site, safe_model, self.catalog_index)
 
         self._send_json({"status": "deleted"})
 
@@ -430,52 +880,42 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
             self._send_json({"results": []}, status=200)
             return
         
-        results = []
-        
-        # Determinar sites a buscar
+        site = None
         if site_filter:
-            safe_site = self._safe_site_name(site_filter)
-            if safe_site:
-                sites_to_search = [safe_site]
-            else:
-                sites_to_search = []
-        else:
-            # Buscar em todos os sites
-            with os.scandir(self.models_dir) as entries:
-                sites_to_search = [e.name for e in entries if e.is_dir()]
-        
-        # Buscar modelos que correspondem à query
-        for site in sites_to_search:
-            site_dir = self.models_dir / site
-            if not site_dir.exists() or not site_dir.is_dir():
-                continue
-            
-            with os.scandir(site_dir) as entries:
-                for entry in entries:
-                    if not entry.is_dir():
-                        continue
-                    
-                    # Verificar se o nome do modelo contém a query
-                    if search_query in entry.name.lower():
-                        # Obter informações do modelo
-                        thumb, img_count, vid_count = self._get_model_info_fast(Path(entry.path))
-                        results.append({
-                            "site": site,
-                            "name": entry.name,
-                            "thumb": thumb,
-                            "image_count": img_count,
-                            "video_count": vid_count,
-                        })
-        
-        # Ordenar resultados por relevância (modelos que começam com a query primeiro)
-        results.sort(key=lambda x: (not x["name"].lower().startswith(search_query), x["name"].lower()))
-        
+            site = self._safe_site_name(site_filter)
+            if not site:
+                self._send_json({"query": search_query, "site": site_filter, "results": [], "total": 0})
+                return
+
+        # Paginação igual à de /api/models (limit=0: todos os resultados)
+        try:
+            page = max(1, int((params.get("page") or ["1"])[0]))
+            limit = max(0, int((params.get("limit") or ["0"])[0]))
+        except ValueError:
+            page = 1
+            limit = 0
+
+        etag = self._catalog_etag()
+        response_key = f"search?{self._normalized_query(params)}"
+        if self._not_modified(etag) or self._send_cached_response(response_key, etag):
+            return
+
+        # Índice em memória: nome igual > prefixo > início de palavra > substring, depois nome
+        index = self._index()
+        results, total = index.search(search_query, site, offset=(page - 1) * limit, limit=limit) if index else ([], 0)
+
         self._send_json({
             "query": search_query,
             "site": site_filter if site_filter else "all",
             "results": results,
-            "total": len(results)
-        })
+            "total": total,
+            "pagination": {
+                "page": page,
+                "limit": limit,
+                "total": total,
+                "total_pages": (total + limit - 1) // limit if limit > 0 else 1,
+            },
+        }, etag=etag, cache_key=response_key)
 
     def _handle_delete_file(self) -> None:
         """Deleta um arquivo e limpa caches relacionados"""
@@ -513,20 +953,19 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
             return
 
         # Limpar caches relacionados
-        models_cache.delete(f"models_{safe_site}")
-        media_list_cache.delete(f"media_{safe_site}_{safe_model}")
+        invalidate_catalog(safe_site, safe_model, self.catalog_index)
 
         self._send_json({"status": "deleted"})
 
-    def _handle_scan_duplicates(self) -> None:
-        """Inicia verificação de duplicatas em thread separada com processamento otimizado"""
+    def _handle_scan_duplicates(self, query: str = "") -> None:
+        """Inicia verificação de duplicatas em thread separada (incremental; ?full=1 refaz tudo)"""
         global scan_progress, scan_results
         
         if not self.models_dir or not self.models_dir.exists():
             self._send_json({"error": "models_dir_missing"}, status=404)
             return
         
-        start_error = self._start_scan_thread()
+        start_error = self._start_scan_thread(full=self._wants_full_scan(query))
         if start_error:
             self._send_json({"error": start_error}, status=409 if start_error == "scan_in_progress" else 404)
             return
@@ -534,9 +973,13 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
         # Retornar resposta imediata
         self._send_json({"status": "started", "message": "Scan iniciado com processamento otimizado"})
     
-    def _run_scan_duplicates_optimized(self) -> None:
+    @staticmethod
+    def _wants_full_scan(query: str) -> bool:
+        return parse_qs(query).get("full", ["0"])[0] in ("1", "true")
+
+    def _run_scan_duplicates_optimized(self, full: bool = False) -> None:
         """Executa scan de duplicatas usando o verificador compartilhado"""
-        global scan_progress, scan_results
+        global scan_progress, scan_results, scan_snapshot, scan_fresh
         
         print("[INFO] Iniciando scan de duplicatas otimizado...")
         
@@ -552,6 +995,9 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
             scan_progress["cancelled"] = False
             scan_results = None
 
+        # Retrato das pastas antes de listar: mudanças durante o scan deixam o resultado desatualizado
+        snapshot = directory_snapshot(self.models_dir)
+
         def cancel_check() -> bool:
             with scan_lock:
                 return scan_progress.get("cancel_requested", False)
@@ -568,10 +1014,20 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
             payload = {
                 "type": "progress",
                 "phase": info.get("phase"),
+                "stage": info.get("stage"),
                 "current": int(info.get("current", 0)),
                 "total": int(info.get("total", 0)),
                 "files_scanned": int(info.get("files_scanned", 0)),
-                "total_candidates": int(info.get("total_candidates", 0))
+                "total_candidates": int(info.get("total_candidates", 0)),
+                "reused_groups": int(info.get("reused_groups", 0)),
+                "cache_hits": int(info.get("cache_hits", 0)),
+                "cache_misses": int(info.get("cache_misses", 0)),
+                "bytes_read": info.get("bytes_read") or {},
+                "units_done": int(info.get("units_done", 0)),
+                "units_total": int(info.get("units_total", 0)),
+                "bytes_done": int(info.get("bytes_done", 0)),
+                "bytes_total": int(info.get("bytes_total", 0)),
+                "eta_seconds": info.get("eta_seconds"),
             }
             self._broadcast_scan_event(payload)
 
@@ -601,7 +1057,8 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
             progress_callback=progress_callback,
             cancel_check=cancel_check,
             duplicate_callback=duplicate_callback,
-            return_stats=True
+            return_stats=True,
+            incremental=not full
         )
 
         if cancel_check():
@@ -652,26 +1109,37 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
         print(f"  - Grupos duplicados: {len(verified_duplicates)}")
         print(f"  - Espaço desperdiçado: {self._format_bytes(total_size_waste)}")
         
-        # Armazenar resultados
-        scan_results = {
+        # Armazenar resultados (em memória e no SQLite, para servir sem novo scan após reiniciar)
+        hash_stats = get_cache_stats()
+        results = {
+            "scanned_at": time.time(),
             "total_files": files_scanned,
             "hashed_files": files_checked,
             "duplicate_groups": len(verified_duplicates),
             "total_waste_bytes": total_size_waste,
             "duplicates": duplicate_groups,
             "cache_stats": {
-                "hits": 0,
-                "misses": 0,
-                "hit_rate": 0.0
-            }
+                "hits": hash_stats["hits"],
+                "misses": hash_stats["misses"],
+                "hit_rate": hash_stats["hit_rate"]
+            },
+            "bytes_read": get_bytes_read(),
+            "hash_algo": get_hash_algorithm()
         }
+        with scan_lock:
+            scan_results = results
+            scan_snapshot = snapshot
+            scan_fresh = None  # O retrato é do início do scan; compara uma vez na próxima consulta
+        persist_scan_results(self.models_dir)
         self._broadcast_scan_event({
             "type": "complete",
             "summary": {
+                "scanned_at": results["scanned_at"],
                 "total_files": files_scanned,
                 "hashed_files": files_checked,
                 "duplicate_groups": len(verified_duplicates),
-                "total_waste_bytes": total_size_waste
+                "total_waste_bytes": total_size_waste,
+                "bytes_read": get_bytes_read()
             }
         })
 
@@ -690,28 +1158,68 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
                 response["completed"] = False
                 if scan_progress["is_scanning"]:
                     print(f"[DEBUG] Scanning in progress: {scan_progress['current']}/{scan_progress['total']}")
-        
+
+        if response["completed"] and self.models_dir:
+            response["fresh"] = scan_results_fresh(self.models_dir)
         self._send_json_no_cache(response)
 
-    def _handle_scan_stream(self) -> None:
-        """Stream de eventos SSE para progresso e resultados de duplicatas"""
-        self.send_response(200)
-        self.send_header("Content-Type", "text/event-stream")
-        self.send_header("Cache-Control", "no-cache")
-        self.send_header("Connection", "keep-alive")
-        self.end_headers()
+    def _handle_scan_stream(self, query: str = "") -> None:
+        """Stream de eventos SSE para progresso e resultados de duplicatas
+
+        Sem ?full=1 (scan completo) ou ?refresh=1 (incremental), um resultado salvo que ainda
+        descreve a árvore é reenviado na hora, sem novo scan.
+        """
+        self._start_sse()
+
+        force = self._wants_full_scan(query) or parse_qs(query).get("refresh", ["0"])[0] in ("1", "true")
+        if not force and self._send_stored_scan():
+            return
 
         listener = self._register_scan_listener()
 
         with scan_lock:
             self._send_sse({"type": "status", **scan_progress})
 
-        start_error = self._start_scan_thread()
+        start_error = self._start_scan_thread(full=self._wants_full_scan(query))
         if start_error and start_error != "scan_in_progress":
             self._send_sse({"type": "error", "message": start_error})
             self._remove_scan_listener(listener)
             return
 
+        self._stream_scan_events(listener)
+
+    def _send_stored_scan(self) -> bool:
+        """Reenvia o último resultado (grupos + complete) se estiver fresco; False se precisa de scan"""
+        with scan_lock:
+            if scan_progress.get("is_scanning"):
+                return False
+        if not self.models_dir or not scan_results_fresh(self.models_dir, recheck=True):
+            return False
+        with scan_lock:
+            results = scan_results
+            groups = list(results.get("duplicates", []))
+        try:
+            self._send_sse({"type": "status", "is_scanning": False, "stored": True})
+            for group in groups:
+                self._send_sse({"type": "group", "group": group})
+            self._send_sse({
+                "type": "complete",
+                "stored": True,
+                "summary": {
+                    "scanned_at": results.get("scanned_at"),
+                    "total_files": results.get("total_files", 0),
+                    "hashed_files": results.get("hashed_files", 0),
+                    "duplicate_groups": len(groups),
+                    "total_waste_bytes": sum(group.get("waste", 0) for group in groups),
+                    "bytes_read": {"sample": 0, "full": 0, "verify": 0},
+                },
+            })
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        return True
+
+    def _stream_scan_events(self, listener: queue.Queue, listeners: list[queue.Queue] = scan_listeners) -> None:
+        """Repassa eventos do scan ao cliente SSE até o fim (complete/cancelled/error)"""
         try:
             while True:
                 try:
@@ -727,9 +1235,137 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
         except (BrokenPipeError, ConnectionResetError):
             pass
         finally:
-            self._remove_scan_listener(listener)
+            self._remove_scan_listener(listener, listeners)
 
-    def _start_scan_thread(self) -> str | None:
+    def _handle_scan_similar(self, query: str) -> None:
+        """Stream SSE da busca por imagens e vídeos parecidos (hash perceptual + árvore BK)"""
+        params = parse_qs(query)
+        try:
+            threshold = max(0, min(32, int(params.get("threshold", [DEFAULT_THRESHOLD])[0])))
+        except ValueError:
+            threshold = DEFAULT_THRESHOLD
+        kind = params.get("kind", ["all"])[0]
+        kinds = ("image", "video") if kind not in ("image", "video") else (kind,)
+
+        self._start_sse()
+
+        listener = self._register_scan_listener(similar_listeners)
+
+        with scan_lock:
+            self._send_sse({"type": "status", **similar_progress})
+
+        start_error = self._start_similar_thread(threshold, kinds)
+        if start_error and start_error != "scan_in_progress":
+            self._send_sse({"type": "error", "message": start_error})
+            self._remove_scan_listener(listener, similar_listeners)
+            return
+
+        self._stream_scan_events(listener, similar_listeners)
+
+    def _start_similar_thread(self, threshold: int, kinds: tuple) -> str | None:
+        if not SIMILARITY_AVAILABLE:
+            return "similarity_unavailable"
+        if not self.models_dir or not self.models_dir.exists():
+            return "models_dir_missing"
+
+        with scan_lock:
+            if similar_progress.get("is_scanning"):
+                return "scan_in_progress"
+            similar_progress.update(current=0, total=0, is_scanning=True, cancel_requested=False)
+
+        threading.Thread(
+            target=self._run_scan_similar,
+            args=(threshold, kinds),
+            daemon=True
+        ).start()
+        return None
+
+    def _run_scan_similar(self, threshold: int, kinds: tuple) -> None:
+        """Executa a busca por similares e transmite progresso e grupos aos ouvintes"""
+        global similar_results
+
+        print(f"[INFO] Iniciando busca por similares (limiar: {threshold})...")
+        similar_results = None
+
+        def cancel_check() -> bool:
+            with scan_lock:
+                return similar_progress.get("cancel_requested", False)
+
+        def progress_callback(info: dict) -> None:
+            with scan_lock:
+                if info.get("phase") == "scan_done":
+                    similar_progress["total"] = int(info.get("total_candidates", 0))
+                else:
+                    similar_progress["current"] = int(info.get("current", 0))
+            self._broadcast_scan_event({
+                "type": "progress",
+                "phase": info.get("phase"),
+                "current": int(info.get("current", 0)),
+                "total": int(info.get("total", info.get("total_candidates", 0))),
+                "cache_hits": int(info.get("cache_hits", 0)),
+                "cache_misses": int(info.get("cache_misses", 0))
+            }, similar_listeners)
+
+        groups = []
+
+        def group_callback(group: dict) -> None:
+            files = []
+            for path, distance in group["files"]:
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    size = 0
+                files.append({"path": os.path.relpath(path, self.models_dir), "distance": distance, "size": size})
+            payload = {
+                "id": f"{group['kind']}-{len(groups) + 1}",
+                "kind": group["kind"],
+                "count": len(files),
+                "files": files,
+                "waste": sum(entry["size"] for entry in files[1:])
+            }
+            groups.append(payload)
+            self._broadcast_scan_event({"type": "group", "group": payload}, similar_listeners)
+
+        try:
+            find_similar(
+                str(self.models_dir),
+                threshold=threshold,
+                progress_callback=progress_callback,
+                cancel_check=cancel_check,
+                group_callback=group_callback,
+                kinds=kinds
+            )
+        except Exception as e:
+            print(f"[ERROR] Busca por similares falhou: {e}")
+            with scan_lock:
+                similar_progress["is_scanning"] = False
+            self._broadcast_scan_event({"type": "error", "message": str(e)}, similar_listeners)
+            return
+
+        with scan_lock:
+            cancelled = similar_progress.get("cancel_requested", False)
+            similar_progress["is_scanning"] = False
+            similar_progress["cancel_requested"] = False
+
+        if cancelled:
+            similar_results = {"error": "cancelled"}
+            self._broadcast_scan_event({"type": "cancelled"}, similar_listeners)
+            print("[INFO] Busca por similares cancelada pelo usuario.")
+            return
+
+        groups.sort(key=lambda g: g["waste"], reverse=True)
+        similar_results = {"threshold": threshold, "groups": groups}
+        print(f"[INFO] Busca por similares finalizada: {len(groups)} grupos")
+        self._broadcast_scan_event({
+            "type": "complete",
+            "summary": {
+                "similar_groups": len(groups),
+                "total_waste_bytes": sum(g["waste"] for g in groups),
+                "threshold": threshold
+            }
+        }, similar_listeners)
+
+    def _start_scan_thread(self, full: bool = False) -> str | None:
         if not self.models_dir or not self.models_dir.exists():
             return "models_dir_missing"
 
@@ -739,31 +1375,40 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
 
         scan_thread = threading.Thread(
             target=self._run_scan_duplicates_optimized,
+            args=(full,),
             daemon=True
         )
         scan_thread.start()
         return None
 
-    def _register_scan_listener(self) -> queue.Queue:
+    def _register_scan_listener(self, listeners: list[queue.Queue] = scan_listeners) -> queue.Queue:
         listener = queue.Queue(maxsize=1000)
         with scan_listeners_lock:
-            scan_listeners.append(listener)
+            listeners.append(listener)
         return listener
 
-    def _remove_scan_listener(self, listener: queue.Queue) -> None:
+    def _remove_scan_listener(self, listener: queue.Queue, listeners: list[queue.Queue] = scan_listeners) -> None:
         with scan_listeners_lock:
-            if listener in scan_listeners:
-                scan_listeners.remove(listener)
+            if listener in listeners:
+                listeners.remove(listener)
 
-    def _broadcast_scan_event(self, event: dict) -> None:
+    def _broadcast_scan_event(self, event: dict, listeners: list[queue.Queue] = scan_listeners) -> None:
         with scan_listeners_lock:
-            listeners = list(scan_listeners)
+            listeners = list(listeners)
         for listener in listeners:
             try:
                 listener.put_nowait(event)
             except queue.Full:
                 continue
 
+    def _start_sse(self) -> None:
+        """Cabeçalhos do stream SSE; sem Content-Length, o fim do stream fecha a conexão"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.close_connection = True
+
     def _send_sse(self, event: dict) -> None:
         payload = json.dumps(event, ensure_ascii=False)
         data = f"data: {payload}\n\n".encode("utf-8")
@@ -775,10 +1420,19 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
         self.wfile.write(data)
         self.wfile.flush()
 
-    def _handle_cancel_scan(self) -> None:
-        """Solicita cancelamento do scan de duplicatas"""
+    def _handle_cancel_scan(self, query: str = "") -> None:
+        """Solicita cancelamento do scan de duplicatas (ou da busca por similares com ?scan=similar)"""
         global scan_progress, scan_results
 
+        if parse_qs(query).get("scan", [""])[0] == "similar":
+            with scan_lock:
+                if not similar_progress.get("is_scanning"):
+                    self._send_json({"status": "idle"})
+                    return
+                similar_progress["cancel_requested"] = True
+            self._send_json({"status": "cancelling"})
+            return
+
         with scan_lock:
             if not scan_progress.get("is_scanning"):
                 self._send_json({"status": "idle"})
@@ -792,10 +1446,24 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
         """Retorna estatísticas dos caches"""
         stats = {
             "models_cache": models_cache.get_stats(),
-            "model_info_cache": model_info_cache.get_stats(),
             "media_list_cache": media_list_cache.get_stats(),
+            "response_cache": response_cache.get_stats(),
         }
+        if self.catalog_watcher is not None:
+            stats["watcher"] = self.catalog_watcher.get_stats()
+        if self.catalog_index is not None:
+            stats["catalog_index"] = {"version": self.catalog_index.version}
+        if self.thumbnails is not None:
+            stats["thumbnails"] = self.thumbnails.get_stats()
+        server_stats = getattr(self.server, "get_stats", None)
+        if server_stats is not None:
+            stats["server"] = server_stats()
         self._send_json(stats)
+
+    def _handle_clear_cache(self) -> None:
+        """Limpa os caches em memória e ressincroniza o índice do catálogo"""
+        invalidate_catalog(None, catalog_index=self.catalog_index)
+        self._send_json({"status": "cleared"})
     
     def _handle_delete_duplicate(self) -> None:
         """Deleta um arquivo duplicado"""
@@ -853,6 +1521,11 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
             # Delete com tratamento de permissões
             file_path.unlink(missing_ok=False)
             print(f"[INFO] ✅ Arquivo deletado: {rel_path}")
+
+            parts = file_path.relative_to(models_dir_resolved).parts
+            if len(parts) >= 3:
+                invalidate_catalog(parts[0], parts[1], self.catalog_index)
+            forget_scanned_files(self.models_dir, [os.path.join(*parts)])
             
             self._send_json({"status": "deleted", "path": rel_path, "message": "Arquivo removido com sucesso"})
             
@@ -863,106 +1536,294 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
             print(f"[ERROR] Erro ao deletar {file_path}: {e}")
             self._send_json({"error": "delete_failed", "message": str(e)}, status=500)
 
-    def _load_hash_cache(self) -> dict:
-        """Carrega cache de hashes do disco"""
-        if not self.models_dir:
-            return {}
-        
-        cache_file = self.models_dir / HASH_CACHE_FILE
-        if not cache_file.exists():
-            return {}
-        
+    def _handle_delete_batch(self) -> None:
+        """Exclui vários arquivos numa chamada, com resultados por item via stream SSE
+
+        Corpo: {"paths": [caminhos relativos a models_dir]}. Os caminhos são validados de uma
+        vez, removidos num pool pequeno de threads e cada modelo afetado é invalidado uma vez só
+        no fim. Eventos: "items" (lotes de {path, status, error?}), e "complete" com o resumo.
+        """
         try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    
-    def _save_hash_cache(self, cache: dict) -> None:
-        """Salva cache de hashes no disco"""
+            length = int(self.headers.get("Content-Length", "0"))
+            raw = self.rfile.read(length) if length > 0 else b"{}"
+            payload = json.loads(raw.decode("utf-8"))
+        except Exception as e:
+            print(f"[ERROR] Erro ao parsear JSON: {e}")
+            self._send_json({"error": "invalid_json"}, status=400)
+            return
+
+        paths = payload.get("paths")
+        if not isinstance(paths, list) or not all(isinstance(path, str) for path in paths):
+            self._send_json({"error": "invalid_params"}, status=400)
+            return
+        if len(paths) > BATCH_DELETE_MAX:
+            self._send_json({"error": "too_many_paths", "max": BATCH_DELETE_MAX}, status=413)
+            return
         if not self.models_dir:
+            self._send_json({"error": "models_dir_missing"}, status=404)
             return
-        
-        cache_file = self.models_dir / HASH_CACHE_FILE
+
+        models_dir_resolved = self.models_dir.resolve()
+        targets: dict[str, Path] = {}
+        rejected = []
+        for rel_path in dict.fromkeys(path.strip() for path in paths):
+            try:
+                file_path = (self.models_dir / rel_path.replace("/", os.sep).replace("\\", os.sep)).resolve()
+            except (OSError, RuntimeError, ValueError):
+                file_path = None
+            if not rel_path or file_path is None or not file_path.is_relative_to(models_dir_resolved) \
+                    or file_path == models_dir_resolved:
+                print(f"[SECURITY] Caminho inválido no lote: {rel_path}")
+                rejected.append({"path": rel_path, "status": "error", "error": "invalid_path"})
+                continue
+            targets[rel_path] = file_path
+
+        print(f"[INFO] Exclusão em lote: {len(targets)} arquivos ({len(rejected)} caminhos rejeitados)")
+        self._start_sse()
+        listeners: list = []
+        listener = self._register_scan_listener(listeners)
+        threading.Thread(
+            target=self._run_delete_batch,
+            args=(targets, rejected, listener, models_dir_resolved),
+            name="delete-batch",
+            daemon=True,
+        ).start()
+        self._stream_scan_events(listener, listeners)
+
+    def _run_delete_batch(self, targets: dict, rejected: list, listener, models_dir_resolved: Path) -> None:
+        """Remove os arquivos do lote e publica os resultados em `listener` (roda fora do handler)"""
+        def delete(item: tuple[str, Path]) -> dict:
+            rel_path, file_path = item
+            try:
+                fs = file_path.stat()
+                if not file_path.is_file():
+                    return {"path": rel_path, "status": "error", "error": "not_a_file"}
+                file_path.unlink()
+                return {"path": rel_path, "status": "deleted", "size": fs.st_size}
+            except FileNotFoundError:
+                return {"path": rel_path, "status": "error", "error": "file_not_found"}
+            except PermissionError:
+                return {"path": rel_path, "status": "error", "error": "permission_denied"}
+            except OSError as e:
+                return {"path": rel_path, "status": "error", "error": "delete_failed", "message": str(e)}
+
+        total = len(targets) + len(rejected)
+        done = len(rejected)
+        pending = list(rejected)
+        deleted: list[str] = []
+        freed = 0
+        last_event = time.monotonic()
+        if pending:
+            listener.put_nowait({"type": "items", "done": done, "total": total, "results": pending})
+            pending = []
         try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"[ERROR] Erro ao salvar cache: {e}")
-    
-    def _get_cached_hash(self, file_path: str, rel_path: str, cache: dict) -> str | None:
-        """Obtém hash do cache se válido"""
-        if rel_path not in cache:
-            return None
-        
-        cached_data = cache[rel_path]
-        if not isinstance(cached_data, dict) or "hash" not in cached_data:
-            return None
-        if cached_data.get("algo") != "sha256":
-            return None
-        
+            with ThreadPoolExecutor(max_workers=BATCH_DELETE_WORKERS, thread_name_prefix="delete") as executor:
+                for result in executor.map(delete, targets.items()):
+                    done += 1
+                    pending.append(result)
+                    if result["status"] == "deleted":
+                        deleted.append(result["path"])
+                        freed += result["size"]
+                    now = time.monotonic()
+                    if len(pending) >= BATCH_EVENT_ITEMS or now - last_event >= BATCH_EVENT_INTERVAL:
+                        listener.put_nowait({"type": "items", "done": done, "total": total, "results": pending})
+                        pending = []
+                        last_event = now
+            if pending:
+                listener.put_nowait({"type": "items", "done": done, "total": total, "results": pending})
+        finally:
+            # Uma invalidação por modelo afetado (e uma gravação do resultado de duplicatas)
+            models = set()
+            for rel_path in deleted:
+                parts = targets[rel_path].relative_to(models_dir_resolved).parts
+                if len(parts) >= 3:
+                    models.add((parts[0], parts[1]))
+            for site, model in sorted(models):
+                invalidate_catalog(site, model, self.catalog_index)
+            forget_scanned_files(
+                self.models_dir, [os.path.join(*targets[rel_path].relative_to(models_dir_resolved).parts)
+                                  for rel_path in deleted]
+            )
+            print(f"[INFO] ✅ Lote concluído: {len(deleted)}/{total} arquivos removidos, "
+                  f"{self._format_bytes(freed)} liberados, {len(models)} modelos atualizados")
+            listener.put_nowait({
+                "type": "complete",
+                "summary": {
+                    "total": total,
+                    "deleted": len(deleted),
+                    "failed": total - len(deleted),
+                    "freed_bytes": freed,
+                    "models": len(models),
+                },
+            })
+
+    def _handle_dedup_link(self) -> None:
+        """Substitui duplicatas por hardlinks/reflinks em lote (dry-run por padrão)
+
+        Corpo: {"groups": [[caminhos relativos]], "mode": "auto|reflink|hardlink", "dry_run": true}.
+        Sem "groups", usa todos os grupos do último scan de duplicatas.
+        """
         try:
-            stats = os.stat(file_path)
-            cached_size = cached_data.get("size")
-            cached_mtime = cached_data.get("mtime")
-            
-            # Validar se arquivo não mudou
-            if cached_size != stats.st_size or cached_mtime != stats.st_mtime:
-                return None
-            
-            return cached_data["hash"]
-        except Exception:
-            return None
+            length = int(self.headers.get("Content-Length", "0"))
+            raw = self.rfile.read(length) if length > 0 else b"{}"
+            payload = json.loads(raw.decode("utf-8"))
+        except Exception as e:
+            print(f"[ERROR] Erro ao parsear JSON: {e}")
+            self._send_json({"error": "invalid_json"}, status=400)
+            return
+
+        if not self.models_dir:
+            self._send_json({"error": "models_dir_missing"}, status=404)
+            return
+
+        mode = payload.get("mode", "auto")
+        if mode not in LINK_MODES:
+            self._send_json({"error": "invalid_mode", "modes": list(LINK_MODES)}, status=400)
+            return
+        dry_run = bool(payload.get("dry_run", True))
+
+        rel_groups = payload.get("groups")
+        if rel_groups is None:
+            with scan_lock:
+                last = scan_results or {}
+                rel_groups = [group["files"] for group in last.get("duplicates", [])]
+        if not isinstance(rel_groups, list) or not all(isinstance(g, list) for g in rel_groups):
+            self._send_json({"error": "invalid_params"}, status=400)
+            return
+
+        models_dir_resolved = self.models_dir.resolve()
+        groups = []
+        for rel_group in rel_groups:
+            group = []
+            for rel_path in rel_group:
+                rel_path = str(rel_path).replace("/", os.sep).replace("\\", os.sep)
+                file_path = (self.models_dir / rel_path).resolve()
+                if not file_path.is_relative_to(models_dir_resolved):
+                    print(f"[SECURITY] Tentativa de acesso fora do diretório: {file_path}")
+                    self._send_json({"error": "invalid_path", "reason": "outside_models_dir"}, status=403)
+                    return
+                group.append(str(file_path))
+            groups.append(group)
+
+        print(f"[INFO] Deduplicação por links ({mode}{', dry-run' if dry_run else ''}): {len(groups)} grupos")
+        report = dedup_groups(groups, mode=mode, dry_run=dry_run)
+
+        def rel(path: str) -> str:
+            return os.path.relpath(path, models_dir_resolved)
+
+        # Caminhos absolutos resolvidos: os do scan são relativos a models_dir sem resolver
+        linked = {action["duplicate"] for action in report["actions"]}
+        for action in report["actions"]:
+            action["duplicate"] = rel(action["duplicate"])
+            action["original"] = rel(action["original"])
+        for item in report["skipped"] + report["errors"]:
+            item["path"] = rel(item["path"])
+
+        if not dry_run and report["actions"]:
+            # Cada duplicata virou link: sobram (count - linkadas) cópias; com menos de 2 o grupo sai
+            linked_rel = []
+            with scan_lock:
+                if scan_results and scan_results.get("duplicates"):
+                    groups_left = []
+                    for group in scan_results["duplicates"]:
+                        group_linked = [
+                            path for path in group["files"]
+                            if str((self.models_dir / path).resolve()) in linked
+                        ]
+                        linked_rel.extend(group_linked)
+                        copies = group["count"] - len(group_linked)
+                        if copies < 2:
+                            continue
+                        groups_left.append({**group, "waste": group["size"] * (copies - 1)})
+                    scan_results["duplicates"] = groups_left
+                    scan_results["duplicate_groups"] = len(groups_left)
+                    scan_results["total_waste_bytes"] = sum(group["waste"] for group in groups_left)
+            refresh_snapshot_folders(self.models_dir, linked_rel)
+            persist_scan_results(self.models_dir, delay=SCAN_PERSIST_DELAY)
+            print(f"[INFO] ✅ {len(report['actions'])} duplicatas substituídas por links, "
+                  f"{self._format_bytes(report['reclaimed_bytes'])} recuperados")
+
+        self._send_json(report)
+
+    @staticmethod
+    def _get_cached_hash(file_path: str, algo: str | None = None) -> str | None:
+        """Obtém hash do cache SQLite compartilhado com o verificador, se o arquivo não mudou"""
+        return get_cached_hash(file_path, algo=algo)
     
     @staticmethod
-    def _calculate_sha256_fast(file_path: str, block_size: int = 131072) -> str | None:
-        """Calcula SHA-256 com buffer otimizado (128KB)"""
-        sha256 = hashlib.sha256()
+    def _calculate_hash_fast(file_path: str, algo: str | None = None, block_size: int = HASH_BLOCK_SIZE) -> str | None:
+        """Calcula o hash com o algoritmo configurado (BLAKE3/xxh3-128 se instalados, senão SHA-256)"""
+        hasher = new_hasher(algo)
         try:
             with open(file_path, 'rb') as f:
                 for block in iter(lambda: f.read(block_size), b''):
-                    sha256.update(block)
-            return sha256.hexdigest()
+                    hasher.update(block)
+            return hasher.hexdigest()
         except Exception:
             return None
 
     @staticmethod
-    def _files_are_identical(file_path_a: Path, file_path_b: Path, block_size: int = 131072) -> bool:
-        """Compara dois arquivos byte a byte para confirmar igualdade."""
-        try:
-            if file_path_a.stat().st_size != file_path_b.stat().st_size:
-                return False
-            with file_path_a.open('rb') as fa, file_path_b.open('rb') as fb:
-                for block_a in iter(lambda: fa.read(block_size), b''):
-                    block_b = fb.read(block_size)
-                    if block_a != block_b:
-                        return False
-            return True
-        except Exception:
+    def _files_are_identical(file_path_a: Path, file_path_b: Path) -> bool:
+        """Compara dois arquivos byte a byte (mmap) para confirmar igualdade."""
+        return files_are_identical(str(file_path_a), str(file_path_b))
+
+    def _send_json(
+        self,
+        data: dict,
+        status: int = 200,
+        etag: str | None = None,
+        cache_key: str | None = None,
+    ) -> None:
+        """Envia resposta JSON comprimida se o cliente aceitar (e guarda os bytes se houver cache_key)"""
+        encoded = EncodedJSON(data, etag)
+        if cache_key is not None and status == 200:
+            response_cache.set(cache_key, encoded.precompress(), size=encoded.size)
+        self._send_encoded(encoded, status)
+
+    def _send_cached_response(self, cache_key: str, etag: str | None) -> bool:
+        """Envia a resposta pronta do cache se ainda for da versão atual do catálogo"""
+        encoded = response_cache.get(cache_key)
+        if encoded is None or encoded.etag != etag:
             return False
+        self._send_encoded(encoded, 200)
+        return True
 
-    def _send_json(self, data: dict, status: int = 200) -> None:
-        """Envia resposta JSON com compressão gzip se apropriado"""
-        payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
-        
-        # Comprimir se cliente aceitar e payload > 1KB
-        accept_encoding = self.headers.get('Accept-Encoding', '')
-        if 'gzip' in accept_encoding and len(payload) > 1024:
-            payload = gzip.compress(payload, compresslevel=6)
-            self.send_response(status)
-            self.send_header("Content-Type", "application/json; charset=utf-8")
-            self.send_header("Content-Encoding", "gzip")
-            self.send_header("Content-Length", str(len(payload)))
-            self.send_header("Cache-Control", "public, max-age=300")
-        else:
-            self.send_response(status)
-            self.send_header("Content-Type", "application/json; charset=utf-8")
-            self.send_header("Content-Length", str(len(payload)))
-            self.send_header("Cache-Control", "public, max-age=300")
-        
+    def _send_encoded(self, encoded: EncodedJSON, status: int) -> None:
+        encoding, payload = encoded.body(self._preferred_encoding())
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if encoding != "identity":
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Cache-Control", "public, max-age=300")
+        self.send_header("Vary", "Accept-Encoding")
+        if encoded.etag and status == 200:
+            self.send_header("ETag", encoded.etag)
         self.end_headers()
         self.wfile.write(payload)
 
+    def _preferred_encoding(self, available=COMPRESSORS) -> str:
+        """Melhor Content-Encoding aceito pelo cliente entre os disponíveis (br > zstd > gzip)"""
+        accepted = set()
+        for token in self.headers.get("Accept-Encoding", "").split(","):
+            name, _, params = token.strip().partition(";")
+            if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                continue
+            accepted.add(name.strip().lower())
+        for encoding in COMPRESSORS:
+            if encoding in accepted and encoding in available:
+                return encoding
+        return "identity"
+
+    @staticmethod
+    def _normalized_query(params: Dict[str, list], exclude: tuple = ()) -> str:
+        """Query string canônica (chave do cache de respostas)"""
+        return "&".join(
+            f"{quote(key)}={quote(value)}"
+            for key in sorted(params) if key not in exclude
+            for value in params[key]
+        )
+
     def _send_json_no_cache(self, data: dict, status: int = 200) -> None:
         """Envia resposta JSON sem cache HTTP"""
         payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
@@ -974,14 +1835,18 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(payload)
 
-    def _send_file(self, file_path: Path) -> None:
-        """Envia arquivo com cache HTTP e streaming"""
+    def _send_file(
+        self,
+        file_path: Path,
+        content_type: str | None = None,
+        validators: tuple[str, str] | None = None,
+    ) -> None:
+        """Envia arquivo com cache HTTP, suporte a Range (206) e envio via sendfile"""
         try:
             fs = file_path.stat()
             
             # Determinar Content-Type baseado na extensão
             ext = file_path.suffix.lower()
-            content_type = "application/octet-stream"
             
             # Mapa de tipos MIME para extensões
             mime_types = {
@@ -1009,23 +1874,129 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
                 ".aac": "audio/aac",
             }
             
-            if ext in mime_types:
-                content_type = mime_types[ext]
-            
-            self.send_response(200)
-            self.send_header("Content-Length", str(fs.st_size))
-            self.send_header("Content-Type", content_type)
-            self.send_header("Cache-Control", "public, max-age=86400")  # 24h
-            # Suportar HTTP Range Requests para vídeos
-            self.send_header("Accept-Ranges", "bytes")
-            self.end_headers()
-            
-            # Streaming em chunks de 64KB
-            with file_path.open("rb") as handle:
-                while chunk := handle.read(65536):
-                    self.wfile.write(chunk)
+            if content_type is None:
+                content_type = mime_types.get(ext, "application/octet-stream")
         except Exception:
             self.send_error(404, "File not found")
+            return
+
+        size = fs.st_size
+        etag, last_modified = validators or self._file_validators(fs)
+        if self._not_modified(etag, last_modified):
+            return
+        byte_range = self._parse_range(size, etag, last_modified)
+        if byte_range == "unsatisfiable":
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if byte_range is None:
+            start, length = 0, size
+            self.send_response(200)
+        else:
+            start, end = byte_range
+            length = end - start + 1
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(length))
+        self.send_header("Content-Type", content_type)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.send_header("Cache-Control", "public, max-age=86400")  # 24h
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+        self._send_file_body(file_path, start, length)
+
+    def _send_file_body(self, file_path: Path, start: int, length: int) -> None:
+        """Envia `length` bytes do arquivo a partir de `start` direto para o socket"""
+        # socket.sendfile usa os.sendfile (cópia no kernel, sem buffers Python) onde existir
+        # e cai para send() em blocos no Windows
+        try:
+            with file_path.open("rb") as handle:
+                self.connection.sendfile(handle, offset=start, count=length)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Cliente fechou (comum ao pular trechos do vídeo)
+        except OSError as e:
+            print(f"[ERROR] Falha ao enviar {file_path}: {e}")
+            self.close_connection = True
+
+    @staticmethod
+    def _file_validators(fs: os.stat_result, suffix: str = "") -> tuple[str, str]:
+        """ETag forte (inode, tamanho, mtime) e Last-Modified de um arquivo"""
+        tag = f"{fs.st_ino:x}-{fs.st_size:x}-{fs.st_mtime_ns:x}"
+        if suffix:
+            tag = f"{tag}-{suffix}"
+        return f'"{tag}"', formatdate(fs.st_mtime, usegmt=True)
+
+    def _catalog_etag(self) -> str | None:
+        """ETag fraca das respostas do catálogo: muda sempre que o índice grava uma mudança"""
+        index = self._index()
+        return f'W/"catalog-{index.version}"' if index is not None else None
+
+    def _not_modified(self, etag: str | None, last_modified: str | None = None) -> bool:
+        """Responde 304 se o cliente já tem a versão atual (If-None-Match / If-Modified-Since)"""
+        if etag is None:
+            return False
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            # Comparação fraca (RFC 9110): W/"x" e "x" são a mesma versão para GET
+            bare = etag.removeprefix("W/")
+            candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            fresh = "*" in candidates or bare in candidates
+        else:
+            if_modified_since = self.headers.get("If-Modified-Since")
+            if not if_modified_since or not last_modified:
+                return False
+            try:
+                fresh = parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        if not fresh:
+            return False
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        if last_modified:
+            self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        return True
+
+    def _parse_range(self, size: int, etag: str, last_modified: str) -> tuple[int, int] | str | None:
+        """Interpreta um cabeçalho Range de intervalo único.
+
+        Retorna (início, fim) inclusivo, "unsatisfiable" para 416 ou None para enviar o arquivo
+        inteiro (sem Range, If-Range desatualizado, múltiplos intervalos ou cabeçalho inválido).
+        """
+        header = self.headers.get("Range")
+        if not header:
+            return None
+        if_range = self.headers.get("If-Range")
+        if if_range and if_range.strip() not in (etag, last_modified):
+            return None  # Arquivo mudou desde a cópia parcial do cliente: manda tudo de novo
+        unit, _, spec = header.partition("=")
+        if unit.strip().lower() != "bytes" or "," in spec:
+            return None
+        first, sep, last = spec.strip().partition("-")
+        if not sep:
+            return None
+        try:
+            if first:
+                start = int(first)
+                end = int(last) if last else size - 1
+            else:
+                suffix = int(last)  # bytes=-N: últimos N bytes
+                if suffix <= 0:
+                    return "unsatisfiable"
+                start, end = max(0, size - suffix), size - 1
+        except ValueError:
+            return None
+        if start >= size:
+            return "unsatisfiable"
+        if end < start:
+            return None
+        return start, min(end, size - 1)
 
     @staticmethod
     def _safe_site_name(site: str) -> str | None:
@@ -1040,65 +2011,6 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
             return None
         return site
 
-    def _get_model_info_fast(self, model_dir: Path) -> Tuple[Optional[str], int, int]:
-        """Obtém informações do modelo com cache otimizado"""
-        cache_key = str(model_dir)
-        cached = model_info_cache.get(cache_key)
-        if cached is not None:
-            return cached
-        
-        image_exts = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
-        video_exts = {".mp4", ".webm", ".mov", ".mkv"}
-        images: list[str] = []
-        videos: list[str] = []
-        
-        try:
-            # os.scandir() é mais rápido que iterdir()
-            with os.scandir(model_dir) as entries:
-                for entry in entries:
-                    if not entry.is_file():
-                        continue
-                    ext = os.path.splitext(entry.name)[1].lower()
-                    if ext in image_exts:
-                        images.append(entry.name)
-                    elif ext in video_exts:
-                        videos.append(entry.name)
-        except Exception:
-            return None, 0, 0
-        
-        thumb = random.choice(images) if images else None
-        result = (thumb, len(images), len(videos))
-        model_info_cache.set(cache_key, result)
-        return result
-
-    @staticmethod
-    def _list_media_files_fast(model_dir: Path) -> Tuple[List[str], List[str]]:
-        """Lista arquivos de mídia com performance otimizada"""
-        image_exts = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
-        video_exts = {".mp4", ".webm", ".mov", ".mkv"}
-        images: list[str] = []
-        videos: list[str] = []
-        
-        try:
-            # Usar os.scandir() é mais rápido
-            with os.scandir(model_dir) as entries:
-                for entry in entries:
-                    if not entry.is_file():
-                        continue
-                    ext = os.path.splitext(entry.name)[1].lower()
-                    if ext in image_exts:
-                        images.append(entry.name)
-                    elif ext in video_exts:
-                        videos.append(entry.name)
-            
-            # Ordenar apenas no final
-            images.sort()
-            videos.sort()
-        except Exception:
-            return [], []
-        
-        return images, videos
-    
     @staticmethod
     def _format_bytes(bytes_size: int) -> str:
         """Formata bytes em formato legível"""
@@ -1110,15 +2022,407 @@ class CatalogRequestHandler(http.server.SimpleHTTPRequestHandler):
         return f"{size_float:.2f} PB"
 
 
-def run_server(port: int, directory: Path, models_dir: Path) -> None:
-    """Inicia o servidor com thread pool"""
+def _start_catalog_services(directory: Path, models_dir: Path) -> Dict[str, Any]:
+    """Índice, watcher, miniaturas e assets da UI compartilhados pelos handlers (threads ou asyncio)"""
+    static_assets = StaticAssets(directory)
+    # Comprime a UI em segundo plano: o primeiro acesso já encontra gzip/brotli prontos
+    threading.Thread(target=static_assets.warm, name="static-assets", daemon=True).start()
+    catalog_index = CatalogIndex(models_dir) if models_dir else None
+    thumbnails = ThumbnailCache() if models_dir and THUMBNAILS_AVAILABLE else None
+    if models_dir:
+        load_persisted_scan(models_dir)
+    catalog_watcher = None
+    if catalog_index is not None:
+        # O watcher mantém índice e caches em dia; a passada periódica só cobre eventos perdidos
+        catalog_index.start_auto_refresh(interval=INDEX_SAFETY_REFRESH)
+        if models_dir.exists():
+            catalog_watcher = CatalogWatcher(
+                models_dir,
+                lambda site, model: invalidate_catalog(site, model, catalog_index),
+            ).start()
+    CacheManager.start_reaper()
+    return {
+        "catalog_index": catalog_index,
+        "catalog_watcher": catalog_watcher,
+        "thumbnails": thumbnails,
+        "static_assets": static_assets,
+    }
+
+
+class PooledCatalogServer(socketserver.TCPServer):
+    """TCPServer que atende conexões num ThreadPoolExecutor limitado
+
+    Diferente do ThreadingTCPServer (uma thread nova por conexão, sem teto), no máximo
+    `max_workers` conexões são atendidas ao mesmo tempo e até `max_queue` esperam na fila;
+    além disso a conexão recebe 503 na hora, em vez de consumir mais uma thread.
+    """
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        server_address,
+        handler,
+        max_workers: int = THREAD_POOL_WORKERS,
+        max_queue: int = THREAD_POOL_QUEUE,
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.request_queue_size = max_queue  # Backlog do listen()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="catalog-worker")
+        self._stats_lock = threading.Lock()
+        self.busy = 0
+        self.queued = 0
+        self.peak_busy = 0
+        self.completed = 0
+        self.rejected = 0
+        self._active: set = set()
+        super().__init__(server_address, handler)
+
+    def process_request(self, request, client_address) -> None:
+        with self._stats_lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                full = True
+            else:
+                self.queued += 1
+                full = False
+        if full:
+            try:
+                request.sendall(
+                    b"HTTP/1.1 503 Service Unavailable\r\nRetry-After: 1\r\n"
+                    b"Content-Length: 0\r\nConnection: close\r\n\r\n"
+                )
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        self._executor.submit(self._process_in_worker, request, client_address)
+
+    def _process_in_worker(self, request, client_address) -> None:
+        with self._stats_lock:
+            self.queued -= 1
+            self.busy += 1
+            self.peak_busy = max(self.peak_busy, self.busy)
+            self._active.add(request)
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._stats_lock:
+                self._active.discard(request)
+                self.busy -= 1
+                self.completed += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "mode": "threaded",
+                "workers": self.max_workers,
+                "busy": self.busy,
+                "queued": self.queued,
+                "max_queue": self.max_queue,
+                "saturation": round(self.busy / self.max_workers * 100, 1),
+                "peak_busy": self.peak_busy,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def server_close(self) -> None:
+        super().server_close()
+        # Derruba conexões keep-alive/SSE em andamento: os workers não são daemon e
+        # segurariam o encerramento do processo até o cliente desistir
+        with self._stats_lock:
+            active = list(self._active)
+        for request in active:
+            try:
+                request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_server(
+    port: int,
+    directory: Path,
+    models_dir: Path,
+    host: str = "",
+    handler_class: type | None = None,
+    max_workers: int = THREAD_POOL_WORKERS,
+    max_queue: int = THREAD_POOL_QUEUE,
+) -> PooledCatalogServer:
+    """Cria o servidor sem iniciá-lo (usado também pelos benchmarks in-process)"""
+    services = _start_catalog_services(directory, models_dir)
     handler = functools.partial(
-        CatalogRequestHandler,
+        handler_class or CatalogRequestHandler,
         directory=str(directory),
         models_dir=models_dir,
+        **services,
     )
-    with socketserver.ThreadingTCPServer(("", port), handler) as httpd:
-        httpd.daemon_threads = True  # Threads daemon para melhor cleanup
+    httpd = PooledCatalogServer((host, port), handler, max_workers=max_workers, max_queue=max_queue)
+    httpd.catalog_index = services["catalog_index"]
+    httpd.catalog_watcher = services["catalog_watcher"]
+    httpd.thumbnails = services["thumbnails"]
+    return httpd
+
+
+# --- Modo assíncrono (asyncio) ------------------------------------------------------------
+
+class _AsyncListener:
+    """Ouvinte SSE do modo asyncio: recebe eventos do broadcaster (threads de scan) numa asyncio.Queue
+
+    Tem a mesma interface put_nowait de queue.Queue, então _broadcast_scan_event não muda; nenhuma
+    thread fica presa esperando eventos por cliente.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+
+    def put_nowait(self, event: dict) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._offer, event)
+        except RuntimeError:
+            pass  # Loop já encerrado
+
+    def _offer(self, event: dict) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass  # Cliente lento: descarta, como o queue.Full do modo com threads
+
+
+class AsyncBridgeHandler(CatalogRequestHandler):
+    """Roda a lógica do CatalogRequestHandler sobre uma requisição já lida pelo loop asyncio
+
+    Cabeçalhos e corpos pequenos ficam em memória; corpos de arquivo e streams SSE só são
+    anotados (file_body / sse) para o loop enviar com loop.sendfile e a fila assíncrona.
+    """
+    def __init__(self, raw_request: bytes, client_address, server, loop: asyncio.AbstractEventLoop, **kwargs):
+        self.raw_request = raw_request
+        self.loop = loop
+        self.file_body: tuple[Path, int, int] | None = None
+        self.sse: tuple[_AsyncListener, list] | None = None
+        super().__init__(None, client_address, server, **kwargs)
+
+    def setup(self) -> None:
+        self.connection = None
+        self.rfile = io.BytesIO(self.raw_request)
+        self.wfile = io.BytesIO()
+
+    def handle(self) -> None:
+        self.handle_one_request()
+
+    def finish(self) -> None:
+        pass  # O loop lê wfile depois que o handler termina
+
+    def _send_file_body(self, file_path: Path, start: int, length: int) -> None:
+        self.file_body = (file_path, start, length)
+
+    def _register_scan_listener(self, listeners: list[queue.Queue] = scan_listeners) -> _AsyncListener:
+        listener = _AsyncListener(self.loop)
+        with scan_listeners_lock:
+            listeners.append(listener)
+        return listener
+
+    def _stream_scan_events(self, listener: _AsyncListener, listeners: list[queue.Queue] = scan_listeners) -> None:
+        self.sse = (listener, listeners)
+        self.close_connection = True
+
+
+class AsyncCatalogServer:
+    """Servidor do catálogo em asyncio.start_server, com concorrência limitada explicitamente
+
+    - até `max_connections` conexões abertas (as demais recebem 503);
+    - handlers síncronos (índice SQLite, JSON, exclusões) num pool de `workers` threads;
+    - corpos de mídia via loop.sendfile e SSE servido pelo loop, sem thread por cliente.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        models_dir: Path,
+        host: str = "",
+        port: int = DEFAULT_PORT,
+        max_connections: int = ASYNC_MAX_CONNECTIONS,
+        workers: int = ASYNC_HANDLER_WORKERS,
+    ):
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.workers = workers
+        self.services = _start_catalog_services(directory, models_dir)
+        self.handler_kwargs = {"directory": str(directory), "models_dir": models_dir, **self.services}
+        self.active_connections = 0
+        self.active_streams = 0
+        self.rejected = 0
+        self.requests = 0
+        self._executor: ThreadPoolExecutor | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "asyncio",
+            "connections": self.active_connections,
+            "max_connections": self.max_connections,
+            "streams": self.active_streams,
+            "workers": self.workers,
+            "requests": self.requests,
+            "rejected": self.rejected,
+        }
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="catalog-handler")
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host or None, self.port, limit=MAX_REQUEST_HEAD,
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if self.active_connections >= self.max_connections:
+            self.rejected += 1
+            writer.write(
+                b"HTTP/1.1 503 Service Unavailable\r\nRetry-After: 1\r\n"
+                b"Content-Length: 0\r\nConnection: close\r\n\r\n"
+            )
+            await self._close_writer(writer)
+            return
+
+        self.active_connections += 1
+        peer = writer.get_extra_info("peername") or ("", 0)
+        try:
+            while True:
+                raw_request = await self._read_request(reader, writer)
+                if raw_request is None:
+                    break
+                self.requests += 1
+                handler = await self._loop.run_in_executor(
+                    self._executor, self._run_handler, raw_request, peer,
+                )
+                writer.write(handler.wfile.getvalue())
+                if handler.sse is not None:
+                    await self._stream_sse(writer, *handler.sse)
+                    break
+                if handler.file_body is not None:
+                    await self._send_file_body(writer, *handler.file_body)
+                await writer.drain()
+                if handler.close_connection:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # Cliente desconectou
+        finally:
+            self.active_connections -= 1
+            await self._close_writer(writer)
+
+    async def _read_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bytes | None:
+        """Lê cabeçalhos + corpo (Content-Length) de uma requisição; None encerra a conexão"""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEPALIVE_TIMEOUT)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+            return None  # Conexão ociosa (keep-alive) ou fechada pelo cliente
+        except asyncio.LimitOverrunError:
+            writer.write(b"HTTP/1.1 431 Request Header Fields Too Large\r\nContent-Length: 0\r\n\r\n")
+            return None
+
+        length = 0
+        for line in head.split(b"\r\n")[1:]:
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                try:
+                    length = int(value.strip())
+                except ValueError:
+                    length = -1
+        if length < 0 or length > MAX_REQUEST_BODY:
+            writer.write(b"HTTP/1.1 413 Content Too Large\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            return None
+        body = await reader.readexactly(length) if length else b""
+        return head + body
+
+    def _run_handler(self, raw_request: bytes, peer) -> AsyncBridgeHandler:
+        """Executado no pool: a lógica dos handlers é a mesma do modo com threads"""
+        return AsyncBridgeHandler(raw_request, peer, self, self._loop, **self.handler_kwargs)
+
+    async def _send_file_body(self, writer: asyncio.StreamWriter, file_path: Path, start: int, length: int) -> None:
+        await writer.drain()
+        try:
+            with file_path.open("rb") as handle:
+                # os.sendfile no Linux/macOS; fora deles o asyncio cai para leitura em blocos
+                await self._loop.sendfile(writer.transport, handle, start, length)
+        except OSError as e:
+            if not isinstance(e, ConnectionError):
+                print(f"[ERROR] Falha ao enviar {file_path}: {e}")
+            raise ConnectionResetError from e
+
+    async def _stream_sse(self, writer: asyncio.StreamWriter, listener: _AsyncListener, listeners: list) -> None:
+        """Repassa eventos do scan ao cliente SSE até o fim (complete/cancelled/error)"""
+        self.active_streams += 1
+        try:
+            await writer.drain()
+            while True:
+                try:
+                    event = await asyncio.wait_for(listener.queue.get(), SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    writer.write(b": keep-alive\n\n")
+                    await writer.drain()
+                    continue
+                payload = json.dumps(event, ensure_ascii=False)
+                writer.write(f"data: {payload}\n\n".encode("utf-8"))
+                await writer.drain()
+                if event.get("type") in {"complete", "cancelled", "error"}:
+                    break
+        finally:
+            self.active_streams -= 1
+            with scan_listeners_lock:
+                if listener in listeners:
+                    listeners.remove(listener)
+
+    @staticmethod
+    async def _close_writer(writer: asyncio.StreamWriter) -> None:
+        try:
+            writer.close()
+            await writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+def run_server(
+    port: int,
+    directory: Path,
+    models_dir: Path,
+    mode: str = "async",
+    workers: int | None = None,
+    max_queue: int = THREAD_POOL_QUEUE,
+) -> None:
+    """Inicia o servidor (asyncio por padrão; "threaded" usa o pool limitado de threads)"""
+    if mode == "async":
+        server = AsyncCatalogServer(directory, models_dir, port=port, workers=workers or ASYNC_HANDLER_WORKERS)
+        print(f"URL: http://localhost:{port:<30}")
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            print("\n[INFO] Servidor encerrado.")
+        finally:
+            server.close()
+        return
+
+    with create_server(
+        port, directory, models_dir, max_workers=workers or THREAD_POOL_WORKERS, max_queue=max_queue,
+    ) as httpd:
         print(f"URL: http://localhost:{port:<30}")
         try:
             httpd.serve_forever()
@@ -1149,6 +2453,36 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULT_MODELS_DIR,
         help="Directory with downloaded models grouped by site"
     )
+    parser.add_argument(
+        "--hash-cache",
+        type=Path,
+        default=None,
+        help=f"SQLite hash cache shared with the duplicate finder (default: {default_cache_path()})"
+    )
+    parser.add_argument(
+        "--hash-algo",
+        default="auto",
+        choices=("auto",) + tuple(HASH_ALGORITHMS),
+        help="Hash algorithm for duplicate scans (default: auto = fastest installed, sha256 fallback)"
+    )
+    parser.add_argument(
+        "--server",
+        default="async",
+        choices=SERVER_MODES,
+        help="Server core: asyncio event loop (default) or a bounded thread pool"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=f"Handler threads (default: {ASYNC_HANDLER_WORKERS} async, {THREAD_POOL_WORKERS} threaded)"
+    )
+    parser.add_argument(
+        "--accept-queue",
+        type=int,
+        default=THREAD_POOL_QUEUE,
+        help=f"Threaded mode: connections waiting for a worker before 503 (default: {THREAD_POOL_QUEUE})"
+    )
     return parser.parse_args()
 
 
@@ -1161,7 +2495,13 @@ def main() -> None:
     if not directory.exists() or not directory.is_dir():
         raise SystemExit(f"❌ Catalog directory not found: {directory}")
     
-    run_server(args.port, directory, models_dir)
+    if args.hash_cache:
+        load_cache(str(args.hash_cache))
+    print(f"[INFO] Algoritmo de hash: {set_hash_algorithm(args.hash_algo)}")
+    
+    run_server(
+        args.port, directory, models_dir, mode=args.server, workers=args.workers, max_queue=args.accept_queue,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,488 @@
+import os
+import base64
+import bisect
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+
+try:
+    from core.hash_store import default_cache_path
+    from core.search_index import ModelSearchIndex
+except ImportError:  # Executado fora do pacote
+    from hash_store import default_cache_path
+    from search_index import ModelSearchIndex
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+VIDEO_EXTS = {".mp4", ".webm", ".mov", ".mkv"}
+INDEX_REFRESH_INTERVAL = 60  # Segundos entre passadas incrementais em segundo plano
+MEDIA_KINDS = ("image", "video")
+# Chaves de ordenação das páginas de mídia: nome A-Z, mais recentes primeiro, maiores primeiro
+MEDIA_SORTS = {
+    "name": lambda entry: (entry[0],),
+    "mtime": lambda entry: (-entry[3], entry[0]),
+    "size": lambda entry: (-entry[2], entry[0]),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sites (
+    name TEXT PRIMARY KEY,
+    model_count INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS models (
+    site TEXT NOT NULL,
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    image_count INTEGER NOT NULL,
+    video_count INTEGER NOT NULL,
+    total_size INTEGER NOT NULL,
+    thumb TEXT,
+    PRIMARY KEY (site, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS media (
+    site TEXT NOT NULL,
+    model TEXT NOT NULL,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    PRIMARY KEY (site, model, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_media_kind ON media(site, model, kind, name);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def default_index_path(models_dir):
+    """Um arquivo de índice por pasta de modelos, ao lado do cache de hashes."""
+    root = os.path.normcase(os.path.abspath(models_dir))
+    digest = hashlib.sha1(root.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(os.path.dirname(default_cache_path()), f"catalog_index_{digest}.sqlite3")
+
+
+def media_kind(filename):
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in IMAGE_EXTS:
+        return "image"
+    if ext in VIDEO_EXTS:
+        return "video"
+    return None
+
+
+def scan_model_dir(model_path):
+    """Lista [(nome, tipo, tamanho, mtime_ns)] das mídias de uma pasta de modelo."""
+    media = []
+    with os.scandir(model_path) as entries:
+        for entry in entries:
+            kind = media_kind(entry.name)
+            if kind is None:
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+            except OSError:
+                continue
+            media.append((entry.name, kind, st.st_size, st.st_mtime_ns))
+    return media
+
+
+def encode_cursor(sort, key):
+    """Cursor opaco: a chave de ordenação do último item entregue (estável mesmo com exclusões)."""
+    raw = json.dumps([sort, list(key)], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(sort, cursor):
+    """Chave de ordenação de um cursor; ValueError se for inválido ou de outra ordenação."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, key = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("invalid_cursor") from e
+    if cursor_sort != sort or not isinstance(key, list) or not key:
+        raise ValueError("invalid_cursor")
+    return tuple(key)
+
+
+class MediaListing:
+    """Mídias de um modelo com visões ordenadas pré-calculadas, para paginação por cursor.
+
+    As entradas são (nome, tipo, tamanho, mtime_ns). Cada visão (tipo, ordenação) é montada
+    uma vez, na primeira página pedida, e fica junto da listagem no cache do servidor.
+    """
+
+    def __init__(self, entries):
+        self._entries = {kind: [] for kind in MEDIA_KINDS}
+        for entry in entries:
+            self._entries[entry[1]].append(tuple(entry))
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def count(self, kind):
+        return len(self._entries[kind])
+
+    def estimated_size(self):
+        """Aproximação do tamanho em memória (orçamento de bytes do cache), contando as
+        entradas e até duas visões ordenadas montadas depois."""
+        total = sum(len(entries) for entries in self._entries.values())
+        return 256 + total * 600
+
+    def _view(self, kind, sort):
+        with self._lock:
+            view = self._views.get((kind, sort))
+            if view is None:
+                sort_key = MEDIA_SORTS[sort]
+                entries = sorted(self._entries[kind], key=sort_key)
+                view = (entries, [sort_key(entry) for entry in entries])
+                self._views[(kind, sort)] = view
+            return view
+
+    def names(self, kind, sort="name"):
+        return [entry[0] for entry in self._view(kind, sort)[0]]
+
+    def page(self, kind, sort="name", cursor=None, limit=0):
+        """Retorna (entradas, próximo cursor ou None) a partir do cursor; limit=0 = até o fim."""
+        entries, keys = self._view(kind, sort)
+        start = 0
+        if cursor:
+            key = decode_cursor(sort, cursor)
+            try:
+                start = bisect.bisect_right(keys, key)
+            except TypeError as e:
+                raise ValueError("invalid_cursor") from e
+        end = len(entries) if limit <= 0 else min(len(entries), start + limit)
+        next_cursor = encode_cursor(sort, keys[end - 1]) if end < len(entries) else None
+        return entries[start:end], next_cursor
+
+
+class CatalogIndex:
+    """Índice persistente (SQLite) de sites, modelos e mídias do catálogo.
+
+    Construído uma vez e atualizado incrementalmente: só as pastas de modelo cujo mtime mudou
+    são relistadas. Os handlers do catalog_server consultam o índice em vez de varrer o disco.
+    `version` aumenta a cada mudança gravada. A busca usa um ModelSearchIndex em memória,
+    carregado na primeira busca e atualizado junto com cada gravação.
+    """
+
+    def __init__(self, models_dir, path=None):
+        self.models_dir = os.path.abspath(models_dir)
+        self.path = path or default_index_path(models_dir)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        row = self._conn.execute("SELECT value FROM meta WHERE key='version'").fetchone()
+        self.version = int(row[0]) if row else 0
+        self._search = None
+
+    # --- Atualização -----------------------------------------------------------------
+
+    def is_built(self):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM meta WHERE key='built_at'").fetchone() is not None
+
+    def ensure_built(self):
+        """Constrói o índice na primeira consulta (as seguintes usam o que está gravado)."""
+        if not self.is_built():
+            self.refresh()
+
+    def refresh(self):
+        """Passada incremental sobre a árvore. Retorna quantos modelos mudaram."""
+        with self._refresh_lock:
+            started = time.perf_counter()
+            try:
+                with os.scandir(self.models_dir) as entries:
+                    sites_on_disk = sorted(e.name for e in entries if e.is_dir())
+            except OSError:
+                sites_on_disk = []
+
+            changes = 0
+            with self._lock:
+                stored_sites = [row[0] for row in self._conn.execute("SELECT name FROM sites")]
+            for site in stored_sites:
+                if site not in sites_on_disk:
+                    self._write(lambda conn, site=site: self._delete_site(conn, site), [(site, None)])
+                    changes += 1
+            for site in sites_on_disk:
+                changes += self.refresh_site(site)
+
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('built_at', ?)", (str(time.time()),)
+                )
+                self._conn.commit()
+            if changes:
+                elapsed = time.perf_counter() - started
+                print(f"[INFO] Índice do catálogo atualizado: {changes} modelos em {elapsed:.2f}s")
+            return changes
+
+    def refresh_site(self, site):
+        """Sincroniza os modelos de um site (relista só os de mtime alterado); remove o site se sumiu."""
+        site_path = os.path.join(self.models_dir, site)
+        if not os.path.isdir(site_path):
+            self._write(lambda conn: self._delete_site(conn, site), [(site, None)])
+            return 1
+        on_disk = {}
+        try:
+            with os.scandir(site_path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            on_disk[entry.name] = entry.stat().st_mtime_ns
+                    except OSError:
+                        continue
+        except OSError:
+            return 0
+
+        with self._lock:
+            stored = dict(self._conn.execute("SELECT name, mtime_ns FROM models WHERE site=?", (site,)))
+            site_known = self._conn.execute("SELECT 1 FROM sites WHERE name=?", (site,)).fetchone() is not None
+        changed = [name for name, mtime_ns in on_disk.items() if stored.get(name) != mtime_ns]
+        removed = [name for name in stored if name not in on_disk]
+        # Site já registrado (mesmo sem modelos) e nada mudou: não grava nem aumenta `version`
+        if not changed and not removed and site_known:
+            return 0
+
+        # Lista as pastas fora do lock; grava tudo em uma transação
+        scanned = {}
+        for model in changed:
+            try:
+                scanned[model] = scan_model_dir(os.path.join(site_path, model))
+            except OSError:
+                removed.append(model)
+
+        def apply(conn):
+            for model in removed:
+                self._delete_model(conn, site, model)
+            for model, media in scanned.items():
+                self._write_model(conn, site, model, on_disk[model], media)
+            self._update_site(conn, site)
+
+        self._write(apply, [(site, model) for model in removed + list(scanned)])
+        return len(scanned) + len(removed)
+
+    def refresh_model(self, site, model):
+        """Relista uma pasta de modelo (ou a remove do índice se sumiu).
+
+        Eventos repetidos do watcher não gravam nada (nem aumentam `version`) se o mtime e as
+        mídias forem os mesmos já indexados. Retorna True se o índice mudou.
+        """
+        model_path = os.path.join(self.models_dir, site, model)
+        try:
+            mtime_ns = os.stat(model_path).st_mtime_ns
+            media = scan_model_dir(model_path)
+        except OSError:
+            return self.remove_model(site, model)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mtime_ns FROM models WHERE site=? AND name=?", (site, model)
+            ).fetchone()
+            stored = self._conn.execute(
+                "SELECT name, kind, size, mtime_ns FROM media WHERE site=? AND model=?", (site, model)
+            ).fetchall() if row and row[0] == mtime_ns else None
+        if stored is not None and set(stored) == set(media):
+            return False
+
+        def apply(conn):
+            self._write_model(conn, site, model, mtime_ns, media)
+            self._update_site(conn, site)
+
+        self._write(apply, [(site, model)])
+        return True
+
+    def remove_model(self, site, model):
+        """Remove um modelo do índice; retorna False (sem gravar) se ele não estava indexado."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM models WHERE site=? AND name=?", (site, model)
+            ).fetchone()
+        if row is None:
+            return False
+
+        def apply(conn):
+            self._delete_model(conn, site, model)
+            self._update_site(conn, site)
+
+        self._write(apply, [(site, model)])
+        return True
+
+    def clear(self):
+        """Esvazia o índice; a próxima consulta (ensure_built) reconstrói tudo do disco."""
+        with self._refresh_lock:
+            def apply(conn):
+                for statement in ("DELETE FROM media", "DELETE FROM models", "DELETE FROM sites",
+                                  "DELETE FROM meta WHERE key='built_at'"):
+                    conn.execute(statement)
+
+            self._write(apply)
+            with self._lock:
+                self._search = None
+
+    def model_changed(self, site, model):
+        """True se a pasta do modelo mudou desde a última indexação (um único stat)."""
+        try:
+            mtime_ns = os.stat(os.path.join(self.models_dir, site, model)).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mtime_ns FROM models WHERE site=? AND name=?", (site, model)
+            ).fetchone()
+        return (row[0] if row else None) != mtime_ns
+
+    def _write(self, apply, touched=()):
+        """Grava em uma transação; `touched` lista os (site, modelo) alterados (modelo=None: site todo)."""
+        with self._lock:
+            try:
+                apply(self._conn)
+                self.version += 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (str(self.version),)
+                )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            if self._search is not None:
+                self._sync_search(touched)
+
+    def _sync_search(self, touched):
+        """Relê do SQLite só as linhas alteradas e as aplica ao índice de busca."""
+        for site, model in touched:
+            if model is None:
+                self._search.remove_site(site)
+                continue
+            row = self._conn.execute(
+                "SELECT thumb, image_count, video_count FROM models WHERE site=? AND name=?", (site, model)
+            ).fetchone()
+            if row is None:
+                self._search.remove(site, model)
+            else:
+                self._search.update(site, model, *row)
+
+    @staticmethod
+    def _write_model(conn, site, model, mtime_ns, media):
+        images = sorted(name for name, kind, _, _ in media if kind == "image")
+        row = conn.execute("SELECT thumb FROM models WHERE site=? AND name=?", (site, model)).fetchone()
+        # Mantém a capa escolhida enquanto a imagem existir
+        thumb = row[0] if row and row[0] in set(images) else (random.choice(images) if images else None)
+        conn.execute("DELETE FROM media WHERE site=? AND model=?", (site, model))
+        conn.executemany(
+            "INSERT INTO media (site, model, name, kind, size, mtime_ns) VALUES (?, ?, ?, ?, ?, ?)",
+            [(site, model) + item for item in media],
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO models "
+            "(site, name, name_lower, mtime_ns, image_count, video_count, total_size, thumb) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (site, model, model.lower(), mtime_ns, len(images), len(media) - len(images),
+             sum(item[2] for item in media), thumb),
+        )
+
+    @staticmethod
+    def _delete_model(conn, site, model):
+        conn.execute("DELETE FROM media WHERE site=? AND model=?", (site, model))
+        conn.execute("DELETE FROM models WHERE site=? AND name=?", (site, model))
+
+    @staticmethod
+    def _delete_site(conn, site):
+        conn.execute("DELETE FROM media WHERE site=?", (site,))
+        conn.execute("DELETE FROM models WHERE site=?", (site,))
+        conn.execute("DELETE FROM sites WHERE name=?", (site,))
+
+    @staticmethod
+    def _update_site(conn, site):
+        count = conn.execute("SELECT COUNT(*) FROM models WHERE site=?", (site,)).fetchone()[0]
+        conn.execute("INSERT OR REPLACE INTO sites (name, model_count) VALUES (?, ?)", (site, count))
+
+    # --- Consultas -------------------------------------------------------------------
+
+    def list_sites(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT name, model_count FROM sites ORDER BY name").fetchall()
+        return [{"name": name, "models": count} for name, count in rows]
+
+    def list_models(self, site, offset=0, limit=0):
+        """Modelos de um site ordenados por nome; limit=0 retorna todos."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, thumb, image_count, video_count FROM models WHERE site=? "
+                "ORDER BY name LIMIT ? OFFSET ?",
+                (site, limit if limit > 0 else -1, offset),
+            ).fetchall()
+        return [
+            {"name": name, "thumb": thumb, "image_count": images, "video_count": videos}
+            for name, thumb, images, videos in rows
+        ]
+
+    def get_model(self, site, model):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT thumb, image_count, video_count, total_size FROM models WHERE site=? AND name=?",
+                (site, model),
+            ).fetchone()
+        if not row:
+            return None
+        return {"thumb": row[0], "image_count": row[1], "video_count": row[2], "total_size": row[3]}
+
+    def list_media(self, site, model):
+        """Retorna (imagens, vídeos) ordenados por nome."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, kind FROM media WHERE site=? AND model=? ORDER BY kind, name", (site, model)
+            ).fetchall()
+        images = [name for name, kind in rows if kind == "image"]
+        videos = [name for name, kind in rows if kind == "video"]
+        return images, videos
+
+    def media_listing(self, site, model):
+        """Todas as mídias do modelo como MediaListing (paginação/ordenação no servidor)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, kind, size, mtime_ns FROM media WHERE site=? AND model=?", (site, model)
+            ).fetchall()
+        return MediaListing(rows)
+
+    def search(self, query, site=None, offset=0, limit=0):
+        """Modelos cujo nome contém `query`, por relevância; retorna (página, total)."""
+        with self._lock:
+            if self._search is None:
+                search = ModelSearchIndex()
+                search.load(self._conn.execute(
+                    "SELECT site, name, thumb, image_count, video_count FROM models"
+                ))
+                self._search = search
+        return self._search.search(query, site or None, offset, limit)
+
+    # --- Ciclo de vida ---------------------------------------------------------------
+
+    def start_auto_refresh(self, interval=INDEX_REFRESH_INTERVAL):
+        """Roda refresh() periodicamente em uma thread daemon."""
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"[ERROR] Falha ao atualizar índice do catálogo: {e}")
+
+        thread = threading.Thread(target=loop, name="catalog-index-refresh", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            self._conn.close()
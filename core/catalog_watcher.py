@@ -0,0 +1,230 @@
+import os
+import sys
+import errno
+import select
+import struct
+import threading
+import time
+import ctypes
+import ctypes.util
+
+POLL_INTERVAL = 5.0  # Segundos entre comparações de mtime no modo polling
+DEBOUNCE = 0.5  # Silêncio necessário antes de repassar as mudanças acumuladas
+MAX_DELAY = 2.0  # Atraso máximo de uma mudança durante rajadas (downloads contínuos)
+
+# Constantes do inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class CatalogWatcher:
+    """Observa a pasta de modelos e avisa quais (site, modelo) mudaram.
+
+    Usa inotify no Linux (via ctypes, sem dependências) e, fora dele ou se o limite de watches
+    estourar, compara os mtimes das pastas a cada POLL_INTERVAL segundos. As mudanças são
+    agrupadas por modelo e entregues a `on_change(site, model)`: model=None indica que a lista
+    de modelos do site mudou; site=None indica que tudo deve ser revalidado.
+    """
+
+    def __init__(self, models_dir, on_change, poll_interval=POLL_INTERVAL):
+        self.models_dir = os.path.abspath(models_dir)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.mode = None
+        self.events = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._pending = {}
+        self._first_pending = None
+        self._last_event = 0.0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="catalog-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def get_stats(self):
+        return {"mode": self.mode, "events": self.events}
+
+    def _run(self):
+        try:
+            if sys.platform.startswith("linux") and self._run_inotify():
+                return
+        except Exception as e:
+            print(f"[WARN] inotify indisponível ({e}), usando polling")
+        self._run_polling()
+
+    # --- Agrupamento --------------------------------------------------------------
+
+    def _mark(self, site, model):
+        now = time.monotonic()
+        self.events += 1
+        self._last_event = now
+        if self._first_pending is None:
+            self._first_pending = now
+        self._pending[(site, model)] = True
+
+    def _flush(self, force=False):
+        if not self._pending:
+            return
+        now = time.monotonic()
+        quiet = now - self._last_event >= DEBOUNCE
+        overdue = now - self._first_pending >= MAX_DELAY
+        if not (force or quiet or overdue):
+            return
+        pending = list(self._pending)
+        self._pending.clear()
+        self._first_pending = None
+        if (None, None) in pending:
+            pending = [(None, None)]
+        else:
+            # Um aviso de site inteiro já cobre os modelos desse site
+            whole_sites = {site for site, model in pending if model is None}
+            pending = [(site, model) for site, model in pending if model is None or site not in whole_sites]
+        for site, model in pending:
+            try:
+                self.on_change(site, model)
+            except Exception as e:
+                print(f"[ERROR] Falha ao processar mudança em {site}/{model}: {e}")
+
+    # --- inotify --------------------------------------------------------------------
+
+    def _run_inotify(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+
+        watches = {}  # wd -> (site, model) relativo; (None, None) é a raiz
+
+        def add_watch(path, key):
+            wd = libc.inotify_add_watch(fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    raise OSError(err, "limite de inotify watches atingido (fs.inotify.max_user_watches)")
+                return
+            watches[wd] = key
+
+        def watch_site(site):
+            site_path = os.path.join(self.models_dir, site)
+            add_watch(site_path, (site, None))
+            try:
+                with os.scandir(site_path) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            add_watch(entry.path, (site, entry.name))
+            except OSError:
+                pass
+
+        try:
+            add_watch(self.models_dir, (None, None))
+            with os.scandir(self.models_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        watch_site(entry.name)
+        except OSError:
+            os.close(fd)
+            raise
+
+        self.mode = "inotify"
+        print(f"[INFO] Observando {len(watches)} pastas do catálogo via inotify")
+        try:
+            while not self._stop.is_set():
+                readable, _, _ = select.select([fd], [], [], DEBOUNCE)
+                if not readable:
+                    self._flush()
+                    continue
+                try:
+                    data = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                offset = 0
+                while offset < len(data):
+                    wd, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+                    offset += _EVENT_HEADER.size
+                    name = os.fsdecode(data[offset:offset + name_len].rstrip(b"\0"))
+                    offset += name_len
+
+                    if mask & IN_Q_OVERFLOW:
+                        self._mark(None, None)
+                        continue
+                    key = watches.get(wd)
+                    if key is None:
+                        continue
+                    if mask & IN_IGNORED:
+                        watches.pop(wd, None)
+                        continue
+                    site, model = key
+                    if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                        continue  # O evento chega também na pasta pai
+                    is_dir = bool(mask & IN_ISDIR)
+                    if site is None:
+                        # Raiz: site criado/removido
+                        if not is_dir:
+                            continue
+                        if mask & (IN_CREATE | IN_MOVED_TO):
+                            watch_site(name)
+                        self._mark(name, None)
+                    elif model is None:
+                        # Pasta do site: modelo criado/removido
+                        if not is_dir:
+                            continue
+                        if mask & (IN_CREATE | IN_MOVED_TO):
+                            add_watch(os.path.join(self.models_dir, site, name), (site, name))
+                        self._mark(site, name)
+                    elif not is_dir:
+                        self._mark(site, model)
+                self._flush()
+        finally:
+            os.close(fd)
+            self._flush(force=True)
+        return True
+
+    # --- polling --------------------------------------------------------------------
+
+    def _snapshot(self):
+        snapshot = {}
+        try:
+            with os.scandir(self.models_dir) as sites:
+                for site in sites:
+                    if not site.is_dir():
+                        continue
+                    try:
+                        snapshot[(site.name, None)] = site.stat().st_mtime_ns
+                        with os.scandir(site.path) as models:
+                            for model in models:
+                                if model.is_dir():
+                                    snapshot[(site.name, model.name)] = model.stat().st_mtime_ns
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return snapshot
+
+    def _run_polling(self):
+        self.mode = "polling"
+        previous = self._snapshot()
+        while not self._stop.wait(self.poll_interval):
+            current = self._snapshot()
+            for key in previous.keys() | current.keys():
+                if previous.get(key) != current.get(key):
+                    self._mark(*key)
+            previous = current
+            self._flush(force=True)
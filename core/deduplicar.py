@@ -0,0 +1,249 @@
+import os
+import errno
+import struct
+import argparse
+
+try:
+    from core.verificar_duplicatas import files_are_identical, find_duplicates
+except ImportError:  # Executado como script: python core/deduplicar.py
+    from verificar_duplicatas import files_are_identical, find_duplicates
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem ioctl, só hardlinks
+    fcntl = None
+
+LINK_MODES = ("auto", "reflink", "hardlink")  # auto = reflink se o sistema de arquivos suportar, senão hardlink
+FICLONE = 0x40049409  # ioctl do Linux (Btrfs, XFS, bcachefs...): clona os blocos sem copiar dados
+TEMP_SUFFIX = ".dedup-tmp"
+FS_IOC_FIEMAP = 0xC020660B  # Mapa de extents do arquivo (Linux)
+FIEMAP_FLAG_SYNC = 0x1
+FIEMAP_EXTENT_LAST = 0x1
+FIEMAP_EXTENT_SHARED = 0x2000  # Extent compartilhado com outro arquivo (reflink/snapshot)
+FIEMAP_BATCH = 64  # Extents pedidos por ioctl
+_FIEMAP_HEADER = struct.Struct("=QQLLLL")
+_FIEMAP_EXTENT = struct.Struct("=QQQQQLLLL")
+
+_reflink_support = {}  # st_dev -> bool (dry-run "auto": o sistema de arquivos clona?)
+
+
+def reflink(source, target):
+    """Cria `target` compartilhando os blocos de `source` (copy-on-write)."""
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "reflink indisponível nesta plataforma")
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+def file_extents(path):
+    """[(lógico, físico, tamanho, compartilhado)] dos extents do arquivo, ou None sem FIEMAP."""
+    if fcntl is None:
+        return None
+    extents = []
+    start = 0
+    try:
+        with open(path, 'rb') as handle:
+            while True:
+                request = bytearray(_FIEMAP_HEADER.size + FIEMAP_BATCH * _FIEMAP_EXTENT.size)
+                _FIEMAP_HEADER.pack_into(request, 0, start, 2**64 - 1 - start, FIEMAP_FLAG_SYNC, 0, FIEMAP_BATCH, 0)
+                fcntl.ioctl(handle.fileno(), FS_IOC_FIEMAP, request)
+                mapped = _FIEMAP_HEADER.unpack_from(request, 0)[3]
+                last = True
+                for index in range(mapped):
+                    logical, physical, length, _, _, flags, _, _, _ = _FIEMAP_EXTENT.unpack_from(
+                        request, _FIEMAP_HEADER.size + index * _FIEMAP_EXTENT.size
+                    )
+                    extents.append((logical, physical, length, bool(flags & FIEMAP_EXTENT_SHARED)))
+                    last = bool(flags & FIEMAP_EXTENT_LAST)
+                    start = logical + length
+                if mapped < FIEMAP_BATCH or last:
+                    return extents
+    except OSError:
+        return None
+
+
+def _shares_blocks(original, duplicate):
+    """True se o duplicado já aponta para os mesmos blocos do original (reflink anterior)."""
+    extents_original = file_extents(original)
+    if not extents_original or not all(shared for *_, shared in extents_original):
+        return False
+    extents_duplicate = file_extents(duplicate)
+    return bool(extents_duplicate) and (
+        [extent[:3] for extent in extents_duplicate] == [extent[:3] for extent in extents_original]
+    )
+
+
+def _resolve_method(original, duplicate, mode):
+    """Método que _link usaria, sem trocar nada (dry-run); "auto" testa um clone descartável."""
+    if mode == "hardlink":
+        return "hardlink"
+    if fcntl is None:
+        if mode == "reflink":
+            raise OSError(errno.EOPNOTSUPP, "reflink indisponível nesta plataforma")
+        return "hardlink"
+    dev = os.stat(duplicate).st_dev
+    if dev not in _reflink_support:
+        probe = duplicate + TEMP_SUFFIX
+        try:
+            reflink(original, probe)
+            _reflink_support[dev] = True
+        except OSError:
+            _reflink_support[dev] = False
+        finally:
+            if os.path.exists(probe):
+                os.remove(probe)
+    if _reflink_support[dev]:
+        return "reflink"
+    if mode == "reflink":
+        raise OSError(errno.EOPNOTSUPP, "sistema de arquivos sem suporte a reflink")
+    return "hardlink"
+
+
+def _reclaimable(st_duplicate, duplicate, method):
+    """Bytes liberados ao trocar o duplicado por um link.
+
+    Outro nome (hardlink) segura os blocos: nada é liberado. Para reflink, extents que o
+    duplicado já compartilha com outros arquivos também não são liberados; sem FIEMAP a conta
+    é um limite superior.
+    """
+    if st_duplicate.st_nlink > 1:
+        return 0
+    if method != "reflink":
+        return st_duplicate.st_size
+    extents = file_extents(duplicate) or []
+    shared = sum(length for _, _, length, is_shared in extents if is_shared)
+    return max(st_duplicate.st_size - shared, 0)
+
+
+def _link(original, temp_path, mode):
+    """Cria o link em temp_path e retorna o método usado ("reflink" ou "hardlink")."""
+    if mode in ("auto", "reflink"):
+        try:
+            reflink(original, temp_path)
+            return "reflink"
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            if mode == "reflink":
+                raise
+    os.link(original, temp_path)
+    return "hardlink"
+
+
+def replace_with_link(original, duplicate, mode="auto", dry_run=True):
+    """Substitui `duplicate` por um link para `original`, após conferir os bytes.
+
+    O link é criado ao lado do duplicado e trocado com os.replace, então a pasta nunca fica
+    sem o arquivo. Retorna {"duplicate", "original", "method", "bytes"} ou levanta OSError/ValueError.
+    """
+    st_original = os.stat(original)
+    st_duplicate = os.stat(duplicate)
+    if (st_original.st_dev, st_original.st_ino) == (st_duplicate.st_dev, st_duplicate.st_ino):
+        raise ValueError("already_linked")
+    if st_original.st_size != st_duplicate.st_size:
+        raise ValueError("size_mismatch")
+    if st_original.st_dev != st_duplicate.st_dev:
+        raise ValueError("different_filesystem")
+    if mode != "hardlink" and _shares_blocks(original, duplicate):
+        raise ValueError("already_reflinked")  # Clonar de novo não libera nada
+    if not files_are_identical(original, duplicate):
+        raise ValueError("content_mismatch")
+
+    if dry_run:
+        method = _resolve_method(original, duplicate, mode)
+        return {"duplicate": duplicate, "original": original, "method": method,
+                "bytes": _reclaimable(st_duplicate, duplicate, method)}
+
+    # Calculado antes da troca: depois dela os extents do duplicado já são os do original
+    reclaimable = {method: _reclaimable(st_duplicate, duplicate, method) for method in ("reflink", "hardlink")}
+    action = {"duplicate": duplicate, "original": original, "method": mode, "bytes": 0}
+    temp_path = duplicate + TEMP_SUFFIX
+    try:
+        action["method"] = _link(original, temp_path, mode)
+        action["bytes"] = reclaimable[action["method"]]
+        if action["method"] == "reflink":
+            # Clone é um arquivo novo: mantém as datas do duplicado (ordenação das pastas)
+            os.utime(temp_path, ns=(st_duplicate.st_atime_ns, st_duplicate.st_mtime_ns))
+        os.replace(temp_path, duplicate)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return action
+
+
+def dedup_groups(groups, mode="auto", dry_run=True, progress_callback=None):
+    """Substitui por links todos os duplicados dos grupos (listas de caminhos idênticos).
+
+    Em cada grupo o arquivo mantido é o que já tem mais links (senão o primeiro). Retorna um
+    relatório com as ações, os itens ignorados/com erro e o espaço recuperado (ou a recuperar,
+    em dry_run).
+    """
+    if mode not in LINK_MODES:
+        raise ValueError(f"Modo desconhecido: {mode}")
+
+    report = {"mode": mode, "dry_run": dry_run, "actions": [], "skipped": [], "errors": [], "reclaimed_bytes": 0}
+    total = sum(max(len(group) - 1, 0) for group in groups)
+    done = 0
+    for group in groups:
+        existing = [path for path in group if os.path.isfile(path)]
+        if len(existing) < 2:
+            continue
+        keeper = max(existing, key=lambda path: os.stat(path).st_nlink)
+        for duplicate in existing:
+            if duplicate == keeper:
+                continue
+            done += 1
+            try:
+                action = replace_with_link(keeper, duplicate, mode=mode, dry_run=dry_run)
+                report["actions"].append(action)
+                report["reclaimed_bytes"] += action["bytes"]
+            except ValueError as e:
+                report["skipped"].append({"path": duplicate, "reason": str(e)})
+            except OSError as e:
+                print(f"Erro ao deduplicar '{duplicate}': {e}")
+                report["errors"].append({"path": duplicate, "error": str(e)})
+            if progress_callback:
+                progress_callback(done, total)
+    return report
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Substituir duplicatas por hardlinks/reflinks (sem apagar das pastas).")
+    parser.add_argument("folder", nargs="?", default=".", help="Caminho da pasta para deduplicar (padrão: pasta atual)")
+    parser.add_argument("--mode", choices=LINK_MODES, default="auto", help="Tipo de link (padrão: auto)")
+    parser.add_argument("--apply", action="store_true", help="Aplica as substituições (sem isso, só relata: dry-run)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.folder):
+        print(f"Erro: A pasta '{args.folder}' não existe.")
+        return
+
+    duplicates, _ = find_duplicates(args.folder)
+    report = dedup_groups(list(duplicates.values()), mode=args.mode, dry_run=not args.apply)
+
+    print("\n" + "="*40)
+    print("RELATÓRIO DE DEDUPLICAÇÃO" + ("" if args.apply else " (dry-run)"))
+    print("="*40)
+    for action in report["actions"]:
+        print(f" - [{action['method']}] {action['duplicate']} -> {action['original']}")
+    for item in report["skipped"]:
+        print(f" - ignorado ({item['reason']}): {item['path']}")
+    for item in report["errors"]:
+        print(f" - erro: {item['path']}: {item['error']}")
+    verb = "Recuperado" if args.apply else "A recuperar"
+    print(f"\n{verb}: {format_bytes(report['reclaimed_bytes'])} em {len(report['actions'])} arquivos")
+    if not args.apply and report["actions"]:
+        print("Use --apply para aplicar.")
+    print("="*40)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+
+# Local compartilhado entre a CLI (verificar_duplicatas) e o catalog_server
+CACHE_ENV_VAR = "ARCHIVE_DOWNLOADER_HASH_CACHE"
+CACHE_FILENAME = "hash_cache.sqlite3"
+LEGACY_JSON_CACHE = ".duplicate_cache.json"
+
+FLUSH_EVERY = 256  # Upserts acumulados antes de gravar no SQLite
+PRUNE_INTERVAL = 24 * 3600  # Remove entradas de arquivos sumidos no máximo 1x por dia
+PRUNE_BATCH = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_hashes (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    algo TEXT NOT NULL,
+    path TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    cached_at REAL NOT NULL,
+    PRIMARY KEY (dev, ino, size, mtime_ns, algo)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_file_hashes_path ON file_hashes(path);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scan_roots (
+    root TEXT PRIMARY KEY,
+    settings TEXT NOT NULL,
+    scanned_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scan_files (
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    PRIMARY KEY (root, path)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS scan_groups (
+    root TEXT NOT NULL,
+    group_key TEXT NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (root, group_key, path)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS scan_results (
+    root TEXT PRIMARY KEY,
+    results TEXT NOT NULL,
+    tree TEXT NOT NULL,
+    saved_at REAL NOT NULL
+);
+"""
+
+
+def default_cache_path():
+    """Retorna o caminho padrão do cache de hashes (sobrescrevível via variável de ambiente)."""
+    override = os.getenv(CACHE_ENV_VAR)
+    if override:
+        return override
+    base = os.getenv("APPDATA") or os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "Archive-Downloader", CACHE_FILENAME)
+
+
+def stat_key(st):
+    """Chave de identidade de um arquivo: (device, inode, tamanho, mtime_ns)."""
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class HashStore:
+    """Cache de hashes em SQLite, chaveado por (dev, inode, tamanho, mtime_ns, algoritmo).
+
+    O caminho fica em um índice secundário, usado para a poda de arquivos que sumiram.
+    Thread-safe: uma conexão compartilhada protegida por lock, com upserts em lote.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_cache_path()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def get(self, st, algo="sha256"):
+        """Retorna o hash em cache para o stat informado, ou None."""
+        key = stat_key(st) + (algo,)
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending:
+                return pending[1]
+            row = self._conn.execute(
+                "SELECT hash FROM file_hashes WHERE dev=? AND ino=? AND size=? AND mtime_ns=? AND algo=?",
+                key,
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, path, st, file_hash, algo="sha256"):
+        """Registra um hash; a gravação é feita em lote a cada FLUSH_EVERY entradas."""
+        key = stat_key(st) + (algo,)
+        with self._lock:
+            self._pending[key] = (path, file_hash, time.time())
+            if len(self._pending) >= FLUSH_EVERY:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        rows = [key + value for key, value in self._pending.items()]
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO file_hashes (dev, ino, size, mtime_ns, algo, path, hash, cached_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        self._conn.commit()
+        self._pending.clear()
+
+    def count(self):
+        with self._lock:
+            self._flush_locked()
+            return self._conn.execute("SELECT COUNT(*) FROM file_hashes").fetchone()[0]
+
+    def prune(self, force=False):
+        """Remove entradas cujo arquivo sumiu ou mudou. Retorna quantas foram removidas.
+
+        Sem force, roda no máximo uma vez a cada PRUNE_INTERVAL segundos.
+        """
+        now = time.time()
+        with self._lock:
+            self._flush_locked()
+            row = self._conn.execute("SELECT value FROM meta WHERE key='last_prune'").fetchone()
+        if not force and row and now - float(row[0]) < PRUNE_INTERVAL:
+            return 0
+
+        removed = 0
+        # Pagina pela chave completa: o mesmo caminho tem uma linha por algoritmo/mtime, e um lote
+        # que termina no meio delas não pode pular o resto (idx_file_hashes_path já inclui a chave)
+        last_key = None
+        while True:
+            with self._lock:
+                if last_key is None:
+                    rows = self._conn.execute(
+                        "SELECT path, dev, ino, size, mtime_ns, algo FROM file_hashes "
+                        "ORDER BY path, dev, ino, size, mtime_ns, algo LIMIT ?",
+                        (PRUNE_BATCH,),
+                    ).fetchall()
+                else:
+                    rows = self._conn.execute(
+                        "SELECT path, dev, ino, size, mtime_ns, algo FROM file_hashes "
+                        "WHERE (path, dev, ino, size, mtime_ns, algo) > (?, ?, ?, ?, ?, ?) "
+                        "ORDER BY path, dev, ino, size, mtime_ns, algo LIMIT ?",
+                        (*last_key, PRUNE_BATCH),
+                    ).fetchall()
+            if not rows:
+                break
+            last_key = rows[-1]
+
+            stale = []
+            for path, dev, ino, size, mtime_ns, algo in rows:
+                try:
+                    current = stat_key(os.stat(path))
+                except OSError:
+                    current = None
+                if current != (dev, ino, size, mtime_ns):
+                    stale.append((dev, ino, size, mtime_ns, algo))
+
+            if stale:
+                with self._lock:
+                    self._conn.executemany(
+                        "DELETE FROM file_hashes WHERE dev=? AND ino=? AND size=? AND mtime_ns=? AND algo=?",
+                        stale,
+                    )
+                    self._conn.commit()
+                removed += len(stale)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_prune', ?)", (str(now),)
+            )
+            self._conn.commit()
+        return removed
+
+    def import_legacy_json(self, json_path):
+        """Importa o antigo .duplicate_cache.json (chaveado por caminho) se ainda for válido."""
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except Exception:
+            return 0
+
+        imported = 0
+        for path, entry in legacy.items():
+            if not isinstance(entry, dict) or "hash" not in entry:
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            # Mesmo critério do cache antigo: tamanho igual e mtime com tolerância de 1s
+            if entry.get("size") != st.st_size or abs(entry.get("mtime", 0) - st.st_mtime) >= 1:
+                continue
+            self.put(path, st, entry["hash"], entry.get("algo", "sha256"))
+            imported += 1
+        self.flush()
+        return imported
+
+    def load_scan_state(self, root, settings):
+        """Retorna ({caminho: (tamanho, mtime_ns)}, {grupo: [caminhos]}) do último scan de `root`.
+
+        None se a pasta nunca foi escaneada ou se foi com outras configurações (algoritmo,
+        modo de verificação, extensões), caso em que o scan precisa ser completo.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT settings FROM scan_roots WHERE root=?", (root,)).fetchone()
+            if not row or row[0] != settings:
+                return None
+            files = {
+                path: (size, mtime_ns)
+                for path, size, mtime_ns in self._conn.execute(
+                    "SELECT path, size, mtime_ns FROM scan_files WHERE root=?", (root,)
+                )
+            }
+            groups = {}
+            for group_key, path in self._conn.execute(
+                "SELECT group_key, path FROM scan_groups WHERE root=?", (root,)
+            ):
+                groups.setdefault(group_key, []).append(path)
+        return files, groups
+
+    def save_scan_state(self, root, settings, files, groups, previous_files=None):
+        """Grava o estado do scan de `root`; com previous_files, só escreve o que mudou."""
+        with self._lock:
+            conn = self._conn
+            if previous_files is None:
+                conn.execute("DELETE FROM scan_files WHERE root=?", (root,))
+                previous_files = {}
+            removed = [(root, path) for path in previous_files if path not in files]
+            changed = [
+                (root, path, size, mtime_ns)
+                for path, (size, mtime_ns) in files.items()
+                if previous_files.get(path) != (size, mtime_ns)
+            ]
+            conn.executemany("DELETE FROM scan_files WHERE root=? AND path=?", removed)
+            conn.executemany(
+                "INSERT OR REPLACE INTO scan_files (root, path, size, mtime_ns) VALUES (?, ?, ?, ?)", changed
+            )
+            conn.execute("DELETE FROM scan_groups WHERE root=?", (root,))
+            conn.executemany(
+                "INSERT OR IGNORE INTO scan_groups (root, group_key, path) VALUES (?, ?, ?)",
+                [(root, group_key, path) for group_key, paths in groups.items() for path in paths],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO scan_roots (root, settings, scanned_at) VALUES (?, ?, ?)",
+                (root, settings, time.time()),
+            )
+            conn.commit()
+
+    def load_scan_results(self, root):
+        """Retorna (resultados, {pasta: mtime_ns}) do último scan salvo de `root`, ou None."""
+        with self._lock:
+            row = self._conn.execute("SELECT results, tree FROM scan_results WHERE root=?", (root,)).fetchone()
+        if not row:
+            return None
+        return json.loads(row[0]), json.loads(row[1])
+
+    def save_scan_results(self, root, results, tree):
+        """Grava o resultado apresentado pelo catálogo junto com o retrato das pastas escaneadas."""
+        payload = json.dumps(results, ensure_ascii=False)
+        tree_payload = json.dumps(tree, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scan_results (root, results, tree, saved_at) VALUES (?, ?, ?, ?)",
+                (root, payload, tree_payload, time.time()),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            for table in ("file_hashes", "meta", "scan_roots", "scan_files", "scan_groups", "scan_results"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
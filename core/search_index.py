@@ -0,0 +1,124 @@
+import bisect
+import threading
+
+WORD_SEPARATORS = " _-.()[]"
+# Faixas do ranking: nome igual, começa com a busca, começa uma palavra, contém
+RANK_EXACT, RANK_PREFIX, RANK_WORD, RANK_SUBSTRING = range(4)
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ModelSearchIndex:
+    """Índice em memória dos nomes de modelos para a busca do catálogo.
+
+    Prefixos saem de um array ordenado de nomes (bisect) e substrings do índice de trigramas
+    (interseção das listas dos trigramas da busca, depois confirmação com `in`). Buscas de 1-2
+    caracteres não têm trigramas e percorrem os nomes em memória. Atualizado por modelo via
+    update()/remove(), sem reconstruir o resto.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models = {}  # (site, nome) -> (nome_minúsculo, thumb, imagens, vídeos)
+        self._sorted = []  # (nome_minúsculo, site, nome)
+        self._grams = {}  # trigrama -> {(site, nome)}
+
+    def __len__(self):
+        return len(self._models)
+
+    def load(self, rows):
+        """Substitui o conteúdo por linhas (site, nome, thumb, imagens, vídeos)."""
+        models = {}
+        grams = {}
+        for site, name, thumb, images, videos in rows:
+            lower = name.lower()
+            models[(site, name)] = (lower, thumb, images, videos)
+            for gram in trigrams(lower):
+                grams.setdefault(gram, set()).add((site, name))
+        ordered = sorted((lower, site, name) for (site, name), (lower, *_) in models.items())
+        with self._lock:
+            self._models, self._sorted, self._grams = models, ordered, grams
+
+    def update(self, site, name, thumb, images, videos):
+        with self._lock:
+            self._discard(site, name)
+            lower = name.lower()
+            self._models[(site, name)] = (lower, thumb, images, videos)
+            bisect.insort(self._sorted, (lower, site, name))
+            for gram in trigrams(lower):
+                self._grams.setdefault(gram, set()).add((site, name))
+
+    def remove(self, site, name):
+        with self._lock:
+            self._discard(site, name)
+
+    def remove_site(self, site):
+        with self._lock:
+            for key in [key for key in self._models if key[0] == site]:
+                self._discard(*key)
+
+    def _discard(self, site, name):
+        entry = self._models.pop((site, name), None)
+        if entry is None:
+            return
+        lower = entry[0]
+        pos = bisect.bisect_left(self._sorted, (lower, site, name))
+        if pos < len(self._sorted) and self._sorted[pos] == (lower, site, name):
+            del self._sorted[pos]
+        for gram in trigrams(lower):
+            keys = self._grams.get(gram)
+            if keys is not None:
+                keys.discard((site, name))
+                if not keys:
+                    del self._grams[gram]
+
+    def search(self, query, site=None, offset=0, limit=0):
+        """Retorna (resultados da página, total) ordenados por relevância e depois por nome."""
+        query = query.lower()
+        with self._lock:
+            # Prefixo: fatia contígua do array ordenado (já sai na ordem certa)
+            prefixed = {}
+            for pos in range(bisect.bisect_left(self._sorted, (query,)), len(self._sorted)):
+                lower, s, name = self._sorted[pos]
+                if not lower.startswith(query):
+                    break
+                prefixed[(s, name)] = RANK_EXACT if lower == query else RANK_PREFIX
+
+            if len(query) >= 3:
+                postings = sorted((self._grams.get(gram, ()) for gram in trigrams(query)), key=len)
+                candidates = set(postings[0]).intersection(*postings[1:])
+            else:
+                candidates = {key for key, entry in self._models.items() if query in entry[0]}
+            ranked = []
+            for key in prefixed.keys() | candidates:
+                if site is not None and key[0] != site:
+                    continue
+                lower, thumb, images, videos = self._models[key]
+                rank = prefixed.get(key)
+                if rank is None:
+                    rank = self._rank(query, lower)
+                    if rank is None:
+                        continue  # Trigramas em comum, mas fora de ordem
+                ranked.append((rank, len(lower), lower, key[0], key[1], thumb, images, videos))
+
+        ranked.sort()
+        page = ranked[offset:offset + limit] if limit > 0 else ranked[offset:]
+        results = [
+            {"site": s, "name": name, "thumb": thumb, "image_count": images, "video_count": videos}
+            for _, _, _, s, name, thumb, images, videos in page
+        ]
+        return results, len(ranked)
+
+    @staticmethod
+    def _rank(query, lower):
+        """Faixa de um nome que não começa com a busca (None se não a contém)."""
+        pos = lower.find(query)
+        if pos < 0:
+            return None
+        while pos > 0:
+            if lower[pos - 1] in WORD_SEPARATORS:
+                return RANK_WORD
+            pos = lower.find(query, pos + 1)
+        return RANK_SUBSTRING
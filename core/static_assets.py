@@ -0,0 +1,145 @@
+import os
+import re
+import gzip
+import hashlib
+import threading
+
+try:
+    import brotli
+except ImportError:  # Opcional: sem brotli, só gzip
+    brotli = None
+
+TEXT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".json": "application/json; charset=utf-8",
+    ".svg": "image/svg+xml",
+}
+FINGERPRINT_LEN = 10
+# style.css -> style.3f2a9c1b0d.css (só referências relativas a .js/.css dentro do HTML)
+_ASSET_REF = re.compile(r'(\b(?:src|href)=")([^"/:?#]+\.(?:js|css))(")')
+_FINGERPRINTED = re.compile(rf"^(.+)\.([0-9a-f]{{{FINGERPRINT_LEN}}})(\.[A-Za-z0-9]+)$")
+
+
+class StaticAsset:
+    """Um arquivo da UI em memória, com as variantes comprimidas e a impressão digital do conteúdo."""
+
+    __slots__ = ("name", "content_type", "fingerprint", "etag", "mtime_ns", "size", "variants", "deps")
+
+    def __init__(self, name, data, mtime_ns, size, deps=None):
+        self.name = name
+        self.deps = deps or {}  # HTML: asset referenciado -> impressão digital usada na reescrita
+        self.content_type = TEXT_TYPES[os.path.splitext(name)[1].lower()]
+        self.fingerprint = hashlib.sha256(data).hexdigest()[:FINGERPRINT_LEN]
+        self.etag = f'W/"{self.fingerprint}"'  # Fraca: o mesmo conteúdo sai em várias codificações
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.variants = {"identity": data, "gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(data, quality=11)
+        # Variante comprimida maior que o original (arquivos minúsculos) não vale a pena
+        for encoding in [e for e in self.variants if e != "identity"]:
+            if len(self.variants[encoding]) >= len(data):
+                del self.variants[encoding]
+
+    @property
+    def fingerprinted_name(self):
+        base, ext = os.path.splitext(self.name)
+        return f"{base}.{self.fingerprint}{ext}"
+
+
+class StaticAssets:
+    """Serve a pasta da UI com assets pré-comprimidos (gzip/brotli) e nomes com hash de conteúdo.
+
+    Cada arquivo é lido e comprimido uma vez (no primeiro pedido ou em warm()) e revalidado com
+    um stat por pedido, então editar a UI com o servidor rodando continua funcionando. O HTML é
+    reescrito para apontar para `nome.<hash>.ext`, que pode ser cacheado como immutable.
+    """
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        self._assets = {}
+        self._lock = threading.Lock()
+
+    def warm(self):
+        """Pré-carrega todos os assets (chamado em segundo plano na subida do servidor)."""
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                rel = os.path.relpath(os.path.join(root, name), self.directory).replace(os.sep, "/")
+                if os.path.splitext(name)[1].lower() in TEXT_TYPES:
+                    self.get(rel)
+
+    def resolve(self, url_path):
+        """(asset, fingerprinted) para um caminho de URL, ou (None, False) se não for asset da UI.
+
+        `fingerprinted` só é True se o hash pedido for o do conteúdo atual (pode ser immutable).
+        """
+        rel = url_path.lstrip("/") or "index.html"
+        if rel.endswith("/"):
+            rel += "index.html"
+        match = _FINGERPRINTED.match(rel)
+        if match:
+            asset = self.get(match.group(1) + match.group(3))
+            return asset, asset is not None and asset.fingerprint == match.group(2)
+        return self.get(rel), False
+
+    def get(self, rel):
+        if os.path.splitext(rel)[1].lower() not in TEXT_TYPES:
+            return None
+        path = os.path.realpath(os.path.join(self.directory, rel))
+        if os.path.commonpath([path, self.directory]) != self.directory:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            asset = self._assets.get(rel)
+        if (
+            asset is not None
+            and (asset.mtime_ns, asset.size) == (st.st_mtime_ns, st.st_size)
+            and self._deps_current(asset)
+        ):
+            return asset
+        try:
+            with open(path, "rb") as handle:
+                data = handle.read()
+        except OSError:
+            return None
+        deps = None
+        if rel.lower().endswith(".html"):
+            data, deps = self._rewrite_html(rel, data)
+        asset = StaticAsset(rel, data, st.st_mtime_ns, st.st_size, deps)
+        with self._lock:
+            self._assets[rel] = asset
+        return asset
+
+    def _deps_current(self, asset):
+        """False se algum .js/.css referenciado pelo HTML mudou (ou surgiu) desde a reescrita."""
+        for dep, fingerprint in asset.deps.items():
+            current = self.get(dep)
+            if (current.fingerprint if current is not None else None) != fingerprint:
+                return False
+        return True
+
+    def _rewrite_html(self, rel, data):
+        """Troca referências a .js/.css pelos nomes com hash (o HTML em si nunca é immutable).
+
+        Retorna (html, deps): deps guarda a impressão digital de cada referência, para o HTML ser
+        reescrito (e ganhar outro ETag) quando um asset referenciado mudar.
+        """
+        folder = os.path.dirname(rel)
+        deps = {}
+
+        def replace(match):
+            ref = match.group(2)
+            dep = f"{folder}/{ref}" if folder else ref
+            asset = self.get(dep)
+            deps[dep] = asset.fingerprint if asset is not None else None
+            if asset is None:
+                return match.group(0)
+            base, ext = os.path.splitext(ref)
+            return f"{match.group(1)}{base}.{asset.fingerprint}{ext}{match.group(3)}"
+
+        return _ASSET_REF.sub(replace, data.decode("utf-8")).encode("utf-8"), deps
@@ -0,0 +1,378 @@
+import os
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+try:
+    from core.hash_store import default_cache_path
+except ImportError:  # Executado fora do pacote
+    from hash_store import default_cache_path
+
+# Pillow e OpenCV são opcionais: Pillow decodifica JPEG já reduzido (draft), OpenCV cobre vídeos
+try:
+    from PIL import Image, ImageOps, features as pil_features
+except ImportError:
+    Image = None
+
+try:
+    import cv2
+    import numpy as np
+except ImportError:
+    cv2 = None
+    np = None
+
+THUMBNAILS_AVAILABLE = Image is not None or cv2 is not None
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp'}
+VIDEO_EXTENSIONS = {'.mp4', '.webm', '.avi', '.mov', '.mkv', '.flv', '.wmv', '.m4v'}
+
+THUMB_SIZES = (180, 360, 720)  # Menor lado da miniatura; a grade usa 180px de altura (360 = telas HiDPI)
+DEFAULT_THUMB_SIZE = 360
+MAX_ASPECT = 4  # O lado maior fica limitado a 4x o menor (panorâmicas/prints muito altos)
+THUMB_QUALITY = 80
+THUMB_CACHE_BYTES = 512 * 1024 * 1024  # Orçamento em disco; acima disso os menos usados saem
+EVICT_TARGET = 0.9  # Ao estourar o orçamento, libera até 90% dele (evita despejos a cada gravação)
+VIDEO_SEEK_MS = 1000  # Primeiro quadro após 1s: o quadro 0 costuma ser preto/vinheta
+PREFETCH_WORKERS = 2
+PREFETCH_MAX_PENDING = 5000  # Pré-geração além disso é descartada (a sob demanda continua valendo)
+
+
+def default_thumb_dir():
+    """Pasta de miniaturas ao lado do cache de hashes."""
+    return os.path.join(os.path.dirname(default_cache_path()), "thumbs")
+
+
+def snap_size(size):
+    """Arredonda o tamanho pedido para um dos THUMB_SIZES (limita as variantes em disco)."""
+    for allowed in THUMB_SIZES:
+        if size <= allowed:
+            return allowed
+    return THUMB_SIZES[-1]
+
+
+def _fit(width, height, size):
+    """Caixa de corte (x, y, w, h) na origem e dimensões finais da miniatura.
+
+    O menor lado vira `size` (sem ampliar) e o maior fica limitado a MAX_ASPECT vezes isso,
+    com corte central: a grade usa object-fit: cover, então o excesso nem apareceria.
+    """
+    scale = min(1.0, size / min(width, height))
+    limit = size * MAX_ASPECT
+    target_w = min(max(1, round(width * scale)), limit)
+    target_h = min(max(1, round(height * scale)), limit)
+    crop_w = min(width, round(target_w / scale))
+    crop_h = min(height, round(target_h / scale))
+    return ((width - crop_w) // 2, (height - crop_h) // 2, crop_w, crop_h), (target_w, target_h)
+
+
+def _webp_supported():
+    if Image is not None:
+        return pil_features.check("webp")
+    return cv2 is not None and cv2.haveImageWriter(".webp")
+
+
+# --- Decodificação/codificação ------------------------------------------------------
+
+def _thumb_pillow(file_path, size, fmt):
+    with Image.open(file_path) as img:
+        # draft() faz o decoder JPEG reduzir por 1/2, 1/4 ou 1/8 direto no IDCT
+        img.draft("RGB", (size, size))
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        (x, y, crop_w, crop_h), target = _fit(img.width, img.height, size)
+        img = img.resize(target, Image.LANCZOS, box=(x, y, x + crop_w, y + crop_h))
+        buffer = BytesIO()
+        if fmt == "webp":
+            img.save(buffer, "WEBP", quality=THUMB_QUALITY, method=4)
+        else:
+            img.save(buffer, "JPEG", quality=THUMB_QUALITY, optimize=True, progressive=True)
+        return buffer.getvalue()
+
+
+def _resize_cv2(frame, size):
+    height, width = frame.shape[:2]
+    (x, y, crop_w, crop_h), target = _fit(width, height, size)
+    frame = frame[y:y + crop_h, x:x + crop_w]
+    if (crop_w, crop_h) != target:
+        frame = cv2.resize(frame, target, interpolation=cv2.INTER_AREA)
+    return frame
+
+
+def _encode_cv2(frame, fmt):
+    if fmt == "webp":
+        ok, encoded = cv2.imencode(".webp", frame, [cv2.IMWRITE_WEBP_QUALITY, THUMB_QUALITY])
+    else:
+        ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, THUMB_QUALITY])
+    return encoded.tobytes() if ok else None
+
+
+def _thumb_cv2_image(file_path, size, fmt):
+    # np.fromfile + imdecode aceita caminhos com acentos no Windows (cv2.imread não)
+    data = np.fromfile(file_path, dtype=np.uint8)
+    # Tenta primeiro 1/4 da resolução; só decodifica inteira se ficar menor que a miniatura
+    frame = cv2.imdecode(data, cv2.IMREAD_REDUCED_COLOR_4)
+    if frame is None or min(frame.shape[:2]) < size:
+        frame = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    if frame is None or frame.size == 0:
+        return None
+    return _encode_cv2(_resize_cv2(frame, size), fmt)
+
+
+def _thumb_cv2_video(file_path, size, fmt):
+    cap = cv2.VideoCapture(file_path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0
+        frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0
+        if fps > 0 and frame_count / fps * 1000 > VIDEO_SEEK_MS * 2:
+            cap.set(cv2.CAP_PROP_POS_MSEC, VIDEO_SEEK_MS)
+        ok, frame = cap.read()
+        if not ok or frame is None:
+            # Alguns containers não aceitam seek: volta para o primeiro quadro
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = cap.read()
+        if not ok or frame is None:
+            return None
+        return _encode_cv2(_resize_cv2(frame, size), fmt)
+    finally:
+        cap.release()
+
+
+def render_thumbnail(file_path, size=DEFAULT_THUMB_SIZE, fmt="webp"):
+    """Gera os bytes da miniatura (WebP ou JPEG) de uma imagem ou vídeo, ou None se não der."""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in VIDEO_EXTENSIONS:
+        return _thumb_cv2_video(file_path, size, fmt) if cv2 is not None else None
+    if ext not in IMAGE_EXTENSIONS:
+        return None
+    if Image is not None:
+        try:
+            return _thumb_pillow(file_path, size, fmt)
+        except Exception:
+            if cv2 is None:
+                raise
+    return _thumb_cv2_image(file_path, size, fmt) if cv2 is not None else None
+
+
+def media_dimensions(file_path):
+    """(largura, altura) lendo só o cabeçalho (Pillow) ou as propriedades do vídeo; None se não der."""
+    ext = os.path.splitext(file_path)[1].lower()
+    try:
+        if ext in VIDEO_EXTENSIONS:
+            if cv2 is None:
+                return None
+            cap = cv2.VideoCapture(file_path)
+            try:
+                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            finally:
+                cap.release()
+            return (width, height) if width > 0 and height > 0 else None
+        if ext in IMAGE_EXTENSIONS and Image is not None:
+            with Image.open(file_path) as img:
+                return img.size
+    except Exception:
+        return None
+    return None  # Sem Pillow, decodificar a imagem inteira só pela dimensão não compensa
+
+
+# --- Cache em disco -----------------------------------------------------------------
+
+class ThumbnailCache:
+    """Miniaturas em disco, chaveadas por (caminho, mtime, tamanho, lado).
+
+    Um arquivo alterado gera outra chave, então nunca há miniatura velha: as antigas só deixam
+    de ser lidas e saem pelo despejo por orçamento de bytes (menos usadas primeiro; cada leitura
+    atualiza o mtime da miniatura). A pré-geração roda num pool pequeno em segundo plano.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=THUMB_CACHE_BYTES, workers=PREFETCH_WORKERS):
+        self.cache_dir = cache_dir or default_thumb_dir()
+        self.max_bytes = max_bytes
+        self.format = "webp" if _webp_supported() else "jpg"
+        self.content_type = "image/webp" if self.format == "webp" else "image/jpeg"
+        self._lock = threading.Lock()
+        self._inflight = {}  # chave -> Lock (duas requisições da mesma miniatura geram uma vez)
+        self._pending = set()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumb")
+        self._evicting = False
+        self._bytes = None  # Medido em segundo plano na criação (varre a pasta uma vez)
+        self._failed = set()  # Arquivos que não decodificam (a chave muda se o arquivo mudar)
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.failures = 0
+        self.evictions = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._executor.submit(self._measure)
+
+    def _path_for(self, file_path, st, size):
+        key = f"{os.path.abspath(file_path)}|{st.st_mtime_ns}|{st.st_size}|{size}"
+        digest = hashlib.sha1(key.encode("utf-8", "surrogatepass")).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.{self.format}")
+
+    def get(self, file_path, size=DEFAULT_THUMB_SIZE):
+        """Caminho da miniatura em disco (gerando se preciso) ou None se não for possível."""
+        size = snap_size(size)
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        thumb_path = self._path_for(file_path, st, size)
+        if self._touch(thumb_path):
+            with self._lock:
+                self.hits += 1
+            return thumb_path
+
+        with self._lock:
+            self.misses += 1
+            if thumb_path in self._failed:
+                return None
+            key_lock = self._inflight.setdefault(thumb_path, threading.Lock())
+        try:
+            with key_lock:
+                if os.path.exists(thumb_path):
+                    return thumb_path  # Gerada por outra thread enquanto esperávamos
+                return self._generate(file_path, thumb_path, size)
+        finally:
+            with self._lock:
+                self._inflight.pop(thumb_path, None)
+
+    @staticmethod
+    def _touch(thumb_path):
+        try:
+            os.utime(thumb_path)  # Marca como usada recentemente (ordem do despejo)
+            return True
+        except OSError:
+            return False
+
+    def _generate(self, file_path, thumb_path, size):
+        try:
+            data = render_thumbnail(file_path, size, self.format)
+        except Exception as e:
+            print(f"[WARN] Falha ao gerar miniatura de {file_path}: {e}")
+            data = None
+        if not data:
+            with self._lock:
+                self.failures += 1
+                if len(self._failed) >= PREFETCH_MAX_PENDING:
+                    self._failed.clear()
+                self._failed.add(thumb_path)
+            return None
+
+        os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+        temp_path = f"{thumb_path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as handle:
+                handle.write(data)
+            os.replace(temp_path, thumb_path)
+        except OSError as e:
+            print(f"[WARN] Falha ao gravar miniatura {thumb_path}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return None
+
+        with self._lock:
+            self.generated += 1
+            if self._bytes is None:
+                return thumb_path  # Medição inicial ainda em andamento (já conta este arquivo)
+            self._bytes += len(data)
+            over_budget = self._bytes > self.max_bytes and not self._evicting
+            if over_budget:
+                self._evicting = True
+        if over_budget:
+            self._executor.submit(self._evict)
+        return thumb_path
+
+    def prefetch(self, file_paths, size=DEFAULT_THUMB_SIZE):
+        """Enfileira a geração em segundo plano das miniaturas que ainda não existem."""
+        size = snap_size(size)
+        for file_path in file_paths:
+            with self._lock:
+                if len(self._pending) >= PREFETCH_MAX_PENDING:
+                    return
+                job = (file_path, size)
+                if job in self._pending:
+                    continue
+                self._pending.add(job)
+            self._executor.submit(self._prefetch_one, job)
+
+    def _prefetch_one(self, job):
+        try:
+            self.get(*job)
+        finally:
+            with self._lock:
+                self._pending.discard(job)
+
+    def _entries(self):
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _measure(self):
+        total = sum(size for _, size, _ in self._entries())
+        with self._lock:
+            self._bytes = total
+            over_budget = total > self.max_bytes and not self._evicting
+            if over_budget:
+                self._evicting = True
+        if over_budget:
+            self._evict()
+
+    def _evict(self):
+        """Remove as miniaturas menos usadas até caber em EVICT_TARGET do orçamento."""
+        try:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            target = self.max_bytes * EVICT_TARGET
+            removed = 0
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            with self._lock:
+                self._bytes = total
+                self.evictions += removed
+        finally:
+            with self._lock:
+                self._evicting = False
+
+    def clear(self):
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._bytes = 0
+            self._failed.clear()
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "format": self.format,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "generated": self.generated,
+                "failures": self.failures,
+                "evictions": self.evictions,
+                "pending": len(self._pending),
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
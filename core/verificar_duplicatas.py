@@ -1,162 +1,478 @@
 import os
 import hashlib
 import argparse
-import json
+import mmap
+import threading
 import time
 from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-# Cache global para armazenar hashes de arquivos
-_hash_cache = {}
-_cache_file = ".duplicate_cache.json"
-_cache_modified = False
+try:
+    from core.hash_store import HashStore, LEGACY_JSON_CACHE, default_cache_path
+except ImportError:  # Executado como script: python core/verificar_duplicatas.py
+    from hash_store import HashStore, LEGACY_JSON_CACHE, default_cache_path
+
+# Cache global de hashes (SQLite compartilhado com o catalog_server)
+_store = None
+_cache_file = default_cache_path()
 _cache_hits = 0
 _cache_misses = 0
+_cache_lock = threading.Lock()
+
+# Algoritmos de hash plugáveis: BLAKE3 (multithread) e xxh3-128 são bem mais rápidos que
+# SHA-256 para deduplicar o próprio acervo; SHA-256 continua como fallback sem dependências.
+HASH_ALGORITHMS = {"sha256": hashlib.sha256}
+try:
+    import blake3
+    HASH_ALGORITHMS["blake3"] = lambda: blake3.blake3(max_threads=blake3.blake3.AUTO)
+except ImportError:
+    pass
+try:
+    import xxhash
+    HASH_ALGORITHMS["xxh3_128"] = xxhash.xxh3_128
+except ImportError:
+    pass
+HASH_PREFERENCE = ("blake3", "xxh3_128", "sha256")
+HASH_BLOCK_SIZE = 1024 * 1024  # Blocos grandes: menos syscalls e permite o BLAKE3 usar várias threads
+
+# Pipeline em estágios: amostra (início + fim) -> hash completo -> verificação byte a byte
+SAMPLE_CHUNK = 64 * 1024  # Bytes lidos do início e do fim de cada arquivo no estágio de amostra
+SAMPLE_SUFFIX = "-sample"  # Digests de amostra ficam no cache como "<algo>-sample"
+VERIFY_MODES = ("hash", "multi", "always")  # Confiar no hash / verificar grupos 3+ / verificar tudo
+DEFAULT_VERIFY_MODE = "multi"
+_bytes_read = {"sample": 0, "full": 0, "verify": 0}
+VERIFY_SLICE = 8 * 1024 * 1024  # Janela comparada por vez nos arquivos mapeados
+MAX_MAPPED_FILES = 64  # Arquivos mapeados ao mesmo tempo na verificação multi-via
+
+# Hashing paralelo: hashlib libera o GIL em blocos grandes, então threads bastam
+DEFAULT_HASH_WORKERS = min(8, (os.cpu_count() or 1) + 2)  # +2 mantém o disco ocupado enquanto as CPUs fazem hash
+SCAN_PROGRESS_INTERVAL = 0.5  # Segundos entre eventos de progresso (mesmo sem grupo concluído)
+SCAN_INFLIGHT_PER_WORKER = 2  # Unidades (grupos de tamanho) submetidas por thread; o resto espera na fila
+
+def resolve_hash_algorithm(name=None):
+    """Resolve o nome do algoritmo ("auto" ou None = mais rápido instalado)."""
+    if not name or name == "auto":
+        return next(algo for algo in HASH_PREFERENCE if algo in HASH_ALGORITHMS)
+    if name not in HASH_ALGORITHMS:
+        print(f"⚠ Algoritmo '{name}' indisponível (biblioteca não instalada), usando sha256")
+        return "sha256"
+    return name
+
+_hash_algo = resolve_hash_algorithm()
+
+def set_hash_algorithm(name):
+    """Define o algoritmo usado por padrão nos scans e retorna o nome efetivo."""
+    global _hash_algo
+    _hash_algo = resolve_hash_algorithm(name)
+    return _hash_algo
+
+def get_hash_algorithm():
+    return _hash_algo
+
+def new_hasher(algo=None):
+    """Cria um objeto de hash (interface hashlib: update/hexdigest)."""
+    return HASH_ALGORITHMS[algo or _hash_algo]()
+
+def _get_store():
+    """Abre o cache SQLite sob demanda."""
+    global _store
+    with _cache_lock:
+        if _store is None:
+            is_new = not os.path.exists(_cache_file)
+            _store = HashStore(_cache_file)
+            if is_new and os.path.exists(LEGACY_JSON_CACHE):
+                imported = _store.import_legacy_json(LEGACY_JSON_CACHE)
+                print(f"✓ Cache JSON antigo importado: {imported} entradas")
+        return _store
 
 def load_cache(cache_path=None):
-    """Carrega o cache de hashes do disco."""
-    global _hash_cache, _cache_file
-    if cache_path:
-        _cache_file = cache_path
-    
-    if os.path.exists(_cache_file):
-        try:
-            with open(_cache_file, 'r', encoding='utf-8') as f:
-                _hash_cache = json.load(f)
-            print(f"✓ Cache carregado: {len(_hash_cache)} entradas")
-            return len(_hash_cache)
-        except Exception as e:
-            print(f"⚠ Erro ao carregar cache: {e}")
-            _hash_cache = {}
-    else:
-        _hash_cache = {}
-    return 0
+    """Abre o cache de hashes (SQLite) e retorna o número de entradas."""
+    global _store, _cache_file
+    if cache_path and os.path.abspath(cache_path) != os.path.abspath(_cache_file):
+        with _cache_lock:
+            if _store is not None:
+                _store.close()
+                _store = None
+            _cache_file = cache_path
+
+    try:
+        entries = _get_store().count()
+        print(f"✓ Cache carregado: {entries} entradas")
+        return entries
+    except Exception as e:
+        print(f"⚠ Erro ao carregar cache: {e}")
+        return 0
 
 def save_cache(cache_path=None):
-    """Salva o cache de hashes no disco."""
-    global _hash_cache, _cache_file, _cache_modified
-    if not _cache_modified:
-        return
-    
+    """Grava no disco os upserts pendentes do cache de hashes."""
     if cache_path:
-        _cache_file = cache_path
-    
+        load_cache(cache_path)
+    if _store is None:
+        return
+
     try:
-        with open(_cache_file, 'w', encoding='utf-8') as f:
-            json.dump(_hash_cache, f, indent=2)
-        print(f"✓ Cache salvo: {len(_hash_cache)} entradas")
-        _cache_modified = False
+        _store.flush()
     except Exception as e:
         print(f"⚠ Erro ao salvar cache: {e}")
 
-def get_cached_hash(file_path):
-    """Obtém o hash de um arquivo do cache, se ainda for válido."""
-    global _hash_cache
-    
-    if file_path not in _hash_cache:
-        return None
-    
+def prune_cache(force=False):
+    """Remove do cache arquivos que sumiram ou mudaram (no máximo 1x por dia sem force)."""
     try:
-        cached = _hash_cache[file_path]
-        current_size = os.path.getsize(file_path)
-        current_mtime = os.path.getmtime(file_path)
-        
-        # Verifica se o arquivo não foi modificado
-        if (cached.get('size') == current_size and 
-            abs(cached.get('mtime', 0) - current_mtime) < 1):  # Tolerância de 1 segundo
-            return cached.get('hash')
-    except (OSError, KeyError):
-        pass
-    
-    return None
+        removed = _get_store().prune(force=force)
+        if removed:
+            print(f"✓ Cache podado: {removed} entradas removidas")
+        return removed
+    except Exception as e:
+        print(f"⚠ Erro ao podar cache: {e}")
+        return 0
 
-def update_cache(file_path, file_hash):
-    """Atualiza o cache com o hash de um arquivo."""
-    global _hash_cache, _cache_modified
-    
+def get_cached_hash(file_path, st=None, algo=None):
+    """Obtém o hash de um arquivo do cache, se ainda for válido (e do mesmo algoritmo)."""
     try:
-        file_size = os.path.getsize(file_path)
-        file_mtime = os.path.getmtime(file_path)
-        
-        _hash_cache[file_path] = {
-            'hash': file_hash,
-            'size': file_size,
-            'mtime': file_mtime,
-            'cached_at': time.time()
-        }
-        _cache_modified = True
+        if st is None:
+            st = os.stat(file_path)
+        return _get_store().get(st, algo or _hash_algo)
+    except Exception:
+        return None
+
+def update_cache(file_path, file_hash, st=None, algo=None):
+    """Atualiza o cache com o hash de um arquivo, registrando o algoritmo usado."""
+    try:
+        if st is None:
+            st = os.stat(file_path)
+        _get_store().put(os.path.abspath(file_path), st, file_hash, algo or _hash_algo)
     except Exception as e:
         print(f"⚠ Erro ao atualizar cache para {file_path}: {e}")
 
-def calculate_hash(file_path, block_size=65536, quick_hash=False):
-    """Calcula o hash SHA-256 de um arquivo, usando cache quando possível.
+def _count_bytes(stage, amount):
+    with _cache_lock:
+        _bytes_read[stage] += amount
+
+def get_bytes_read():
+    """Retorna os bytes lidos por estágio (sample/full/verify) no último scan."""
+    with _cache_lock:
+        return dict(_bytes_read)
+
+def calculate_hash(file_path, block_size=HASH_BLOCK_SIZE, quick_hash=False, algo=None):
+    """Calcula o hash de um arquivo, usando cache quando possível.
     
     Args:
         file_path: Caminho do arquivo
         block_size: Tamanho do bloco para leitura
-        quick_hash: Se True, faz hash apenas dos primeiros 1MB (mais rápido)
+        quick_hash: Se True, faz hash de amostra (SAMPLE_CHUNK do início + SAMPLE_CHUNK do fim).
+                    Arquivos com até 2 * SAMPLE_CHUNK recebem o hash completo, que lê o mesmo tanto.
+        algo: Algoritmo de hash (padrão: o configurado em set_hash_algorithm)
     """
     global _cache_hits, _cache_misses
     
-    # Tenta obter do cache primeiro
-    cached_hash = get_cached_hash(file_path)
-    if cached_hash:
-        _cache_hits += 1
-        return cached_hash
-    
-    _cache_misses += 1
+    # Tenta obter do cache primeiro (o stat é reaproveitado na gravação)
+    try:
+        st = os.stat(file_path)
+    except OSError as e:
+        print(f"Erro ao ler arquivo {file_path}: {e}")
+        return None
+    algo = algo or _hash_algo
+    use_sample = quick_hash and st.st_size > 2 * SAMPLE_CHUNK
+    cache_algo = algo + SAMPLE_SUFFIX if use_sample else algo
+    cached_hash = get_cached_hash(file_path, st, cache_algo)
+    with _cache_lock:
+        if cached_hash:
+            _cache_hits += 1
+            return cached_hash
+        _cache_misses += 1
     
     # Calcula o hash
-    sha256 = hashlib.sha256()
+    hasher = new_hasher(algo)
+    bytes_read = 0
     try:
-        bytes_to_read = 1024 * 1024 if quick_hash else None  # 1MB para quick hash
-        bytes_read = 0
-        
         with open(file_path, 'rb') as f:
-            for block in iter(lambda: f.read(block_size), b''):
-                sha256.update(block)
-                bytes_read += len(block)
-                
-                if quick_hash and bytes_read >= bytes_to_read:
-                    break
-        
-        file_hash = sha256.hexdigest()
-        
-        # Atualiza o cache apenas para hashes completos
-        if not quick_hash:
-            update_cache(file_path, file_hash)
+            if use_sample:
+                head = f.read(SAMPLE_CHUNK)
+                f.seek(-SAMPLE_CHUNK, os.SEEK_END)
+                tail = f.read(SAMPLE_CHUNK)
+                hasher.update(head)
+                hasher.update(tail)
+                bytes_read = len(head) + len(tail)
+            else:
+                for block in iter(lambda: f.read(block_size), b''):
+                    hasher.update(block)
+                    bytes_read += len(block)
         
+        file_hash = hasher.hexdigest()
+        update_cache(file_path, file_hash, st, cache_algo)
         return file_hash
     except Exception as e:
         print(f"Erro ao ler arquivo {file_path}: {e}")
         return None
+    finally:
+        # Arquivo pequeno lido inteiro mesmo com quick_hash conta como leitura completa
+        _count_bytes("sample" if use_sample else "full", bytes_read)
 
-def files_are_identical(file_path_a, file_path_b, block_size=65536):
+def _slices_equal(map_a, view_b, start, end):
+    """Compara a mesma janela de dois arquivos mapeados sem copiar bytes.
+
+    mmap.find com uma agulha do tamanho exato da janela só pode casar em `start`,
+    e o CPython resolve isso em velocidade de memcmp (memoryview == compara item a item).
+    """
+    return map_a.find(view_b[start:end], start, end) == start
+
+def group_identical_files(file_paths, slice_size=VERIFY_SLICE, stop=None):
+    """Agrupa arquivos de conteúdo idêntico (byte a byte) em uma única passada multi-via.
+
+    Todos os arquivos são mapeados em memória e percorridos juntos, janela a janela; a cada
+    janela as classes são refinadas comparando cada membro com o representante da classe.
+    Cada arquivo é lido uma vez, em vez de reler o representante a cada comparação par a par.
+    Retorna apenas grupos com 2+ arquivos, preservando a ordem de entrada. Se `stop`
+    (threading.Event) for sinalizado, para entre janelas/lotes e retorna [] (resultado incompleto).
+    """
+    order = {path: index for index, path in enumerate(file_paths)}
+    if len(file_paths) > MAX_MAPPED_FILES:
+        # Limita descritores abertos: verifica em lotes e funde as classes comparando representantes
+        classes = []
+        for offset in range(0, len(file_paths), MAX_MAPPED_FILES):
+            if stop is not None and stop.is_set():
+                return []
+            batch = file_paths[offset:offset + MAX_MAPPED_FILES]
+            batch_groups = group_identical_files(batch, slice_size, stop)
+            grouped = {path for group in batch_groups for path in group}
+            for members in batch_groups + [[path] for path in batch if path not in grouped]:
+                for existing in classes:
+                    if files_are_identical(existing[0], members[0]):
+                        existing.extend(members)
+                        break
+                else:
+                    classes.append(list(members))
+        return [group for group in classes if len(group) > 1]
+
+    by_size = defaultdict(list)
+    for path in file_paths:
+        try:
+            by_size[os.path.getsize(path)].append(path)
+        except OSError as e:
+            print(f"Erro ao comparar arquivo '{path}': {e}")
+
+    groups = []
+    for size, paths in by_size.items():
+        if len(paths) < 2:
+            continue
+        if size == 0:
+            groups.append(paths)  # Arquivos vazios não podem ser mapeados e são todos iguais
+            continue
+
+        handles, maps, views, valid = [], [], [], []
+        bytes_read = 0
+        try:
+            for path in paths:
+                try:
+                    handle = open(path, 'rb')
+                    mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError) as e:
+                    print(f"Erro ao mapear arquivo '{path}': {e}")
+                    continue
+                handles.append(handle)
+                maps.append(mapped)
+                views.append(memoryview(mapped))
+                valid.append(path)
+
+            classes = [list(range(len(valid)))] if len(valid) > 1 else []
+            for start in range(0, size, slice_size):
+                if not classes:
+                    break
+                if stop is not None and stop.is_set():
+                    return []
+                end = min(start + slice_size, size)
+                refined = []
+                for members in classes:
+                    buckets = []
+                    for index in members:
+                        for bucket in buckets:
+                            if _slices_equal(maps[bucket[0]], views[index], start, end):
+                                bucket.append(index)
+                                break
+                        else:
+                            buckets.append([index])
+                    bytes_read += (end - start) * len(members)
+                    refined.extend(bucket for bucket in buckets if len(bucket) > 1)
+                classes = refined
+
+            groups.extend([valid[index] for index in members] for members in classes)
+        finally:
+            for view in views:
+                view.release()
+            for mapped in maps:
+                mapped.close()
+            for handle in handles:
+                handle.close()
+            _count_bytes("verify", bytes_read)
+
+    return sorted(groups, key=lambda group: order[group[0]])
+
+def files_are_identical(file_path_a, file_path_b):
     """Compara dois arquivos byte a byte para confirmar igualdade."""
     try:
-        if os.path.getsize(file_path_a) != os.path.getsize(file_path_b):
-            return False
-        with open(file_path_a, 'rb') as fa, open(file_path_b, 'rb') as fb:
-            for block_a in iter(lambda: fa.read(block_size), b''):
-                block_b = fb.read(block_size)
-                if block_a != block_b:
-                    return False
-        return True
+        groups = group_identical_files([file_path_a, file_path_b])
+        return len(groups) == 1 and len(groups[0]) == 2
     except Exception as e:
         print(f"Erro ao comparar arquivos '{file_path_a}' e '{file_path_b}': {e}")
         return False
 
-def find_duplicates(folder_path, progress_callback=None, cancel_check=None, duplicate_callback=None, return_stats=False, valid_extensions=None):
-    """Encontra arquivos duplicados em uma pasta baseada no hash SHA-256."""
+def _scan_media_files(folder_path, valid_extensions, cancel_check=None):
+    """Lista {caminho: (tamanho, mtime_ns)} das mídias da pasta; None se cancelado.
+
+    os.scandir reaproveita os dados da listagem do diretório (no Windows o stat sai de graça).
+    """
+    files = {}
+    pending = [folder_path]
+    while pending:
+        if cancel_check and cancel_check():
+            return None
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif os.path.splitext(entry.name)[1].lower() in valid_extensions:
+                            st = entry.stat()
+                            files[entry.path] = (st.st_size, st.st_mtime_ns)
+                            if len(files) % 200 == 0:
+                                print(f"Escaneados {len(files)} arquivos...")
+                    except OSError as e:
+                        print(f"Erro ao obter tamanho de {entry.path}: {e}")
+        except OSError as e:
+            print(f"Erro ao listar {directory}: {e}")
+    return files
+
+def directory_snapshot(folder_path):
+    """{pasta relativa: mtime_ns} de todas as subpastas: muda quando um arquivo entra, sai ou é renomeado.
+
+    Só lista diretórios (sem stat de cada arquivo), então serve para saber rápido se um scan
+    salvo ainda descreve a árvore.
+    """
+    root = os.path.abspath(folder_path)
+    snapshot = {}
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            snapshot[os.path.relpath(directory, root)] = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as entries:
+                pending.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+        except OSError:
+            continue
+    return snapshot
+
+def load_scan_results(folder_path):
+    """Resultado salvo do último scan da pasta: (resultados, directory_snapshot) ou None."""
+    try:
+        return _get_store().load_scan_results(os.path.abspath(folder_path))
+    except Exception as e:
+        print(f"⚠ Erro ao carregar resultado salvo do scan: {e}")
+        return None
+
+def save_scan_results(folder_path, results, snapshot):
+    """Persiste o resultado do scan (no mesmo SQLite do cache de hashes)."""
+    try:
+        _get_store().save_scan_results(os.path.abspath(folder_path), results, snapshot)
+    except Exception as e:
+        print(f"⚠ Erro ao salvar resultado do scan: {e}")
+
+def _is_single_file(file_paths):
+    """True se todos os caminhos são links para o mesmo arquivo (não desperdiçam espaço)."""
+    try:
+        return len({(st.st_dev, st.st_ino) for st in map(os.stat, file_paths)}) == 1
+    except OSError:
+        return False
+
+def _process_size_group(paths, verify, algo, stop):
+    """Unidade de trabalho do scan: amostra, hash completo e verificação de um grupo de tamanho.
+
+    Roda numa thread do pool; retorna (grupos confirmados [(chave, caminhos)], arquivos com hash
+    completo). `stop` interrompe a unidade entre um arquivo e outro, e a verificação byte a byte
+    entre janelas (cancelamento).
+    """
+    samples = defaultdict(list)
+    for file_path in paths:
+        if stop.is_set():
+            return [], 0
+        sample_hash = calculate_hash(file_path, quick_hash=True, algo=algo)
+        if sample_hash:
+            samples[sample_hash].append(file_path)
+
+    # Hash completo só das colisões de amostra (arquivos pequenos já saem do cache aqui)
+    hashes = defaultdict(list)
+    hashed = 0
+    for candidates in samples.values():
+        if len(candidates) < 2:
+            continue
+        for file_path in candidates:
+            if stop.is_set():
+                return [], hashed
+            file_hash = calculate_hash(file_path, algo=algo)
+            if file_hash:
+                hashes[file_hash].append(file_path)
+                hashed += 1
+
+    groups = []
+    for file_hash, file_list in hashes.items():
+        if len(file_list) < 2 or _is_single_file(file_list):
+            continue
+        if stop.is_set():
+            break
+        # "hash": confia no hash; "multi": verifica só grupos com 3+ arquivos
+        # (colisões de hash de 128+ bits são extremamente raras); "always": verifica todos
+        needs_verify = verify == "always" or (verify == "multi" and len(file_list) > 2)
+        if not needs_verify:
+            groups.append((file_hash, file_list))
+            continue
+        # Uma passada multi-via sobre os arquivos mapeados, sem reler o representante
+        verified_groups = group_identical_files(file_list, stop=stop)
+        if stop.is_set():
+            break
+        if len(verified_groups) == 1 and len(verified_groups[0]) == len(file_list):
+            groups.append((file_hash, verified_groups[0]))
+        else:
+            groups.extend((f"{file_hash}-{index}", group) for index, group in enumerate(verified_groups, start=1))
+    return groups, hashed
+
+def _scan_settings(hash_algo, verify, valid_extensions):
+    """Configurações que invalidam o estado incremental quando mudam."""
+    return f"{hash_algo}|{verify}|{','.join(sorted(valid_extensions))}"
+
+def find_duplicates(folder_path, progress_callback=None, cancel_check=None, duplicate_callback=None, return_stats=False, valid_extensions=None, max_workers=None, verify=DEFAULT_VERIFY_MODE, hash_algo=None, incremental=True):
+    """Encontra arquivos duplicados em uma pasta pelo hash do conteúdo.
+
+    O algoritmo é `hash_algo` ou o configurado via set_hash_algorithm (BLAKE3/xxh3-128
+    quando instalados, SHA-256 como fallback).
+
+    Cada grupo de tamanho passa por estágios: digest de amostra (início + fim), hash
+    completo só para colisões de amostra e verificação byte a byte conforme `verify`
+    ("hash", "multi" ou "always"). Os bytes lidos em cada estágio vão no progress_callback.
+
+    Cada grupo de tamanho é uma unidade de trabalho num pool de max_workers threads (padrão
+    DEFAULT_HASH_WORKERS), do maior desperdício potencial para o menor; os grupos confirmados
+    vão para o duplicate_callback assim que a unidade termina. Os callbacks e o cancel_check
+    continuam sendo chamados na thread de quem chamou, e o progresso (bytes dos grupos concluídos
+    sobre o total do índice de tamanhos, com ETA) sai a cada SCAN_PROGRESS_INTERVAL segundos.
+
+    Com `incremental`, o estado do último scan da pasta (índice de tamanhos e grupos) fica
+    no cache SQLite: só os grupos de tamanho com arquivos novos, removidos ou alterados são
+    reprocessados; os demais grupos são reaproveitados (e repassados ao duplicate_callback).
+    """
     global _cache_hits, _cache_misses
     
-    # Reseta contadores de cache
+    # Reseta contadores de cache e de bytes lidos
     _cache_hits = 0
     _cache_misses = 0
+    with _cache_lock:
+        for stage in _bytes_read:
+            _bytes_read[stage] = 0
+    hash_algo = resolve_hash_algorithm(hash_algo) if hash_algo else _hash_algo
     
     # Carrega o cache no início
     cache_loaded = load_cache()
     
-    hashes = defaultdict(list)
     size_groups = defaultdict(list)
     
     # Extensões comuns de imagem e vídeo para verificar
@@ -169,27 +485,52 @@ def find_duplicates(folder_path, progress_callback=None, cancel_check=None, dupl
     print(f"Verificando arquivos em: {folder_path}")
     print("Isso pode levar algum tempo dependendo do número e tamanho dos arquivos...")
 
+    if verify not in VERIFY_MODES:
+        verify = DEFAULT_VERIFY_MODE
     files_checked = 0
-    files_scanned = 0
-    for root, _, files in os.walk(folder_path):
-        for filename in files:
-            if cancel_check and cancel_check():
-                save_cache()
-                if return_stats:
-                    return {}, files_checked, files_scanned, 0
-                return {}, files_checked
-            file_extension = os.path.splitext(filename)[1].lower()
-            
-            if file_extension in valid_extensions:
-                file_path = os.path.join(root, filename)
-                try:
-                    file_size = os.path.getsize(file_path)
-                    size_groups[file_size].append(file_path)
-                    files_scanned += 1
-                    if files_scanned % 200 == 0:
-                        print(f"Escaneados {files_scanned} arquivos...")
-                except Exception as e:
-                    print(f"Erro ao obter tamanho de {file_path}: {e}")
+    files = _scan_media_files(folder_path, valid_extensions, cancel_check)
+    if files is None:
+        save_cache()
+        if return_stats:
+            return {}, files_checked, 0, 0
+        return {}, files_checked
+    files_scanned = len(files)
+
+    # Scan incremental: compara com o estado salvo e só reprocessa os tamanhos afetados
+    state_root = os.path.abspath(folder_path)
+    settings = _scan_settings(hash_algo, verify, valid_extensions)
+    previous = None
+    if incremental:
+        try:
+            previous = _get_store().load_scan_state(state_root, settings)
+        except Exception as e:
+            print(f"⚠ Erro ao carregar estado do scan anterior: {e}")
+    previous_files = previous[0] if previous else None
+
+    reused = {}
+    if previous:
+        previous_groups = previous[1]
+        dirty_sizes = set()
+        for file_path, info in files.items():
+            old = previous_files.get(file_path)
+            if old != info:
+                dirty_sizes.add(info[0])
+                if old:
+                    dirty_sizes.add(old[0])
+        for file_path, old in previous_files.items():
+            if file_path not in files:
+                dirty_sizes.add(old[0])
+        for group_key, paths in previous_groups.items():
+            # Tamanho intocado => todos os arquivos desse tamanho estão iguais ao último scan
+            if paths[0] in files and files[paths[0]][0] not in dirty_sizes:
+                reused[group_key] = paths
+        for file_path, (file_size, _) in files.items():
+            if file_size in dirty_sizes:
+                size_groups[file_size].append(file_path)
+        print(f"Scan incremental: {len(dirty_sizes)} tamanhos alterados, {len(reused)} grupos reaproveitados")
+    else:
+        for file_path, (file_size, _) in files.items():
+            size_groups[file_size].append(file_path)
 
     total_candidates = sum(len(file_list) for file_list in size_groups.values() if len(file_list) > 1)
     print(f"\nEncontrados {total_candidates} arquivos candidatos em {len([g for g in size_groups.values() if len(g) > 1])} grupos de tamanho")
@@ -198,112 +539,121 @@ def find_duplicates(folder_path, progress_callback=None, cancel_check=None, dupl
         progress_callback({
             "phase": "scan_done",
             "files_scanned": files_scanned,
-            "total_candidates": total_candidates
+            "total_candidates": total_candidates,
+            "reused_groups": len(reused)
         })
 
     # Otimização: processar grupos do maior para o menor (economiza mais espaço primeiro)
-    sorted_groups = sorted(size_groups.items(), key=lambda x: x[0] * len(x[1]), reverse=True)
-    
-    for file_size, file_list in sorted_groups:
-        if len(file_list) < 2:
-            continue
-            
-        # Para grupos grandes (>10 arquivos), usar hash rápido primeiro
-        use_quick_hash = len(file_list) > 10
-        quick_hashes = defaultdict(list) if use_quick_hash else None
-        
-        for file_path in file_list:
-            if cancel_check and cancel_check():
-                save_cache()
-                if return_stats:
-                    return {}, files_checked, files_scanned, total_candidates
-                return {}, files_checked
-            
-            # Se grupo grande, fazer hash rápido primeiro
-            if use_quick_hash:
-                quick_hash = calculate_hash(file_path, quick_hash=True)
-                if quick_hash:
-                    quick_hashes[quick_hash].append(file_path)
-            else:
-                file_hash = calculate_hash(file_path)
-                if file_hash:
-                    hashes[file_hash].append(file_path)
-                    files_checked += 1
-            
-            # Relatório de progresso menos frequente para melhor performance
-            if files_checked % 100 == 0:
-                cache_percent = round((_cache_hits / (_cache_hits + _cache_misses) * 100)) if (_cache_hits + _cache_misses) > 0 else 0
-                print(f"Processados {files_checked}/{total_candidates} arquivos... (Cache: {cache_percent}%)")
-            
-            if progress_callback and (files_checked % 100 == 0 or files_checked == total_candidates):
-                progress_callback({
-                    "phase": "hashing",
-                    "current": files_checked,
-                    "total": total_candidates,
-                    "cache_hits": _cache_hits,
-                    "cache_misses": _cache_misses
-                })
-        
-        # Se usou hash rápido, agora fazer hash completo apenas dos grupos com colisão
-        if use_quick_hash:
-            for quick_hash, paths in quick_hashes.items():
-                if len(paths) < 2:
-                    continue  # Não é duplicata
-                
-                # Fazer hash completo apenas destes arquivos
-                for file_path in paths:
-                    if cancel_check and cancel_check():
-                        save_cache()
-                        if return_stats:
-                            return {}, files_checked, files_scanned, total_candidates
-                        return {}, files_checked
-                    
-                    file_hash = calculate_hash(file_path, quick_hash=False)
-                    if file_hash:
-                        hashes[file_hash].append(file_path)
-                        files_checked += 1
+    units = sorted(
+        ((file_size, file_list) for file_size, file_list in size_groups.items() if len(file_list) >= 2),
+        key=lambda x: x[0] * len(x[1]),
+        reverse=True,
+    )
+    bytes_total = sum(file_size * len(file_list) for file_size, file_list in units)
+    started = time.monotonic()
+    files_done = 0
+    bytes_done = 0
+    units_done = 0
+
+    def report_progress():
+        elapsed = time.monotonic() - started
+        # Grupos grandes vão primeiro, então a vazão dos já concluídos estima bem o restante
+        eta = elapsed * (bytes_total - bytes_done) / bytes_done if bytes_done else None
+        cache_percent = round((_cache_hits / (_cache_hits + _cache_misses) * 100)) if (_cache_hits + _cache_misses) > 0 else 0
+        print(f"[grupos] {units_done}/{len(units)} grupos, {files_done}/{total_candidates} arquivos... (Cache: {cache_percent}%)")
+
+        if progress_callback:
+            progress_callback({
+                "phase": "hashing",
+                "stage": "groups",
+                "current": files_done,
+                "total": total_candidates,
+                "hashed": files_checked,
+                "units_done": units_done,
+                "units_total": len(units),
+                "bytes_done": bytes_done,
+                "bytes_total": bytes_total,
+                "elapsed": round(elapsed, 1),
+                "eta_seconds": round(eta, 1) if eta is not None else None,
+                "cache_hits": _cache_hits,
+                "cache_misses": _cache_misses,
+                "bytes_read": get_bytes_read()
+            })
 
+    def cancelled_result():
+        save_cache()
+        if return_stats:
+            return {}, files_checked, files_scanned, total_candidates
+        return {}, files_checked
+
+    # Grupos reaproveitados do último scan saem antes de qualquer leitura
     duplicates = {}
-    print(f"\nVerificando grupos de hash duplicados...")
-    
-    for file_hash, file_list in hashes.items():
-        if len(file_list) < 2:
-            continue
-        
-        # Otimização: apenas verificar byte-a-byte se houver mais de 2 arquivos com mesmo hash
-        # (colisões SHA-256 são extremamente raras)
-        if len(file_list) == 2:
-            # Com apenas 2 arquivos, assumir que são duplicatas (hash SHA-256 é confiável)
-            duplicates[file_hash] = file_list
-            if duplicate_callback:
-                duplicate_callback(file_hash, file_list)
-        else:
-            # Com 3+ arquivos, fazer verificação binária para ter certeza
-            verified_groups = []
-            for file_path in file_list:
-                placed = False
-                for group in verified_groups:
-                    if files_are_identical(file_path, group[0]):
-                        group.append(file_path)
-                        placed = True
-                        break
-                if not placed:
-                    verified_groups.append([file_path])
+    for group_key, paths in reused.items():
+        duplicates[group_key] = paths
+        if duplicate_callback:
+            duplicate_callback(group_key, paths)
+    print(f"\nProcessando {len(units)} grupos de tamanho (algoritmo: {hash_algo}, modo: {verify})...")
 
-            if len(verified_groups) == 1 and len(verified_groups[0]) > 1:
-                duplicates[file_hash] = verified_groups[0]
-                if duplicate_callback:
-                    duplicate_callback(file_hash, verified_groups[0])
-            else:
-                for index, group in enumerate(verified_groups, start=1):
-                    if len(group) > 1:
-                        group_key = f"{file_hash}-{index}"
-                        duplicates[group_key] = group
-                        if duplicate_callback:
-                            duplicate_callback(group_key, group)
+    stop = threading.Event()
+    workers = max_workers or DEFAULT_HASH_WORKERS
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan")
+    # Janela limitada de unidades em voo: não cria um future por grupo antes de começar a ler
+    max_inflight = workers * SCAN_INFLIGHT_PER_WORKER
+    queued = iter(units)
+    futures = {}
+    pending = set()
+
+    def refill():
+        while len(pending) < max_inflight and not stop.is_set():
+            unit = next(queued, None)
+            if unit is None:
+                return
+            file_size, file_list = unit
+            future = executor.submit(_process_size_group, file_list, verify, hash_algo, stop)
+            futures[future] = (file_size, len(file_list))
+            pending.add(future)
+
+    last_report = 0.0
+    try:
+        refill()
+        while pending:
+            done, still_pending = wait(pending, timeout=SCAN_PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+            pending.intersection_update(still_pending)
+            if cancel_check and cancel_check():
+                stop.set()
+                return cancelled_result()
+            for future in done:
+                file_size, count = futures.pop(future)
+                groups, hashed = future.result()
+                units_done += 1
+                files_done += count
+                bytes_done += file_size * count
+                files_checked += hashed
+                for group_key, group in groups:
+                    duplicates[group_key] = group
+                    if duplicate_callback:
+                        duplicate_callback(group_key, group)
+            refill()
+            now = time.monotonic()
+            if now - last_report >= SCAN_PROGRESS_INTERVAL or not pending:
+                last_report = now
+                report_progress()
+    finally:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+    if not units:
+        report_progress()
+
+    bytes_read = get_bytes_read()
+    print(f"Bytes lidos: amostra {bytes_read['sample']}, completo {bytes_read['full']}, verificação {bytes_read['verify']}")
     
-    # Salva o cache antes de retornar
+    # Salva o cache e o estado do scan antes de retornar e, periodicamente, poda entradas de arquivos sumidos
     save_cache()
+    try:
+        _get_store().save_scan_state(state_root, settings, files, duplicates, previous_files)
+    except Exception as e:
+        print(f"⚠ Erro ao salvar estado do scan: {e}")
+    prune_cache()
     
     if return_stats:
         return duplicates, files_checked, files_scanned, total_candidates
@@ -311,22 +661,29 @@ def find_duplicates(folder_path, progress_callback=None, cancel_check=None, dupl
 
 def clear_cache(cache_path=None):
     """Limpa o cache de hashes."""
-    global _hash_cache, _cache_file
-    if cache_path:
-        _cache_file = cache_path
-    
-    _hash_cache = {}
-    if os.path.exists(_cache_file):
-        try:
-            os.remove(_cache_file)
-            print("✓ Cache limpo com sucesso")
-        except Exception as e:
-            print(f"⚠ Erro ao limpar cache: {e}")
+    global _store, _cache_file
+    with _cache_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
+        if cache_path:
+            _cache_file = cache_path
+
+    removed = False
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(_cache_file + suffix):
+            try:
+                os.remove(_cache_file + suffix)
+                removed = True
+            except Exception as e:
+                print(f"⚠ Erro ao limpar cache: {e}")
+    if removed:
+        print("✓ Cache limpo com sucesso")
 
 def get_cache_stats():
     """Retorna estatísticas do cache atual."""
     return {
-        "entries": len(_hash_cache),
+        "entries": _store.count() if _store is not None else 0,
         "hits": _cache_hits,
         "misses": _cache_misses,
         "hit_rate": round((_cache_hits / (_cache_hits + _cache_misses) * 100)) if (_cache_hits + _cache_misses) > 0 else 0
@@ -335,6 +692,13 @@ def get_cache_stats():
 def main():
     parser = argparse.ArgumentParser(description="Encontrar imagens e vídeos duplicados.")
     parser.add_argument("folder", nargs="?", default=".", help="Caminho da pasta para verificar (padrão: pasta atual)")
+    parser.add_argument("--cache", default=None, help=f"Arquivo SQLite do cache de hashes (padrão: {default_cache_path()})")
+    parser.add_argument("--verify", choices=VERIFY_MODES, default=DEFAULT_VERIFY_MODE,
+                        help="Verificação byte a byte: hash (nunca), multi (grupos 3+), always (sempre)")
+    parser.add_argument("--algo", default="auto", choices=("auto",) + tuple(HASH_ALGORITHMS),
+                        help=f"Algoritmo de hash (padrão: auto = {resolve_hash_algorithm()})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_HASH_WORKERS, help=f"Threads de hashing (padrão: {DEFAULT_HASH_WORKERS})")
+    parser.add_argument("--full", action="store_true", help="Ignora o estado do scan anterior e reprocessa tudo")
     args = parser.parse_args()
 
     folder_path = args.folder
@@ -343,7 +707,9 @@ def main():
         print(f"Erro: A pasta '{folder_path}' não existe.")
         return
 
-    duplicates, total_checked = find_duplicates(folder_path)
+    if args.cache:
+        load_cache(args.cache)
+    duplicates, total_checked = find_duplicates(folder_path, max_workers=args.workers, verify=args.verify, hash_algo=args.algo, incremental=not args.full)
 
     print("\n" + "="*40)
     print(f"RELATÓRIO DE DUPLICATAS")
@@ -0,0 +1,298 @@
+import os
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from core.verificar_duplicatas import (
+        DEFAULT_HASH_WORKERS, get_cached_hash, load_cache, save_cache, update_cache,
+    )
+except ImportError:  # Executado como script: python core/verificar_similares.py
+    from verificar_duplicatas import (
+        DEFAULT_HASH_WORKERS, get_cached_hash, load_cache, save_cache, update_cache,
+    )
+
+# OpenCV (já usado pelo ThumbnailWorker) e NumPy são opcionais: sem eles o modo perceptual fica indisponível
+try:
+    import cv2
+    import numpy as np
+except ImportError:
+    cv2 = None
+    np = None
+
+SIMILARITY_AVAILABLE = cv2 is not None
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp'}
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv', '.m4v'}
+
+HASH_SIZE = 8  # Hashes perceptuais de 8x8 = 64 bits
+IMAGE_HASH_METHODS = ("phash", "dhash")
+DEFAULT_IMAGE_METHOD = "phash"
+VIDEO_KEYFRAMES = 5  # Quadros amostrados por vídeo (entre 10% e 90% da duração)
+DEFAULT_THRESHOLD = 10  # Distância de Hamming máxima a cada 64 bits para considerar "parecido"
+SIGNATURE_BATCH = 256  # Arquivos enviados ao pool por vez (permite cancelar entre lotes)
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+def _bits_to_int(bits):
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def dhash(gray, size=HASH_SIZE):
+    """Difference hash: compara cada pixel com o vizinho da direita na imagem reduzida."""
+    small = cv2.resize(gray, (size + 1, size), interpolation=cv2.INTER_AREA)
+    return _bits_to_int(small[:, 1:] > small[:, :-1])
+
+
+def phash(gray, size=HASH_SIZE, factor=4):
+    """Perceptual hash: sinais das frequências baixas da DCT em relação à mediana."""
+    small = cv2.resize(gray, (size * factor, size * factor), interpolation=cv2.INTER_AREA)
+    low = cv2.dct(small.astype(np.float32))[:size, :size]
+    median = np.median(low.ravel()[1:])  # Ignora o componente DC
+    return _bits_to_int(low > median)
+
+
+_IMAGE_HASHERS = {"phash": phash, "dhash": dhash}
+
+
+def image_signature(file_path, method=DEFAULT_IMAGE_METHOD):
+    """Hash perceptual de 64 bits de uma imagem, ou None se não puder ser decodificada."""
+    # np.fromfile + imdecode aceita caminhos com acentos no Windows (cv2.imread não)
+    data = np.fromfile(file_path, dtype=np.uint8)
+    # Decodificar em 1/4 da resolução é bem mais rápido em JPEGs grandes e basta para 32x32
+    gray = cv2.imdecode(data, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if gray is None or gray.size == 0:
+        return None
+    return _IMAGE_HASHERS[method](gray)
+
+
+def video_signature(file_path, keyframes=VIDEO_KEYFRAMES):
+    """Concatena o pHash de `keyframes` quadros distribuídos pelo vídeo (64 bits cada)."""
+    cap = cv2.VideoCapture(file_path)
+    try:
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if frame_count <= 0:
+            return None
+        signature = 0
+        for index in range(keyframes):
+            # Evita o início e o fim, onde ficam vinhetas e telas pretas
+            position = int(frame_count * (0.1 + 0.8 * index / max(keyframes - 1, 1)))
+            cap.set(cv2.CAP_PROP_POS_FRAMES, min(position, frame_count - 1))
+            ok, frame = cap.read()
+            if not ok:
+                return None
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            signature = (signature << 64) | phash(gray)
+        return signature
+    finally:
+        cap.release()
+
+
+class BKTree:
+    """Árvore BK sobre distância de Hamming: acha vizinhos sem comparar todos os pares.
+
+    Cada nó guarda (hash, item, filhos por distância); pela desigualdade triangular, a busca
+    só desce nos filhos cuja distância ao nó está em [d - raio, d + raio].
+    """
+
+    def __init__(self):
+        self._root = None
+        self.size = 0
+
+    def add(self, value, item):
+        node = (value, item, {})
+        self.size += 1
+        if self._root is None:
+            self._root = node
+            return
+        current = self._root
+        while True:
+            distance = hamming(value, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def search(self, value, max_distance):
+        """Retorna [(distância, item)] de todos os hashes a até max_distance de `value`."""
+        if self._root is None:
+            return []
+        results = []
+        stack = [self._root]
+        while stack:
+            node_value, item, children = stack.pop()
+            distance = hamming(value, node_value)
+            if distance <= max_distance:
+                results.append((distance, item))
+            low, high = distance - max_distance, distance + max_distance
+            stack.extend(child for d, child in children.items() if low <= d <= high)
+        return results
+
+
+def _signature_key(kind, method):
+    """Nome usado no cache de hashes (mesma tabela SQLite do scan de duplicatas)."""
+    return f"video-phash{VIDEO_KEYFRAMES}" if kind == "video" else method
+
+
+def _compute_signature(file_path, kind, method):
+    """Retorna (hash, veio_do_cache); hash None se o arquivo não puder ser lido."""
+    algo = _signature_key(kind, method)
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None, False
+    cached = get_cached_hash(file_path, st=st, algo=algo)
+    if cached:
+        return int(cached, 16), True
+    try:
+        value = video_signature(file_path) if kind == "video" else image_signature(file_path, method)
+    except Exception as e:
+        print(f"Erro ao calcular assinatura de '{file_path}': {e}")
+        return None, False
+    if value is not None:
+        update_cache(file_path, format(value, "x"), st=st, algo=algo)
+    return value, False
+
+
+def find_similar(folder_path, threshold=DEFAULT_THRESHOLD, progress_callback=None, cancel_check=None,
+                 group_callback=None, kinds=("image", "video"), method=DEFAULT_IMAGE_METHOD, max_workers=None):
+    """Encontra imagens e vídeos quase idênticos (re-encodados, redimensionados, de outro site).
+
+    Cada arquivo recebe uma assinatura perceptual (pHash/dHash nas imagens, pHash de quadros-chave
+    nos vídeos), calculada em paralelo e guardada no cache de hashes. Os vizinhos são buscados
+    em uma árvore BK por tipo, à medida que as assinaturas chegam, e unidos em grupos
+    (union-find). `threshold` é a distância de Hamming máxima a cada 64 bits.
+
+    Retorna uma lista de grupos {"kind", "files": [(caminho, distância ao representante)]};
+    o representante é o maior arquivo do grupo (em geral a melhor qualidade).
+    """
+    if not SIMILARITY_AVAILABLE:
+        raise RuntimeError("Busca por similares requer opencv-python e numpy")
+    if method not in IMAGE_HASH_METHODS:
+        raise ValueError(f"Método desconhecido: {method}")
+
+    load_cache()
+    extensions = {}
+    if "image" in kinds:
+        extensions.update(dict.fromkeys(IMAGE_EXTENSIONS, "image"))
+    if "video" in kinds:
+        extensions.update(dict.fromkeys(VIDEO_EXTENSIONS, "video"))
+
+    candidates = []
+    for root, _, files in os.walk(folder_path):
+        if cancel_check and cancel_check():
+            return []
+        for filename in files:
+            kind = extensions.get(os.path.splitext(filename)[1].lower())
+            if kind:
+                candidates.append((os.path.join(root, filename), kind))
+
+    total = len(candidates)
+    print(f"Calculando assinaturas perceptuais de {total} arquivos em: {folder_path}")
+    if progress_callback:
+        progress_callback({"phase": "scan_done", "total_candidates": total})
+
+    radius = {"image": threshold, "video": threshold * VIDEO_KEYFRAMES}
+    trees = {"image": BKTree(), "video": BKTree()}
+    signatures = {}
+    parent = {}
+
+    def find_root(path):
+        while parent[path] != path:
+            parent[path] = parent[parent[path]]
+            path = parent[path]
+        return path
+
+    processed = 0
+    cache_hits = 0
+    workers = max_workers or DEFAULT_HASH_WORKERS
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for offset in range(0, total, SIGNATURE_BATCH):
+            if cancel_check and cancel_check():
+                save_cache()
+                return []
+            batch = candidates[offset:offset + SIGNATURE_BATCH]
+            results = executor.map(lambda job: _compute_signature(job[0], job[1], method), batch)
+            for (file_path, kind), (value, from_cache) in zip(batch, results):
+                processed += 1
+                cache_hits += from_cache
+                if value is None:
+                    continue
+                signatures[file_path] = (kind, value)
+                parent[file_path] = file_path
+                for _, neighbour in trees[kind].search(value, radius[kind]):
+                    root_a, root_b = find_root(file_path), find_root(neighbour)
+                    if root_a != root_b:
+                        parent[root_a] = root_b
+                trees[kind].add(value, file_path)
+            if progress_callback:
+                progress_callback({
+                    "phase": "signature",
+                    "current": processed,
+                    "total": total,
+                    "cache_hits": cache_hits,
+                    "cache_misses": processed - cache_hits
+                })
+    save_cache()
+
+    members = {}
+    for file_path in signatures:
+        members.setdefault(find_root(file_path), []).append(file_path)
+
+    groups = []
+    for paths in members.values():
+        if len(paths) < 2:
+            continue
+        paths.sort(key=lambda path: (-os.path.getsize(path) if os.path.exists(path) else 0, path))
+        kind, rep_value = signatures[paths[0]]
+        group = {
+            "kind": kind,
+            "files": [(path, hamming(rep_value, signatures[path][1])) for path in paths]
+        }
+        groups.append(group)
+        if group_callback:
+            group_callback(group)
+
+    print(f"Grupos de similares encontrados: {len(groups)}")
+    return groups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encontrar imagens e vídeos parecidos (hash perceptual).")
+    parser.add_argument("folder", nargs="?", default=".", help="Caminho da pasta para verificar (padrão: pasta atual)")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD,
+                        help=f"Distância de Hamming máxima a cada 64 bits (padrão: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--method", choices=IMAGE_HASH_METHODS, default=DEFAULT_IMAGE_METHOD, help="Hash das imagens")
+    parser.add_argument("--kind", choices=("all", "image", "video"), default="all", help="Tipos de arquivo")
+    parser.add_argument("--cache", default=None, help="Arquivo SQLite do cache de hashes")
+    parser.add_argument("--workers", type=int, default=DEFAULT_HASH_WORKERS, help=f"Threads (padrão: {DEFAULT_HASH_WORKERS})")
+    args = parser.parse_args()
+
+    if not SIMILARITY_AVAILABLE:
+        print("Erro: instale opencv-python (e numpy) para usar a busca por similares.")
+        return
+    if not os.path.isdir(args.folder):
+        print(f"Erro: A pasta '{args.folder}' não existe.")
+        return
+
+    if args.cache:
+        load_cache(args.cache)
+    kinds = ("image", "video") if args.kind == "all" else (args.kind,)
+    groups = find_similar(args.folder, threshold=args.threshold, kinds=kinds, method=args.method, max_workers=args.workers)
+
+    print("\n" + "="*40)
+    print("RELATÓRIO DE SIMILARES")
+    print("="*40)
+    if not groups:
+        print("Nenhum arquivo parecido encontrado.")
+    for index, group in enumerate(groups, start=1):
+        print(f"\nGrupo {index} ({group['kind']}, {len(group['files'])} arquivos):")
+        for file_path, distance in group["files"]:
+            print(f" - [{distance:>3}] {file_path}")
+    print("\n" + "="*40)
+
+if __name__ == "__main__":
+    main()
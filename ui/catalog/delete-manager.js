@@ -219,6 +219,107 @@ class DeleteManager {
     };
   }
 
+  /**
+   * Deleta vários arquivos numa única requisição (/api/delete_batch)
+   * O servidor valida tudo de uma vez e devolve os resultados por item em eventos SSE.
+   * @param {Array<string>} paths - Caminhos relativos à pasta de modelos
+   * @param {Function} onProgress - Callback de progresso (processados, total, resultados do lote)
+   * @returns {Promise<Object>} { successCount, failureCount, errors, totalCount, allSuccess, deleted }
+   */
+  static async deletePaths(paths, onProgress = null) {
+    const deleted = [];
+    const errors = [];
+    let summary = null;
+
+    console.log(`[DELETE_BATCH] Enviando lote de ${paths.length} arquivo(s)`);
+
+    try {
+      const response = await fetch("/api/delete_batch", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ paths }),
+      });
+      if (!response.ok || !response.body) {
+        const result = await response.json().catch(() => ({}));
+        throw new Error(result.error || `HTTP ${response.status}`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      while (summary === null) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const chunks = buffer.split("\n\n");
+        buffer = chunks.pop();
+        for (const chunk of chunks) {
+          if (!chunk.startsWith("data:")) continue; // Comentários de keep-alive
+          const event = JSON.parse(chunk.slice(5));
+          if (event.type === "items") {
+            for (const item of event.results) {
+              if (item.status === "deleted") {
+                deleted.push(item.path);
+              } else {
+                errors.push({ path: item.path, error: item.error });
+              }
+            }
+            if (onProgress) onProgress(event.done, event.total, event.results);
+          } else if (event.type === "complete") {
+            summary = event.summary;
+          }
+        }
+      }
+    } catch (error) {
+      console.error("[DELETE_BATCH] ❌ Erro:", error.message);
+      const reported = new Set([...deleted, ...errors.map((item) => item.path)]);
+      for (const path of paths) {
+        if (!reported.has(path)) errors.push({ path, error: error.message });
+      }
+    }
+
+    console.log(`[DELETE_BATCH] Concluído: ${deleted.length} sucesso(s), ${errors.length} erro(s)`, summary);
+
+    return {
+      successCount: deleted.length,
+      failureCount: paths.length - deleted.length,
+      errors,
+      totalCount: paths.length,
+      allSuccess: deleted.length === paths.length,
+      deleted,
+    };
+  }
+
+  /**
+   * Deleta vários arquivos em lote com uma única confirmação
+   * @param {Array<string>} paths - Caminhos relativos à pasta de modelos
+   * @param {string} confirmMessage - Mensagem de confirmação
+   * @param {Function} onProgress - Callback de progresso (processados, total)
+   * @returns {Promise<Object>} Mesmo formato de deletePaths
+   */
+  static async deletePathsWithConfirmation(paths, confirmMessage, onProgress = null) {
+    const temp = new DeleteManager({
+      endpoint: "/api/delete_batch",
+      confirmMessage: confirmMessage,
+      data: {}
+    });
+
+    const confirmed = await temp._showConfirmDialog();
+    if (!confirmed) {
+      console.log("[DELETE_BATCH] Operação cancelada pelo usuário");
+      return {
+        successCount: 0,
+        failureCount: paths.length,
+        errors: [],
+        totalCount: paths.length,
+        allSuccess: false,
+        deleted: [],
+      };
+    }
+
+    return DeleteManager.deletePaths(paths, onProgress);
+  }
+
   /**
    * Mostra notificação visual
    * @private
@@ -7,6 +7,13 @@ const statGroups = document.getElementById("stat-groups");
 const statWaste = document.getElementById("stat-waste");
 const cancelBtn = document.getElementById("btn-cancel");
 
+const STAGE_LABELS = {
+  sample: "Amostragem",
+  full: "Hash completo",
+  verify: "Verificação",
+  groups: "Grupos",
+};
+
 let groupCount = 0;
 let totalWaste = 0;
 const seenGroups = new Set();
@@ -29,6 +36,14 @@ function formatBytes(bytes) {
   return Math.round((bytes / Math.pow(k, i)) * 100) / 100 + " " + sizes[i];
 }
 
+function formatDuration(seconds) {
+  const total = Math.max(0, Math.round(seconds));
+  if (total < 60) return `${total}s`;
+  const minutes = Math.floor(total / 60);
+  if (minutes < 60) return `${minutes}min ${total % 60}s`;
+  return `${Math.floor(minutes / 60)}h ${minutes % 60}min`;
+}
+
 function getFileName(filePath) {
   const parts = filePath.split(/\\|\//);
   return parts[parts.length - 1] || filePath;
@@ -138,18 +153,10 @@ async function keepOnlyOne(groupId, files, btn) {
   btn.disabled = true;
   btn.textContent = "⏳ Processando...";
 
-  // Criar managers para cada arquivo a deletar com confirmação suprimida
+  // Um único lote no servidor (validação e invalidação de cache uma vez só)
   const filesToDelete = files.slice(1);
-  const managers = filesToDelete.map(filePath =>
-    DeleteManager.createDuplicateDelete(filePath, null, {
-      showNotification: false,
-      suppressConfirmation: true  // Suprimir confirmação individual
-    })
-  );
-
-  // Executar batch de deletions com confirmação única
-  DeleteManager.executeBatchWithConfirmation(
-    managers,
+  DeleteManager.deletePathsWithConfirmation(
+    filesToDelete,
     `Deletar ${filesToDelete.length} arquivo(s) duplicado(s)?`,
     (deleted, total) => {
       btn.textContent = `⏳ Deletando... (${deleted}/${total})`;
@@ -208,6 +215,9 @@ if (cancelBtn) {
   });
 }
 
+// Primeiro acesso reaproveita o resultado salvo no servidor; depois, o botão pede um scan incremental
+let scanQuery = "";
+
 const startBtn = document.getElementById("btn-start-scan");
 if (startBtn) {
   startBtn.addEventListener("click", () => {
@@ -216,8 +226,19 @@ if (startBtn) {
     startBtn.disabled = true;
     startBtn.textContent = "⏳ Iniciando...";
     resetUI();
-    startStream();
+    startStream(scanQuery);
+    scanQuery = "refresh=1";
   });
+
+  // Resultado salvo ainda válido: mostra sem esperar o clique
+  fetch("/api/scan_progress")
+    .then((response) => response.json())
+    .then((data) => {
+      if (data && data.completed && data.fresh && !startBtn.disabled) {
+        startBtn.click();
+      }
+    })
+    .catch(() => {});
 }
 
 function resetUI() {
@@ -248,8 +269,8 @@ function resetUI() {
 
 
 
-function startStream() {
-  const source = new EventSource("/api/scan_stream");
+function startStream(query = "") {
+  const source = new EventSource(query ? `/api/scan_stream?${query}` : "/api/scan_stream");
 
   source.onmessage = (event) => {
     const data = JSON.parse(event.data || "{}") || {};
@@ -264,7 +285,22 @@ function startStream() {
     if (data.type === "progress") {
       if (data.total > 0 || data.current > 0) {
         const percent = data.total > 0 ? Math.round((data.current / data.total) * 100) : 0;
-        statusText.textContent = `${data.current} / ${data.total} arquivos (${percent}%)`;
+        const stageLabel = STAGE_LABELS[data.stage] ? `${STAGE_LABELS[data.stage]}: ` : "";
+        let detail = `${data.current} / ${data.total} arquivos (${percent}%)`;
+        if (data.units_total > 0) {
+          const bytesPercent = data.bytes_total > 0 ? Math.round((data.bytes_done / data.bytes_total) * 100) : percent;
+          detail = `${data.units_done} / ${data.units_total} grupos, ` +
+            `${formatBytes(data.bytes_done || 0)} de ${formatBytes(data.bytes_total || 0)} (${bytesPercent}%)`;
+        }
+        if (typeof data.eta_seconds === "number" && data.current < data.total) {
+          detail += ` - restam ~${formatDuration(data.eta_seconds)}`;
+        }
+        statusText.textContent = `${stageLabel}${detail}`;
+        if (data.bytes_read) {
+          const read = data.bytes_read;
+          statusText.title = `Lidos - amostra: ${formatBytes(read.sample || 0)}, ` +
+            `completo: ${formatBytes(read.full || 0)}, verificação: ${formatBytes(read.verify || 0)}`;
+        }
       } else if (data.phase === "scan_done") {
         statusText.textContent = "Coletando arquivos...";
       }
@@ -296,12 +332,16 @@ function startStream() {
     if (data.type === "complete") {
       updateSummary(data.summary);
       statusText.textContent = "Concluido";
+      if (data.stored && data.summary && data.summary.scanned_at) {
+        const scannedAt = new Date(data.summary.scanned_at * 1000).toLocaleString();
+        statusText.textContent = `Resultado salvo de ${scannedAt}`;
+      }
       source.close();
       // Mostrar o botão de iniciar novamente para permitir nova verificação
       if (startBtn) {
         startBtn.style.display = "block";
         startBtn.disabled = false;
-        startBtn.textContent = "▶️ Nova Verificação";
+        startBtn.textContent = data.stored ? "🔄 Atualizar Verificação" : "▶️ Nova Verificação";
       }
       if (cancelBtn) cancelBtn.style.display = "none";
       showConfirmationModal();
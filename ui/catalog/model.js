@@ -147,20 +147,22 @@ function deleteFile(filename, element) {
     element,
     {
       onSuccess: () => {
-        // Atualizar arrays
+        // Atualizar arrays e totais (as listas só têm as páginas já carregadas)
+        if (imageList.includes(filename)) totals.image -= 1;
+        if (videoList.includes(filename)) totals.video -= 1;
         imageList = imageList.filter(f => f !== filename);
         videoList = videoList.filter(f => f !== filename);
         
         // Atualizar contadores
-        imgCountEl.textContent = imageList.length;
-        videoCountEl.textContent = videoList.length;
+        imgCountEl.textContent = totals.image;
+        videoCountEl.textContent = totals.video;
         
         // Esconder seções se vazias
-        if (imageList.length === 0) {
+        if (totals.image === 0) {
           imagesGrid.style.display = "none";
           if (imagesHeader) imagesHeader.style.display = "none";
         }
-        if (videoList.length === 0) {
+        if (totals.video === 0) {
           videosGrid.style.display = "none";
           if (videosHeader) videosHeader.style.display = "none";
         }
@@ -169,108 +171,212 @@ function deleteFile(filename, element) {
   );
   
   deleteManager.execute();
-}}
+}
 
-fetch(`api/model?site=${encodeURIComponent(site)}&model=${encodeURIComponent(model)}`)
-  .then(res => res.json())
-  .then(data => {
-    imageList = Array.isArray(data.images) ? data.images : [];
-    videoList = Array.isArray(data.videos) ? data.videos : [];
-
-    // IntersectionObserver para lazy loading
-    const mediaObserver = new IntersectionObserver((entries) => {
-      entries.forEach(entry => {
-        if (entry.isIntersecting) {
-          const media = entry.target;
-          const src = media.dataset.src;
-          if (src) {
-            media.src = src;
-            media.removeAttribute('data-src');
-            mediaObserver.unobserve(media);
-          }
-        }
+const PAGE_SIZE = 60;  // Itens por página de cada tipo (rolagem infinita)
+const totals = { image: 0, video: 0 };
+const pages = {
+  image: { cursor: null, done: false, loading: false },
+  video: { cursor: null, done: false, loading: false },
+};
+
+// IntersectionObserver para lazy loading
+const mediaObserver = new IntersectionObserver((entries) => {
+  entries.forEach(entry => {
+    if (entry.isIntersecting) {
+      const media = entry.target;
+      const src = media.dataset.src;
+      const poster = media.dataset.poster;
+      if (src) {
+        media.src = src;
+        media.removeAttribute('data-src');
+      }
+      if (poster) {
+        media.poster = poster;
+        media.removeAttribute('data-poster');
+      }
+      mediaObserver.unobserve(media);
+    }
+  });
+}, { rootMargin: '200px' });
+
+function renderImages(names) {
+  // Usar DocumentFragment para melhor performance
+  const imagesFragment = document.createDocumentFragment();
+
+  names.forEach(name => {
+    const container = document.createElement("div");
+    container.className = "thumb-container";
+
+    const img = document.createElement("img");
+    // Miniatura gerada no servidor (o preview continua abrindo o original em /media/)
+    img.dataset.src = `/thumb/${site}/${model}/${name}`;
+    img.className = "thumb";
+    img.loading = "lazy";
+    img.onclick = () => openPreview("images", imageList.indexOf(name));
+    container.appendChild(img);
+
+    const deleteBtn = document.createElement("button");
+    deleteBtn.className = "nav-btn manage-action delete-file";
+    deleteBtn.textContent = "🗑 Excluir";
+    deleteBtn.type = "button";
+    deleteBtn.onclick = (e) => {
+      e.stopPropagation();
+      deleteFile(name, container);
+    };
+    container.appendChild(deleteBtn);
+
+    imagesFragment.appendChild(container);
+    mediaObserver.observe(img);
+  });
+
+  imagesGrid.appendChild(imagesFragment);
+}
+
+function renderVideos(names) {
+  // Videos com DocumentFragment
+  const videosFragment = document.createDocumentFragment();
+
+  names.forEach(name => {
+    const videoCard = document.createElement("div");
+    videoCard.className = "video-thumb";
+
+    const video = document.createElement("video");
+    // Só o quadro de capa; o vídeo em si é carregado no preview
+    video.dataset.poster = `/thumb/${site}/${model}/${name}`;
+    video.preload = "none";  // Mudado de metadata para none
+    video.muted = true;
+    video.playsInline = true;
+    video.className = "thumb";
+    videoCard.appendChild(video);
+
+    const playIcon = document.createElement("span");
+    playIcon.className = "video-play";
+    playIcon.textContent = "▶";
+    videoCard.appendChild(playIcon);
+
+    const deleteBtn = document.createElement("button");
+    deleteBtn.className = "nav-btn manage-action delete-file";
+    deleteBtn.textContent = "🗑 Excluir";
+    deleteBtn.type = "button";
+    deleteBtn.onclick = (e) => {
+      e.stopPropagation();
+      deleteFile(name, videoCard);
+    };
+    videoCard.appendChild(deleteBtn);
+
+    videoCard.onclick = () => openPreview("videos", videoList.indexOf(name));
+    videosFragment.appendChild(videoCard);
+    mediaObserver.observe(video);
+  });
+
+  videosGrid.appendChild(videosFragment);
+}
+
+function modelUrl(kinds) {
+  const query = new URLSearchParams({ site, model, limit: String(PAGE_SIZE) });
+  if (kinds.length === 1) query.set("kind", kinds[0]);
+  kinds.forEach(kind => {
+    if (pages[kind].cursor) query.set(`${kind}s_cursor`, pages[kind].cursor);
+  });
+  return `api/model?${query.toString()}`;
+}
+
+// Carrega a próxima página de cada tipo pedido (a primeira chamada traz os dois tipos juntos)
+function loadPage(kinds) {
+  kinds = kinds.filter(kind => !pages[kind].done && !pages[kind].loading);
+  if (kinds.length === 0) return Promise.resolve();
+  kinds.forEach(kind => { pages[kind].loading = true; });
+
+  return fetch(modelUrl(kinds))
+    .then(res => res.json())
+    .then(data => {
+      if (data.error) throw new Error(data.error);
+      const nextCursor = data.next_cursor || {};
+      kinds.forEach(kind => {
+        const state = pages[kind];
+        state.cursor = nextCursor[`${kind}s`] || null;
+        state.done = !state.cursor;
       });
-    }, { rootMargin: '200px' });
 
-    // Usar DocumentFragment para melhor performance
-    const imagesFragment = document.createDocumentFragment();
-    
-    imageList.forEach((name, index) => {
-      const container = document.createElement("div");
-      container.className = "thumb-container";
-      
-      const img = document.createElement("img");
-      // Usar lazy loading
-      img.dataset.src = `/media/${site}/${model}/${name}`;
-      img.className = "thumb";
-      img.loading = "lazy";
-      img.onclick = () => openPreview("images", index);
-      container.appendChild(img);
-      
-      const deleteBtn = document.createElement("button");
-      deleteBtn.className = "nav-btn manage-action delete-file";
-      deleteBtn.textContent = "🗑 Excluir";
-      deleteBtn.type = "button";
-      deleteBtn.onclick = (e) => {
-        e.stopPropagation();
-        deleteFile(name, container);
-      };
-      container.appendChild(deleteBtn);
-      
-      imagesFragment.appendChild(container);
-      mediaObserver.observe(img);
+      if (kinds.includes("image")) {
+        const names = Array.isArray(data.images) ? data.images : [];
+        imageList = imageList.concat(names);
+        renderImages(names);
+        totals.image = data.total_images ?? imageList.length;
+        imgCountEl.textContent = totals.image;
+      }
+      if (kinds.includes("video")) {
+        const names = Array.isArray(data.videos) ? data.videos : [];
+        videoList = videoList.concat(names);
+        renderVideos(names);
+        totals.video = data.total_videos ?? videoList.length;
+        videoCountEl.textContent = totals.video;
+      }
+      return data;
+    })
+    .finally(() => {
+      kinds.forEach(kind => { pages[kind].loading = false; });
     });
-    
-    imagesGrid.appendChild(imagesFragment);
+}
 
-    // Videos com DocumentFragment
-    const videosFragment = document.createDocumentFragment();
-    
-    videoList.forEach((name, index) => {
-      const videoCard = document.createElement("div");
-      videoCard.className = "video-thumb";
-      
-      const video = document.createElement("video");
-      // Usar lazy loading
-      video.dataset.src = `/media/${site}/${model}/${name}`;
-      video.preload = "none";  // Mudado de metadata para none
-      video.muted = true;
-      video.playsInline = true;
-      video.className = "thumb";
-      videoCard.appendChild(video);
-      
-      const playIcon = document.createElement("span");
-      playIcon.className = "video-play";
-      playIcon.textContent = "▶";
-      videoCard.appendChild(playIcon);
-      
-      const deleteBtn = document.createElement("button");
-      deleteBtn.className = "nav-btn manage-action delete-file";
-      deleteBtn.textContent = "🗑 Excluir";
-      deleteBtn.type = "button";
-      deleteBtn.onclick = (e) => {
-        e.stopPropagation();
-        deleteFile(name, videoCard);
-      };
-      videoCard.appendChild(deleteBtn);
-      
-      videoCard.onclick = () => openPreview("videos", index);
-      videosFragment.appendChild(videoCard);
-      mediaObserver.observe(video);
-    });
-    
-    videosGrid.appendChild(videosFragment);
+// Sentinelas no fim de cada grade: ao chegarem perto da tela, buscam a próxima página
+const SENTINEL_MARGIN = 600;
+
+function watchForMore(grid, kind) {
+  const sentinel = document.createElement("div");
+  sentinel.className = "scroll-sentinel";
+  grid.insertAdjacentElement("afterend", sentinel);
+
+  const stop = () => {
+    observer.disconnect();
+    sentinel.remove();
+  };
 
-    imgCountEl.textContent = imageList.length;
-    videoCountEl.textContent = videoList.length;
+  // O observer só avisa quando a interseção muda: se a página nova não empurrar a sentinela
+  // para fora da margem (tela alta, cards pequenos), continua carregando até ela sair
+  const nearViewport = () => {
+    const rect = sentinel.getBoundingClientRect();
+    return rect.top - SENTINEL_MARGIN <= window.innerHeight && rect.bottom + SENTINEL_MARGIN >= 0;
+  };
 
-    if (imageList.length === 0) {
+  const loadMore = () => {
+    if (pages[kind].done) {
+      stop();
+      return;
+    }
+    if (pages[kind].loading) return;
+    loadPage([kind])
+      .then(() => {
+        if (pages[kind].done) {
+          stop();
+        } else if (nearViewport()) {
+          requestAnimationFrame(loadMore);
+        }
+      })
+      .catch(err => console.error("Erro ao carregar mais arquivos", err));
+  };
+
+  const observer = new IntersectionObserver((entries) => {
+    if (entries.some(entry => entry.isIntersecting)) loadMore();
+  }, { rootMargin: `${SENTINEL_MARGIN}px` });
+  observer.observe(sentinel);
+}
+
+loadPage(["image", "video"])
+  .then(data => {
+    if (!data) return;
+    if (data.total_images === 0) {
       imagesGrid.style.display = "none";
       if (imagesHeader) imagesHeader.style.display = "none";
+    } else {
+      watchForMore(imagesGrid, "image");
     }
-    if (videoList.length === 0) {
+    if (data.total_videos === 0) {
       videosGrid.style.display = "none";
       if (videosHeader) videosHeader.style.display = "none";
+    } else {
+      watchForMore(videosGrid, "video");
     }
   })
   .catch(err => {
@@ -260,14 +260,15 @@ function displayDuplicates(data) {
           <div class="duplicate-files">
             ${dup.files.map((f, fileIdx) => {
               const mediaUrl = `/media/${f.replace(/\\/g, '/')}`;
+              const thumbUrl = `/thumb/${f.replace(/\\/g, '/')}?w=180`;
               const isVideo = /\.(mp4|avi|mov|mkv|flv|wmv|m4v)$/i.test(f);
               const fileId = `file-${idx}-${fileIdx}`;
               return `
                 <div class="file-item" id="${fileId}" data-file-path="${f}">
                   <div class="file-thumbnail">
                     ${isVideo ? 
-                      `<video src="${mediaUrl}" class="dup-thumb" controls preload="metadata"></video>` :
-                      `<img src="${mediaUrl}" class="dup-thumb" loading="lazy">`
+                      `<video src="${mediaUrl}" poster="${thumbUrl}" class="dup-thumb" controls preload="none"></video>` :
+                      `<img src="${thumbUrl}" class="dup-thumb" loading="lazy">`
                     }
                   </div>
                   <div class="file-info">
@@ -46,7 +46,7 @@ fetch(`api/models?site=${encodeURIComponent(site)}`)
       card.className = "card clickable";
 
       const modelName = (model.name || "").replace(/-/g, " ");
-      const thumbPath = model.thumb ? `/media/${site}/${model.name}/${model.thumb}` : "";
+      const thumbPath = model.thumb ? `/thumb/${site}/${model.name}/${model.thumb}` : "";
       const imageCount = model.image_count || 0;
       const videoCount = model.video_count || 0;
       
@@ -13,7 +13,7 @@ import os
 import html
 import time
 from ui.link_utils import SUPPORTED_SITES, build_url, normalize_site_model, parse_supported_link
-from ui.workers import DownloadWorker, FetchWorker, ThumbnailWorker
+from ui.workers import DownloadWorker, FetchWorker, ThumbnailLoader, ThumbnailWorker
 from config import (
     APP_NAME_COLOR,
     PICAZOR_CHECK_BATCH_DEFAULT,
@@ -1552,22 +1552,46 @@ def add_thumbnail(parent, file_path):
         parent._thumbnail_workers.append(thumbnail_worker)
         thumbnail_worker.start()
     else:
-        # Image: load directly
-        pix = QPixmap(file_path)
-        if pix.isNull():
-            pix = QPixmap(thumb_size, thumb_size)
-            pix.fill(Qt.darkGray)
-
-        side = min(pix.width(), pix.height())
-        x = (pix.width() - side) // 2
-        y = (pix.height() - side) // 2
-        pix = pix.copy(x, y, side, side)
-        pix = pix.scaled(thumb_size, thumb_size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
-        widget = _create_thumbnail_widget(pix, thumb_size)
+        # Image: placeholder now; decoded at thumbnail size on the loader's worker threads
+        placeholder = QPixmap(thumb_size, thumb_size)
+        placeholder.fill(Qt.darkGray)
+        widget = _create_thumbnail_widget(placeholder, thumb_size)
         thumb_list.insertItem(0, item)
         thumb_list.setItemWidget(item, widget)
         _fade_in_widget(widget)
-        _prune_thumbnails(thumb_list, getattr(parent, "thumbnails_limit", 0))
+        limit = getattr(parent, "thumbnails_limit", 0)
+        _get_thumbnail_loader(thumb_list, thumb_size, limit).request(file_path)
+        _prune_thumbnails(thumb_list, limit)
+
+
+def _get_thumbnail_loader(thumb_list, thumb_size: int, limit: int) -> ThumbnailLoader:
+    """One loader per thumbnail list; decoded images are applied in batches.
+
+    The loader is shut down with its list, and follows the current thumbnails limit.
+    """
+    loader = getattr(thumb_list, "_thumbnail_loader", None)
+    if loader is None:
+        loader = ThumbnailLoader(thumb_size, max_pending=limit, parent=thumb_list)
+        loader.thumbnails_ready.connect(lambda batch: _apply_thumbnails(thumb_list, batch))
+        thumb_list.destroyed.connect(loader.shutdown)
+        thumb_list._thumbnail_loader = loader
+    loader.max_pending = limit
+    return loader
+
+
+def _apply_thumbnails(thumb_list, batch):
+    """Set decoded thumbnails (QImage -> QPixmap on the GUI thread); pruned items are skipped."""
+    items = {}
+    for i in range(thumb_list.count()):
+        item = thumb_list.item(i)
+        items[item.data(Qt.UserRole)] = item
+    for file_path, image in batch:
+        item = items.get(file_path)
+        if item is None:
+            continue
+        widget = thumb_list.itemWidget(item)
+        if isinstance(widget, QLabel):
+            widget.setPixmap(QPixmap.fromImage(image))
 
 
 def _create_video_placeholder(thumb_size: int):
@@ -1607,10 +1631,13 @@ def _fade_in_widget(widget: QWidget, duration_ms: int = 220):
 def _prune_thumbnails(thumb_list: QListWidget, limit: int):
     if not limit or limit <= 0:
         return
+    loader = getattr(thumb_list, "_thumbnail_loader", None)
     while thumb_list.count() > limit:
         item = thumb_list.takeItem(thumb_list.count() - 1)
         if item is None:
             break
+        if loader is not None:
+            loader.discard(item.data(Qt.UserRole))
         widget = thumb_list.itemWidget(item)
         if widget is not None:
             widget.deleteLater()
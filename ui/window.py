@@ -197,6 +197,10 @@ class AppWindow(QMainWindow):
                 for worker in list(thumbnail_workers):
                     if worker and worker.isRunning():
                         worker.wait(2000)
+
+                thumbnail_loader = getattr(getattr(central, "thumb_list", None), "_thumbnail_loader", None)
+                if thumbnail_loader is not None:
+                    thumbnail_loader.shutdown()
         except Exception as e:
             print(f"Erro ao encerrar threads: {e}")
 
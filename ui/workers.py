@@ -1,8 +1,9 @@
+from collections import OrderedDict
 from pathlib import Path
 import threading
 
-from PySide6.QtCore import Qt, QThread, Signal
-from PySide6.QtGui import QIcon, QPixmap, QColor, QPainter, QImage, QFont
+from PySide6.QtCore import QObject, QRect, QRunnable, QSize, Qt, QThread, QThreadPool, QTimer, Signal
+from PySide6.QtGui import QIcon, QPixmap, QColor, QPainter, QImage, QImageReader, QFont
 
 from config import (
     PICAZOR_CHECK_BATCH_DEFAULT,
@@ -14,6 +15,8 @@ FIXED_PICAZOR_THREADS = 4
 FIXED_PICAZOR_DELAY = 0.1
 FIXED_FAPELLO_THREADS = 3
 FIXED_DOWNLOAD_CHUNK_SIZE = 256 * 1024
+THUMBNAIL_DECODE_THREADS = 2  # Decodificação de miniaturas em paralelo (fora da thread da GUI)
+THUMBNAIL_FLUSH_MS = 50  # Miniaturas prontas nesse intervalo são aplicadas de uma vez
 from core.fapello_client import get_total_files as get_fapello_total_files
 from core.services.download_service import download_orchestrator_with_progress
 
@@ -205,6 +208,142 @@ class ThumbnailWorker(QThread):
         return pix
 
 
+def decode_thumbnail(file_path: str, thumb_size: int) -> QImage:
+    """Lê o recorte quadrado central da imagem já no tamanho da miniatura.
+
+    Com clipRect + scaledSize o QImageReader decodifica o JPEG em resolução reduzida (escala
+    do DCT) em vez de montar o original inteiro. QImage pode ser criado fora da thread da GUI.
+    """
+    reader = QImageReader(file_path)
+    reader.setAutoTransform(True)  # Orientação EXIF; o recorte central é o mesmo girado ou não
+    size = reader.size()
+    if size.isValid() and size.width() > 0 and size.height() > 0:
+        side = min(size.width(), size.height())
+        reader.setClipRect(QRect((size.width() - side) // 2, (size.height() - side) // 2, side, side))
+        reader.setScaledSize(QSize(thumb_size, thumb_size))
+    image = reader.read()
+    if image.isNull():
+        return QImage()
+    if image.width() != thumb_size or image.height() != thumb_size:
+        # Formato sem suporte a recorte/escala na leitura: ajusta a partir do QImage
+        side = min(image.width(), image.height())
+        image = image.copy((image.width() - side) // 2, (image.height() - side) // 2, side, side)
+        image = image.scaled(thumb_size, thumb_size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    return image
+
+
+class _ThumbnailTask(QRunnable):
+    """Decodifica uma miniatura numa thread do QThreadPool do ThumbnailLoader."""
+
+    def __init__(self, loader: "ThumbnailLoader", file_path: str, thumb_size: int):
+        super().__init__()
+        self.loader = loader
+        self.file_path = file_path
+        self.thumb_size = thumb_size
+
+    def run(self):
+        image = QImage()
+        if self.loader.is_wanted(self.file_path):  # Item podado enquanto esperava: não decodifica
+            try:
+                image = decode_thumbnail(self.file_path, self.thumb_size)
+            except Exception:
+                image = QImage()
+        if not self.loader.is_closed():  # Loader encerrado: ninguém mais espera o resultado
+            self.loader._decoded.emit(self.file_path, image)
+
+
+class ThumbnailLoader(QObject):
+    """Fila de miniaturas de imagens decodificadas fora da thread da GUI.
+
+    request() enfileira (mais recentes primeiro), no máximo THUMBNAIL_DECODE_THREADS leituras
+    rodam ao mesmo tempo e, numa rajada maior que `max_pending`, as mais antigas são descartadas
+    (seriam podadas da lista antes de aparecer). discard() esquece um item já podado. Os QImage
+    prontos chegam agrupados em thumbnails_ready([(caminho, QImage)]) na thread da GUI.
+    """
+
+    thumbnails_ready = Signal(list)
+    _decoded = Signal(str, QImage)
+
+    def __init__(self, thumb_size: int = 220, max_pending: int = 0, parent=None):
+        super().__init__(parent)
+        self.thumb_size = thumb_size
+        self.max_pending = max_pending
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(THUMBNAIL_DECODE_THREADS)
+        self._lock = threading.Lock()
+        self._wanted = set()
+        self._closed = False
+        self._pending = OrderedDict()  # Ainda não enviados ao pool; o mais novo fica no fim
+        self._in_flight = 0
+        self._ready = []
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(THUMBNAIL_FLUSH_MS)
+        self._flush_timer.timeout.connect(self._flush)
+        # Emitido pelas threads do pool; como o loader vive na thread da GUI, a conexão é enfileirada
+        self._decoded.connect(self._on_decoded)
+
+    def request(self, file_path: str):
+        with self._lock:
+            if self._closed:
+                return
+            self._wanted.add(file_path)
+        self._pending.pop(file_path, None)
+        self._pending[file_path] = True
+        while self.max_pending and len(self._pending) > self.max_pending:
+            oldest, _ = self._pending.popitem(last=False)
+            self.discard(oldest)
+        self._pump()
+
+    def discard(self, file_path: str):
+        with self._lock:
+            self._wanted.discard(file_path)
+        self._pending.pop(file_path, None)
+
+    def is_wanted(self, file_path: str) -> bool:
+        with self._lock:
+            return file_path in self._wanted
+
+    def is_closed(self) -> bool:
+        with self._lock:
+            return self._closed
+
+    def shutdown(self):
+        """Descarta a fila e espera as leituras em andamento (lista/janela sendo fechada)."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wanted.clear()
+        self._pending.clear()
+        self._ready.clear()
+        self._flush_timer.stop()
+        self._pool.clear()
+        self._pool.waitForDone()
+
+    def _pump(self):
+        while self._pending and self._in_flight < self._pool.maxThreadCount():
+            file_path, _ = self._pending.popitem(last=True)
+            self._in_flight += 1
+            self._pool.start(_ThumbnailTask(self, file_path, self.thumb_size))
+
+    def _on_decoded(self, file_path: str, image: QImage):
+        self._in_flight -= 1
+        with self._lock:
+            wanted = file_path in self._wanted
+            self._wanted.discard(file_path)
+        if wanted and not image.isNull():
+            self._ready.append((file_path, image))
+            if not self._flush_timer.isActive():
+                self._flush_timer.start()
+        self._pump()
+
+    def _flush(self):
+        batch, self._ready = self._ready, []
+        if batch:
+            self.thumbnails_ready.emit(batch)
+
+
 class DownloadWorker(BaseWorkerThread):
     """Worker thread para baixar arquivos sem bloquear a UI."""
 